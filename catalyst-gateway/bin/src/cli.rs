@@ -1,5 +1,5 @@
 //! CLI interpreter for the service
-use std::{io::Write, sync::Arc};
+use std::{io::Write, sync::Arc, time::Duration};
 
 use clap::Parser;
 
@@ -48,7 +48,14 @@ impl Cli {
             Self::Run(settings) => {
                 logger::init(settings.log_level)?;
 
-                let state = Arc::new(State::new(Some(settings.database_url)).await?);
+                let state = Arc::new(
+                    State::new(
+                        Some(settings.database_url),
+                        &settings.db_pool_settings,
+                        Duration::from_secs(settings.schema_version_poll_interval),
+                    )
+                    .await?,
+                );
                 service::run(&settings.docs_settings, state).await?;
                 Ok(())
             },
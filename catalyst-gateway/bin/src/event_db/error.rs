@@ -20,6 +20,9 @@ pub(crate) enum Error {
     /// Cannot find this item
     #[error("Cannot find this item, error: {0}")]
     NotFound(String),
+    /// Invalid DB connection pool settings
+    #[error("Invalid DB connection pool settings: {0}")]
+    InvalidPoolSettings(String),
     /// DB connection timeout
     #[error("Connection to DB timed out")]
     TimedOut,
@@ -2,6 +2,7 @@
 use std::collections::HashMap;
 
 use async_trait::async_trait;
+use tokio_postgres::Row;
 
 use crate::event_db::{
     error::Error,
@@ -15,7 +16,7 @@ use crate::event_db::{
         proposal::ProposalId,
         registration::VoterGroupId,
     },
-    EventDB,
+    query, EventDB,
 };
 
 #[async_trait]
@@ -46,6 +47,25 @@ impl EventDB {
         INNER JOIN objective ON proposal.objective = objective.row_id
         INNER JOIN vote_options ON objective.vote_options = vote_options.id
         WHERE objective.event = $1 AND objective.id = $2;";
+    /// Ballot vote plans per event query template
+    const BALLOTS_VOTE_PLANS_PER_EVENT_QUERY: &'static str = "SELECT objective.id as objective_id,
+        proposal.id as proposal_id, proposal_voteplan.bb_proposal_index,
+        voteplan.id, voteplan.category, voteplan.encryption_key, voteplan.group_id
+        FROM proposal_voteplan
+        INNER JOIN proposal ON proposal_voteplan.proposal_id = proposal.row_id
+        INNER JOIN voteplan ON proposal_voteplan.voteplan_id = voteplan.row_id
+        INNER JOIN objective ON proposal.objective = objective.row_id
+        WHERE objective.event = $1;";
+    /// Ballot vote plans per objective query template
+    const BALLOTS_VOTE_PLANS_PER_OBJECTIVE_QUERY: &'static str =
+        "SELECT proposal.id as proposal_id,
+        proposal_voteplan.bb_proposal_index,
+        voteplan.id, voteplan.category, voteplan.encryption_key, voteplan.group_id
+        FROM proposal_voteplan
+        INNER JOIN proposal ON proposal_voteplan.proposal_id = proposal.row_id
+        INNER JOIN voteplan ON proposal_voteplan.voteplan_id = voteplan.row_id
+        INNER JOIN objective ON proposal.objective = objective.row_id
+        WHERE objective.event = $1 AND objective.id = $2;";
     /// Ballot vote options query template
     const BALLOT_VOTE_OPTIONS_QUERY: &'static str = "SELECT vote_options.objective
         FROM proposal
@@ -62,44 +82,44 @@ impl EventDB {
         WHERE objective.event = $1 AND objective.id = $2 AND proposal.id = $3;";
 }
 
+/// Get a vote plan from a row of a vote plans query.
+fn vote_plan(row: &Row) -> Result<VotePlan, Error> {
+    Ok(VotePlan {
+        chain_proposal_index: row.try_get("bb_proposal_index")?,
+        group: row
+            .try_get::<_, Option<String>>("group_id")?
+            .map(VoterGroupId),
+        ballot_type: BallotType(row.try_get("category")?),
+        chain_voteplan_id: row.try_get("id")?,
+        encryption_key: row.try_get("encryption_key")?,
+    })
+}
+
 #[async_trait]
 impl BallotQueries for EventDB {
     async fn get_ballot(
         &self, event: EventId, objective: ObjectiveId, proposal: ProposalId,
     ) -> Result<Ballot, Error> {
-        let conn = self.pool.get().await?;
-
-        let rows = conn
-            .query(Self::BALLOT_VOTE_OPTIONS_QUERY, &[
-                &event.0,
-                &objective.0,
-                &proposal.0,
-            ])
-            .await?;
+        let conn = self.connection().await?;
+
+        let rows = query!(conn, Self::BALLOT_VOTE_OPTIONS_QUERY, &[
+            &event.0,
+            &objective.0,
+            &proposal.0,
+        ])
+        .await?;
         let row = rows
             .first()
             .ok_or_else(|| Error::NotFound("cat not find ballot value".to_string()))?;
         let choices = row.try_get("objective")?;
 
-        let rows = conn
-            .query(Self::BALLOT_VOTE_PLANS_QUERY, &[
-                &event.0,
-                &objective.0,
-                &proposal.0,
-            ])
-            .await?;
-        let mut voteplans = Vec::new();
-        for row in rows {
-            voteplans.push(VotePlan {
-                chain_proposal_index: row.try_get("bb_proposal_index")?,
-                group: row
-                    .try_get::<_, Option<String>>("group_id")?
-                    .map(VoterGroupId),
-                ballot_type: BallotType(row.try_get("category")?),
-                chain_voteplan_id: row.try_get("id")?,
-                encryption_key: row.try_get("encryption_key")?,
-            });
-        }
+        let rows = query!(conn, Self::BALLOT_VOTE_PLANS_QUERY, &[
+            &event.0,
+            &objective.0,
+            &proposal.0,
+        ])
+        .await?;
+        let voteplans = rows.iter().map(vote_plan).collect::<Result<_, _>>()?;
 
         Ok(Ballot {
             choices: ObjectiveChoices(choices),
@@ -110,39 +130,34 @@ impl BallotQueries for EventDB {
     async fn get_objective_ballots(
         &self, event: EventId, objective: ObjectiveId,
     ) -> Result<Vec<ProposalBallot>, Error> {
-        let conn = self.pool.get().await?;
+        let conn = self.connection().await?;
 
-        let rows = conn
-            .query(Self::BALLOTS_VOTE_OPTIONS_PER_OBJECTIVE_QUERY, &[
+        // The vote plans of every proposal are fetched at once, and both queries are
+        // pipelined on the connection.
+        let (rows, voteplan_rows) = tokio::try_join!(
+            query!(conn, Self::BALLOTS_VOTE_OPTIONS_PER_OBJECTIVE_QUERY, &[
                 &event.0,
                 &objective.0,
-            ])
-            .await?;
+            ]),
+            query!(conn, Self::BALLOTS_VOTE_PLANS_PER_OBJECTIVE_QUERY, &[
+                &event.0,
+                &objective.0,
+            ]),
+        )?;
+
+        let mut voteplans = HashMap::<i32, Vec<VotePlan>>::new();
+        for row in &voteplan_rows {
+            voteplans
+                .entry(row.try_get("proposal_id")?)
+                .or_default()
+                .push(vote_plan(row)?);
+        }
 
         let mut ballots = Vec::new();
         for row in rows {
             let choices = row.try_get("objective")?;
             let proposal_id = ProposalId(row.try_get("proposal_id")?);
-
-            let rows = conn
-                .query(Self::BALLOT_VOTE_PLANS_QUERY, &[
-                    &event.0,
-                    &objective.0,
-                    &proposal_id.0,
-                ])
-                .await?;
-            let mut voteplans = Vec::new();
-            for row in rows {
-                voteplans.push(VotePlan {
-                    chain_proposal_index: row.try_get("bb_proposal_index")?,
-                    group: row
-                        .try_get::<_, Option<String>>("group_id")?
-                        .map(VoterGroupId),
-                    ballot_type: BallotType(row.try_get("category")?),
-                    chain_voteplan_id: row.try_get("id")?,
-                    encryption_key: row.try_get("encryption_key")?,
-                });
-            }
+            let voteplans = voteplans.remove(&proposal_id.0).unwrap_or_default();
 
             ballots.push(ProposalBallot {
                 proposal_id,
@@ -156,47 +171,47 @@ impl BallotQueries for EventDB {
     }
 
     async fn get_event_ballots(&self, event: EventId) -> Result<Vec<ObjectiveBallots>, Error> {
-        let conn = self.pool.get().await?;
+        let conn = self.connection().await?;
+
+        // The vote plans of every proposal are fetched at once, and both queries are
+        // pipelined on the connection.
+        let (rows, voteplan_rows) = tokio::try_join!(
+            query!(
+                conn,
+                Self::BALLOTS_VOTE_OPTIONS_PER_EVENT_QUERY,
+                &[&event.0]
+            ),
+            query!(conn, Self::BALLOTS_VOTE_PLANS_PER_EVENT_QUERY, &[&event.0]),
+        )?;
+
+        // Proposal IDs are only unique within an objective.
+        let mut voteplans = HashMap::<(i32, i32), Vec<VotePlan>>::new();
+        for row in &voteplan_rows {
+            voteplans
+                .entry((row.try_get("objective_id")?, row.try_get("proposal_id")?))
+                .or_default()
+                .push(vote_plan(row)?);
+        }
 
-        let rows = conn
-            .query(Self::BALLOTS_VOTE_OPTIONS_PER_EVENT_QUERY, &[&event.0])
-            .await?;
         let mut ballots = HashMap::<ObjectiveId, Vec<ProposalBallot>>::new();
         for row in rows {
             let choices = row.try_get("objective")?;
             let proposal_id = ProposalId(row.try_get("proposal_id")?);
             let objective_id = ObjectiveId(row.try_get("objective_id")?);
+            let voteplans = voteplans
+                .remove(&(objective_id.0, proposal_id.0))
+                .unwrap_or_default();
 
-            let rows = conn
-                .query(Self::BALLOT_VOTE_PLANS_QUERY, &[
-                    &event.0,
-                    &objective_id.0,
-                    &proposal_id.0,
-                ])
-                .await?;
-            let mut voteplans = Vec::new();
-            for row in rows {
-                voteplans.push(VotePlan {
-                    chain_proposal_index: row.try_get("bb_proposal_index")?,
-                    group: row
-                        .try_get::<_, Option<String>>("group_id")?
-                        .map(VoterGroupId),
-                    ballot_type: BallotType(row.try_get("category")?),
-                    chain_voteplan_id: row.try_get("id")?,
-                    encryption_key: row.try_get("encryption_key")?,
-                });
-            }
-            let ballot = ProposalBallot {
-                proposal_id,
-                ballot: Ballot {
-                    choices: ObjectiveChoices(choices),
-                    voteplans: GroupVotePlans(voteplans),
-                },
-            };
             ballots
                 .entry(objective_id)
-                .and_modify(|ballots| ballots.push(ballot.clone()))
-                .or_insert_with(|| vec![ballot]);
+                .or_default()
+                .push(ProposalBallot {
+                    proposal_id,
+                    ballot: Ballot {
+                        choices: ObjectiveChoices(choices),
+                        voteplans: GroupVotePlans(voteplans),
+                    },
+                });
         }
 
         Ok(ballots
@@ -8,7 +8,7 @@ use crate::event_db::{
         Event, EventDetails, EventGoal, EventId, EventRegistration, EventSchedule, EventSummary,
         VotingPowerAlgorithm, VotingPowerSettings,
     },
-    EventDB,
+    query, EventDB,
 };
 
 pub(crate) mod ballot;
@@ -55,11 +55,9 @@ impl EventQueries for EventDB {
     async fn get_events(
         &self, limit: Option<i64>, offset: Option<i64>,
     ) -> Result<Vec<EventSummary>, Error> {
-        let conn = self.pool.get().await?;
+        let conn = self.connection().await?;
 
-        let rows = conn
-            .query(Self::EVENTS_QUERY, &[&limit, &offset.unwrap_or(0)])
-            .await?;
+        let rows = query!(conn, Self::EVENTS_QUERY, &[&limit, &offset.unwrap_or(0)]).await?;
 
         let mut events = Vec::new();
         for row in rows {
@@ -85,9 +83,9 @@ impl EventQueries for EventDB {
     }
 
     async fn get_event(&self, event: EventId) -> Result<Event, Error> {
-        let conn = self.pool.get().await?;
+        let conn = self.connection().await?;
 
-        let rows = conn.query(Self::EVENT_QUERY, &[&event.0]).await?;
+        let rows = query!(conn, Self::EVENT_QUERY, &[&event.0]).await?;
         let row = rows
             .first()
             .ok_or_else(|| Error::NotFound("Cannot find event value".to_string()))?;
@@ -143,7 +141,7 @@ impl EventQueries for EventDB {
                 .map(|val| val.and_local_timezone(Utc).unwrap()),
         };
 
-        let rows = conn.query(Self::EVENT_GOALS_QUERY, &[&event.0]).await?;
+        let rows = query!(conn, Self::EVENT_GOALS_QUERY, &[&event.0]).await?;
         let mut goals = Vec::new();
         for row in rows {
             goals.push(EventGoal {
@@ -11,7 +11,7 @@ use crate::event_db::{
         },
         registration::VoterGroupId,
     },
-    EventDB,
+    query, EventDB,
 };
 
 #[async_trait]
@@ -44,15 +44,14 @@ impl ObjectiveQueries for EventDB {
     async fn get_objectives(
         &self, event: EventId, limit: Option<i64>, offset: Option<i64>,
     ) -> Result<Vec<Objective>, Error> {
-        let conn = self.pool.get().await?;
+        let conn = self.connection().await?;
 
-        let rows = conn
-            .query(Self::OBJECTIVES_QUERY, &[
-                &event.0,
-                &limit,
-                &offset.unwrap_or(0),
-            ])
-            .await?;
+        let rows = query!(conn, Self::OBJECTIVES_QUERY, &[
+            &event.0,
+            &limit,
+            &offset.unwrap_or(0),
+        ])
+        .await?;
 
         let mut objectives = Vec::new();
         for row in rows {
@@ -75,7 +74,7 @@ impl ObjectiveQueries for EventDB {
             };
 
             let mut groups = Vec::new();
-            let rows = conn.query(Self::VOTING_GROUPS_QUERY, &[&row_id]).await?;
+            let rows = query!(conn, Self::VOTING_GROUPS_QUERY, &[&row_id]).await?;
             for row in rows {
                 let group = row.try_get::<_, Option<String>>("group")?.map(VoterGroupId);
                 let voting_token: Option<_> = row.try_get("voting_token")?;
@@ -8,7 +8,7 @@ use crate::event_db::{
         objective::ObjectiveId,
         proposal::{Proposal, ProposalDetails, ProposalId, ProposalSummary, ProposerDetails},
     },
-    EventDB,
+    query, EventDB,
 };
 
 #[async_trait]
@@ -52,13 +52,14 @@ impl ProposalQueries for EventDB {
     async fn get_proposal(
         &self, event: EventId, objective: ObjectiveId, proposal: ProposalId,
     ) -> Result<Proposal, Error> {
-        let conn: bb8::PooledConnection<
-            bb8_postgres::PostgresConnectionManager<tokio_postgres::NoTls>,
-        > = self.pool.get().await?;
+        let conn = self.connection().await?;
 
-        let rows = conn
-            .query(Self::PROPOSAL_QUERY, &[&event.0, &objective.0, &proposal.0])
-            .await?;
+        let rows = query!(conn, Self::PROPOSAL_QUERY, &[
+            &event.0,
+            &objective.0,
+            &proposal.0,
+        ])
+        .await?;
         let row = rows
             .first()
             .ok_or_else(|| Error::NotFound("Cannot find proposal value".to_string()))?;
@@ -91,16 +92,15 @@ impl ProposalQueries for EventDB {
     async fn get_proposals(
         &self, event: EventId, objective: ObjectiveId, limit: Option<i64>, offset: Option<i64>,
     ) -> Result<Vec<ProposalSummary>, Error> {
-        let conn = self.pool.get().await?;
+        let conn = self.connection().await?;
 
-        let rows = conn
-            .query(Self::PROPOSALS_QUERY, &[
-                &event.0,
-                &objective.0,
-                &limit,
-                &offset.unwrap_or(0),
-            ])
-            .await?;
+        let rows = query!(conn, Self::PROPOSALS_QUERY, &[
+            &event.0,
+            &objective.0,
+            &limit,
+            &offset.unwrap_or(0),
+        ])
+        .await?;
 
         let mut proposals = Vec::new();
         for row in rows {
@@ -9,7 +9,7 @@ use crate::event_db::{
         proposal::ProposalId,
         review::{AdvisorReview, Rating, ReviewType},
     },
-    EventDB,
+    query, EventDB,
 };
 
 #[async_trait]
@@ -57,17 +57,16 @@ impl ReviewQueries for EventDB {
         &self, event: EventId, objective: ObjectiveId, proposal: ProposalId, limit: Option<i64>,
         offset: Option<i64>,
     ) -> Result<Vec<AdvisorReview>, Error> {
-        let conn = self.pool.get().await?;
+        let conn = self.connection().await?;
 
-        let rows = conn
-            .query(Self::REVIEWS_QUERY, &[
-                &event.0,
-                &objective.0,
-                &proposal.0,
-                &limit,
-                &offset.unwrap_or(0),
-            ])
-            .await?;
+        let rows = query!(conn, Self::REVIEWS_QUERY, &[
+            &event.0,
+            &objective.0,
+            &proposal.0,
+            &limit,
+            &offset.unwrap_or(0),
+        ])
+        .await?;
 
         let mut reviews = Vec::new();
         for row in rows {
@@ -75,9 +74,7 @@ impl ReviewQueries for EventDB {
             let review_id: i32 = row.try_get("row_id")?;
 
             let mut ratings = Vec::new();
-            let rows = conn
-                .query(Self::RATINGS_PER_REVIEW_QUERY, &[&review_id])
-                .await?;
+            let rows = query!(conn, Self::RATINGS_PER_REVIEW_QUERY, &[&review_id]).await?;
             for row in rows {
                 ratings.push(Rating {
                     review_type: row.try_get("metric")?,
@@ -95,16 +92,15 @@ impl ReviewQueries for EventDB {
     async fn get_review_types(
         &self, event: EventId, objective: ObjectiveId, limit: Option<i64>, offset: Option<i64>,
     ) -> Result<Vec<ReviewType>, Error> {
-        let conn = self.pool.get().await?;
+        let conn = self.connection().await?;
 
-        let rows = conn
-            .query(Self::REVIEW_TYPES_QUERY, &[
-                &event.0,
-                &objective.0,
-                &limit,
-                &offset.unwrap_or(0),
-            ])
-            .await?;
+        let rows = query!(conn, Self::REVIEW_TYPES_QUERY, &[
+            &event.0,
+            &objective.0,
+            &limit,
+            &offset.unwrap_or(0),
+        ])
+        .await?;
         let mut review_types = Vec::new();
         for row in rows {
             let map = row
@@ -7,7 +7,7 @@ use crate::event_db::{
         event::EventId,
         registration::{Delegation, Delegator, RewardAddress, Voter, VoterGroupId, VoterInfo},
     },
-    Error, EventDB,
+    query, Error, EventDB,
 };
 
 #[async_trait]
@@ -87,14 +87,12 @@ impl RegistrationQueries for EventDB {
     async fn get_voter(
         &self, event: &Option<EventId>, voting_key: String, with_delegations: bool,
     ) -> Result<Voter, Error> {
-        let conn = self.pool.get().await?;
+        let conn = self.connection().await?;
 
         let rows = if let Some(event) = event {
-            conn.query(Self::VOTER_BY_EVENT_QUERY, &[&voting_key, &event.0])
-                .await?
+            query!(conn, Self::VOTER_BY_EVENT_QUERY, &[&voting_key, &event.0]).await?
         } else {
-            conn.query(Self::VOTER_BY_LAST_EVENT_QUERY, &[&voting_key])
-                .await?
+            query!(conn, Self::VOTER_BY_LAST_EVENT_QUERY, &[&voting_key]).await?
         };
         let voter = rows
             .first()
@@ -104,14 +102,16 @@ impl RegistrationQueries for EventDB {
         let voting_power = voter.try_get("voting_power")?;
 
         let rows = if let Some(event) = event {
-            conn.query(Self::TOTAL_BY_EVENT_VOTING_QUERY, &[
+            query!(conn, Self::TOTAL_BY_EVENT_VOTING_QUERY, &[
                 &voting_group.0,
                 &event.0,
             ])
             .await?
         } else {
-            conn.query(Self::TOTAL_BY_LAST_EVENT_VOTING_QUERY, &[&voting_group.0])
-                .await?
+            query!(conn, Self::TOTAL_BY_LAST_EVENT_VOTING_QUERY, &[
+                &voting_group.0,
+            ])
+            .await?
         };
 
         let total_voting_power_per_group: i64 = rows
@@ -135,10 +135,13 @@ impl RegistrationQueries for EventDB {
 
         let delegator_addresses = if with_delegations {
             let rows = if let Some(event) = event {
-                conn.query(Self::VOTER_DELEGATORS_LIST_QUERY, &[&voting_key, &event.0])
-                    .await?
+                query!(conn, Self::VOTER_DELEGATORS_LIST_QUERY, &[
+                    &voting_key,
+                    &event.0,
+                ])
+                .await?
             } else {
-                conn.query(Self::VOTER_DELEGATORS_LIST_QUERY, &[
+                query!(conn, Self::VOTER_DELEGATORS_LIST_QUERY, &[
                     &voting_key,
                     &voter.try_get::<_, i32>("event")?,
                 ])
@@ -178,26 +181,27 @@ impl RegistrationQueries for EventDB {
     async fn get_delegator(
         &self, event: &Option<EventId>, stake_public_key: String,
     ) -> Result<Delegator, Error> {
-        let conn = self.pool.get().await?;
+        let conn = self.connection().await?;
         let rows = if let Some(event) = event {
-            conn.query(Self::DELEGATOR_SNAPSHOT_INFO_BY_EVENT_QUERY, &[&event.0])
-                .await?
+            query!(conn, Self::DELEGATOR_SNAPSHOT_INFO_BY_EVENT_QUERY, &[
+                &event.0,
+            ])
+            .await?
         } else {
-            conn.query(Self::DELEGATOR_SNAPSHOT_INFO_BY_LAST_EVENT_QUERY, &[])
-                .await?
+            query!(conn, Self::DELEGATOR_SNAPSHOT_INFO_BY_LAST_EVENT_QUERY, &[]).await?
         };
         let delegator_snapshot_info = rows
             .first()
             .ok_or_else(|| Error::NotFound("Cannot find delegator value".to_string()))?;
 
         let delegation_rows = if let Some(event) = event {
-            conn.query(Self::DELEGATIONS_BY_EVENT_QUERY, &[
+            query!(conn, Self::DELEGATIONS_BY_EVENT_QUERY, &[
                 &stake_public_key,
                 &event.0,
             ])
             .await?
         } else {
-            conn.query(Self::DELEGATIONS_BY_EVENT_QUERY, &[
+            query!(conn, Self::DELEGATIONS_BY_EVENT_QUERY, &[
                 &stake_public_key,
                 &delegator_snapshot_info.try_get::<_, i32>("event")?,
             ])
@@ -218,11 +222,9 @@ impl RegistrationQueries for EventDB {
         }
 
         let rows = if let Some(version) = event {
-            conn.query(Self::TOTAL_POWER_BY_EVENT_QUERY, &[&version.0])
-                .await?
+            query!(conn, Self::TOTAL_POWER_BY_EVENT_QUERY, &[&version.0]).await?
         } else {
-            conn.query(Self::TOTAL_POWER_BY_LAST_EVENT_QUERY, &[])
-                .await?
+            query!(conn, Self::TOTAL_POWER_BY_LAST_EVENT_QUERY, &[]).await?
         };
         let total_power: i64 = rows
             .first()
@@ -132,13 +132,14 @@ impl EventDB {
     async fn search_total(
         &self, search_query: SearchQuery, limit: Option<i64>, offset: Option<i64>,
     ) -> Result<SearchResult, Error> {
-        let conn = self.pool.get().await?;
+        let conn = self.connection().await?;
 
         let rows: Vec<tokio_postgres::Row> = conn
-            .query(&Self::construct_count_query(&search_query), &[
-                &limit,
-                &offset.unwrap_or(0),
-            ])
+            .query_uncached(
+                "SEARCH_TOTAL_QUERY",
+                &Self::construct_count_query(&search_query),
+                &[&limit, &offset.unwrap_or(0)],
+            )
             .await
             .map_err(|e| Error::NotFound(e.to_string()))?;
         let row = rows
@@ -155,12 +156,13 @@ impl EventDB {
     async fn search_events(
         &self, search_query: SearchQuery, limit: Option<i64>, offset: Option<i64>,
     ) -> Result<SearchResult, Error> {
-        let conn = self.pool.get().await?;
+        let conn = self.connection().await?;
         let rows: Vec<tokio_postgres::Row> = conn
-            .query(&Self::construct_query(&search_query), &[
-                &limit,
-                &offset.unwrap_or(0),
-            ])
+            .query_uncached(
+                "SEARCH_EVENTS_QUERY",
+                &Self::construct_query(&search_query),
+                &[&limit, &offset.unwrap_or(0)],
+            )
             .await
             .map_err(|e| Error::NotFound(e.to_string()))?;
 
@@ -199,12 +201,13 @@ impl EventDB {
     async fn search_objectives(
         &self, search_query: SearchQuery, limit: Option<i64>, offset: Option<i64>,
     ) -> Result<SearchResult, Error> {
-        let conn = self.pool.get().await?;
+        let conn = self.connection().await?;
         let rows: Vec<tokio_postgres::Row> = conn
-            .query(&Self::construct_query(&search_query), &[
-                &limit,
-                &offset.unwrap_or(0),
-            ])
+            .query_uncached(
+                "SEARCH_OBJECTIVES_QUERY",
+                &Self::construct_query(&search_query),
+                &[&limit, &offset.unwrap_or(0)],
+            )
             .await
             .map_err(|e| Error::NotFound(e.to_string()))?;
 
@@ -238,13 +241,14 @@ impl EventDB {
     async fn search_proposals(
         &self, search_query: SearchQuery, limit: Option<i64>, offset: Option<i64>,
     ) -> Result<SearchResult, Error> {
-        let conn = self.pool.get().await?;
+        let conn = self.connection().await?;
 
         let rows: Vec<tokio_postgres::Row> = conn
-            .query(&Self::construct_query(&search_query), &[
-                &limit,
-                &offset.unwrap_or(0),
-            ])
+            .query_uncached(
+                "SEARCH_PROPOSALS_QUERY",
+                &Self::construct_query(&search_query),
+                &[&limit, &offset.unwrap_or(0)],
+            )
             .await
             .map_err(|e| Error::NotFound(e.to_string()))?;
 
@@ -9,7 +9,7 @@ use crate::event_db::{
         group::Group,
         vote_plan::Voteplan,
     },
-    Error, EventDB,
+    query, Error, EventDB,
 };
 
 #[async_trait]
@@ -114,9 +114,9 @@ impl VitSSFundQueries for EventDB {
     // TODO(stevenj): https://github.com/input-output-hk/catalyst-voices/issues/68
     #[allow(clippy::too_many_lines)]
     async fn get_fund(&self) -> Result<FundWithNext, Error> {
-        let conn = self.pool.get().await?;
+        let conn = self.connection().await?;
 
-        let rows = conn.query(Self::FUND_QUERY, &[]).await?;
+        let rows = query!(conn, Self::FUND_QUERY, &[]).await?;
         let row = rows
             .first()
             .ok_or_else(|| Error::NotFound("Cannot find fund value".to_string()))?;
@@ -139,7 +139,7 @@ impl VitSSFundQueries for EventDB {
             .and_local_timezone(Utc)
             .unwrap();
 
-        let rows = conn.query(Self::FUND_VOTE_PLANS_QUERY, &[&fund_id]).await?;
+        let rows = query!(conn, Self::FUND_VOTE_PLANS_QUERY, &[&fund_id]).await?;
         let mut chain_vote_plans = Vec::new();
         for row in rows {
             chain_vote_plans.push(Voteplan {
@@ -159,7 +159,7 @@ impl VitSSFundQueries for EventDB {
             });
         }
 
-        let rows = conn.query(Self::FUND_CHALLENGES_QUERY, &[&fund_id]).await?;
+        let rows = query!(conn, Self::FUND_CHALLENGES_QUERY, &[&fund_id]).await?;
         let mut challenges = Vec::new();
         for row in rows {
             challenges.push(Challenge {
@@ -184,7 +184,7 @@ impl VitSSFundQueries for EventDB {
             });
         }
 
-        let rows = conn.query(Self::FUND_GOALS_QUERY, &[&fund_id]).await?;
+        let rows = query!(conn, Self::FUND_GOALS_QUERY, &[&fund_id]).await?;
         let mut goals = Vec::new();
         for row in rows {
             goals.push(Goal {
@@ -194,7 +194,7 @@ impl VitSSFundQueries for EventDB {
             });
         }
 
-        let rows = conn.query(Self::FUND_GROUPS_QUERY, &[&fund_id]).await?;
+        let rows = query!(conn, Self::FUND_GROUPS_QUERY, &[&fund_id]).await?;
         let mut groups = Vec::new();
         for row in rows {
             groups.push(Group {
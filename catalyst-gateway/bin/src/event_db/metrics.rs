@@ -0,0 +1,137 @@
+//! Prometheus metrics of the Event DB queries, statement cache and connection pool.
+//!
+//! They are registered in the default registry, and exported with the HTTP metrics.
+use std::time::Instant;
+
+use bb8::Pool;
+use lazy_static::lazy_static;
+use prometheus::{
+    core::{Collector, Desc},
+    default_registry, exponential_buckets,
+    proto::MetricFamily,
+    register_histogram, register_histogram_vec, register_int_counter_vec, Histogram, HistogramVec,
+    IntCounterVec, IntGaugeVec, Opts,
+};
+
+use crate::event_db::statement_cache::StatementCachingManager;
+
+/// Labels for the query metrics
+const QUERY_METRIC_LABELS: [&str; 1] = ["query"];
+/// Labels for the statement cache metrics
+const STATEMENT_CACHE_METRIC_LABELS: [&str; 2] = ["query", "result"];
+/// Labels for the pool connection metrics
+const POOL_METRIC_LABELS: [&str; 1] = ["state"];
+
+// Prometheus Metrics maintained by the Event DB
+lazy_static! {
+    static ref DB_QUERY_DURATION_MS: HistogramVec = #[allow(clippy::ignored_unit_patterns)]
+    register_histogram_vec!(
+        "db_query_duration_ms",
+        "Duration of Event DB queries in milliseconds",
+        &QUERY_METRIC_LABELS,
+        exponential_buckets(0.1, 2.0, 16).unwrap()
+    )
+    .unwrap();
+    static ref DB_POOL_CHECKOUT_WAIT_MS: Histogram = #[allow(clippy::ignored_unit_patterns)]
+    register_histogram!(
+        "db_pool_checkout_wait_ms",
+        "Time waited for an Event DB connection from the pool in milliseconds",
+        exponential_buckets(0.01, 2.0, 20).unwrap()
+    )
+    .unwrap();
+    static ref DB_STATEMENT_CACHE_COUNT: IntCounterVec = #[allow(clippy::ignored_unit_patterns)]
+    register_int_counter_vec!(
+        "db_statement_cache_count",
+        "Number of Event DB prepared statement cache lookups, by result",
+        &STATEMENT_CACHE_METRIC_LABELS
+    )
+    .unwrap();
+}
+
+/// Milliseconds elapsed since `started`.
+fn elapsed_ms(started: Instant) -> f64 {
+    started.elapsed().as_secs_f64() * 1000.0
+}
+
+/// Record the duration of the query `name`, which was started at `started`.
+pub(crate) fn observe_query(name: &str, started: Instant) {
+    DB_QUERY_DURATION_MS
+        .with_label_values(&[name])
+        .observe(elapsed_ms(started));
+}
+
+/// Record the time waited for a pooled connection, since `started`.
+pub(crate) fn observe_pool_checkout(started: Instant) {
+    DB_POOL_CHECKOUT_WAIT_MS.observe(elapsed_ms(started));
+}
+
+/// Label of the result of a statement cache lookup.
+fn statement_cache_result(hit: bool) -> &'static str {
+    if hit {
+        "hit"
+    } else {
+        "miss"
+    }
+}
+
+/// Count a lookup of the statement of the query `name` in a connection's cache.
+pub(crate) fn count_statement_cache(name: &str, hit: bool) {
+    DB_STATEMENT_CACHE_COUNT
+        .with_label_values(&[name, statement_cache_result(hit)])
+        .inc();
+}
+
+/// Number of hits, or misses, of the statement of the query `name` counted so far.
+#[cfg(test)]
+pub(crate) fn statement_cache_count(name: &str, hit: bool) -> u64 {
+    DB_STATEMENT_CACHE_COUNT
+        .with_label_values(&[name, statement_cache_result(hit)])
+        .get()
+}
+
+/// Collects the in use and idle connections of the pool, when the metrics are scraped.
+struct PoolCollector {
+    /// The pool the connections are counted of.
+    pool: Pool<StatementCachingManager>,
+    /// Number of connections, by state.
+    connections: IntGaugeVec,
+}
+
+impl Collector for PoolCollector {
+    fn desc(&self) -> Vec<&Desc> {
+        self.connections.desc()
+    }
+
+    fn collect(&self) -> Vec<MetricFamily> {
+        let state = self.pool.state();
+        let in_use = state.connections.saturating_sub(state.idle_connections);
+        self.connections
+            .with_label_values(&["in_use"])
+            .set(in_use.into());
+        self.connections
+            .with_label_values(&["idle"])
+            .set(state.idle_connections.into());
+        self.connections.collect()
+    }
+}
+
+/// Export the number of in use and idle connections of `pool`.
+///
+/// Metrics are not essential to the service, so a failure to register them is only
+/// logged.
+pub(crate) fn register_pool_metrics(pool: Pool<StatementCachingManager>) {
+    let registered = IntGaugeVec::new(
+        Opts::new(
+            "db_pool_connections",
+            "Number of Event DB connections in the pool, by state",
+        ),
+        &POOL_METRIC_LABELS,
+    )
+    .and_then(|connections| {
+        default_registry().register(Box::new(PoolCollector { pool, connections }))
+    });
+
+    if let Err(err) = registered {
+        tracing::warn!(error = err.to_string(), "cannot register DB pool metrics");
+    }
+}
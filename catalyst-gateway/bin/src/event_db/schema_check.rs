@@ -1,26 +1,170 @@
 //! Check if the schema is up-to-date.
+//!
+//! The schema version is watched in the background: `refinery_schema_history` has a
+//! trigger which notifies the `schema_version` channel with the current version on every
+//! change (see the `V10__schema_version_notify` migration), and the version is also
+//! polled at an interval, in case a notification is missed while the listener reconnects.
 
-use crate::event_db::{Error, EventDB, DATABASE_SCHEMA_VERSION};
+use std::{future::poll_fn, sync::Arc, time::Duration};
+
+use tokio::{
+    sync::mpsc::{unbounded_channel, UnboundedReceiver},
+    task::JoinHandle,
+    time::{interval, MissedTickBehavior},
+};
+use tokio_postgres::{AsyncMessage, Client, NoTls};
+
+use crate::event_db::{query_one, Error, EventDB, DATABASE_SCHEMA_VERSION};
+
+/// Channel notified with the current schema version when `refinery_schema_history`
+/// changes.
+const SCHEMA_VERSION_CHANNEL: &str = "schema_version";
+
+/// Check a schema version is the one expected by this crate.
+fn check_version(current_ver: i32) -> Result<i32, Error> {
+    if current_ver == DATABASE_SCHEMA_VERSION {
+        Ok(current_ver)
+    } else {
+        Err(Error::MismatchedSchema {
+            was: current_ver,
+            expected: DATABASE_SCHEMA_VERSION,
+        })
+    }
+}
+
+/// A dedicated connection listening on the `schema_version` channel.
+struct SchemaVersionListener {
+    /// Keeps the connection open, it is closed when the client is dropped.
+    _client: Client,
+    /// Payloads of the notifications, closed when the connection is lost.
+    notifications: UnboundedReceiver<String>,
+}
+
+impl SchemaVersionListener {
+    /// The payload of the next notification, never returns if there is no listener.
+    async fn next_notification(listener: &mut Option<Self>) -> Option<String> {
+        match listener {
+            Some(listener) => listener.notifications.recv().await,
+            None => std::future::pending().await,
+        }
+    }
+}
 
 impl EventDB {
+    /// The current schema version.
+    const SCHEMA_VERSION_QUERY: &'static str = "SELECT MAX(version) FROM refinery_schema_history;";
+
     /// Check the schema version.
     /// return the current schema version if its current.
     /// Otherwise return an error.
     pub(crate) async fn schema_version_check(&self) -> Result<i32, Error> {
-        let conn = self.pool.get().await?;
-        let schema_check = conn
-            .query_one("SELECT MAX(version) FROM refinery_schema_history;", &[])
+        let conn = self.connection().await?;
+        let schema_check = query_one!(conn, Self::SCHEMA_VERSION_QUERY, &[]).await?;
+
+        check_version(schema_check.try_get("max")?)
+    }
+
+    /// Open a connection listening for schema version changes.
+    ///
+    /// Notifications can not be received on pooled connections, so this is a connection
+    /// of its own.
+    async fn listen_schema_version(&self) -> Result<SchemaVersionListener, Error> {
+        let (client, mut connection) = self.config.connect(NoTls).await?;
+        let (sender, notifications) = unbounded_channel();
+
+        // The connection only makes progress while its messages are polled.
+        tokio::spawn(async move {
+            while let Some(message) = poll_fn(|cx| connection.poll_message(cx)).await {
+                match message {
+                    Ok(AsyncMessage::Notification(notification)) => {
+                        if sender.send(notification.payload().to_owned()).is_err() {
+                            break;
+                        }
+                    },
+                    Ok(_) => {},
+                    Err(err) => {
+                        tracing::warn!(
+                            error = err.to_string(),
+                            "DB schema version listener connection failed"
+                        );
+                        break;
+                    },
+                }
+            }
+        });
+
+        client
+            .batch_execute(&format!("LISTEN {SCHEMA_VERSION_CHANNEL};"))
             .await?;
 
-        let current_ver = schema_check.try_get("max")?;
+        Ok(SchemaVersionListener {
+            _client: client,
+            notifications,
+        })
+    }
 
-        if current_ver == DATABASE_SCHEMA_VERSION {
-            Ok(current_ver)
-        } else {
-            Err(Error::MismatchedSchema {
-                was: current_ver,
-                expected: DATABASE_SCHEMA_VERSION,
-            })
+    /// Check the schema version carried by a notification, querying it if the payload is
+    /// not a version.
+    async fn notified_version_check(&self, payload: &str) -> Result<i32, Error> {
+        match payload.parse() {
+            Ok(current_ver) => check_version(current_ver),
+            Err(_) => self.schema_version_check().await,
         }
     }
+
+    /// Watch the schema version in the background, until the task is aborted.
+    ///
+    /// `on_check` is called with the result of every check: as soon as a change is
+    /// notified, and every `poll_interval` in any case.  If the schema version can not
+    /// be listened for, `on_check` is called with the error, and listening is retried
+    /// every `poll_interval`.
+    pub(crate) fn watch_schema_version<F>(
+        self: &Arc<Self>, poll_interval: Duration, on_check: F,
+    ) -> JoinHandle<()>
+    where F: Fn(Result<i32, Error>) + Send + Sync + 'static {
+        let db = self.clone();
+        tokio::spawn(async move {
+            let mut poll = interval(poll_interval);
+            poll.set_missed_tick_behavior(MissedTickBehavior::Delay);
+            let mut listener: Option<SchemaVersionListener> = None;
+
+            loop {
+                if listener.is_none() {
+                    match db.listen_schema_version().await {
+                        Ok(new_listener) => {
+                            listener = Some(new_listener);
+                            // A change may have been missed while not listening.
+                            on_check(db.schema_version_check().await);
+                        },
+                        Err(err) => {
+                            tracing::warn!(
+                                error = err.to_string(),
+                                "cannot listen for DB schema version changes"
+                            );
+                            // The DB is most likely unreachable, retry at the next poll.
+                            on_check(Err(err));
+                            poll.tick().await;
+                            continue;
+                        },
+                    }
+                }
+
+                let notified = tokio::select! {
+                    payload = SchemaVersionListener::next_notification(&mut listener) => {
+                        Some(payload)
+                    },
+                    _ = poll.tick() => None,
+                };
+
+                match notified {
+                    Some(Some(payload)) => on_check(db.notified_version_check(&payload).await),
+                    Some(None) => {
+                        tracing::warn!("DB schema version listener connection lost, reconnecting");
+                        listener = None;
+                    },
+                    None => on_check(db.schema_version_check().await),
+                }
+            }
+        })
+    }
 }
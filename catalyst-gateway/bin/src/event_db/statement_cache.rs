@@ -0,0 +1,197 @@
+//! Pooled connections which prepare each of their statements once.
+//!
+//! Prepared statements belong to the connection they were prepared on, so every pooled
+//! connection keeps a cache of its own.  Only `'static` SQL is cached: it is the fixed
+//! set of queries of this crate, while dynamically built SQL could grow the cache without
+//! bound.
+use std::{
+    collections::HashMap,
+    sync::{Mutex, PoisonError},
+};
+
+use async_trait::async_trait;
+use bb8::ManageConnection;
+use bb8_postgres::PostgresConnectionManager;
+use tokio_postgres::{types::ToSql, Client, NoTls, Row, Statement};
+
+use crate::event_db::metrics;
+
+/// Connects the clients of the pool, wrapping [`PostgresConnectionManager`].
+pub(crate) struct StatementCachingManager(PostgresConnectionManager<NoTls>);
+
+impl StatementCachingManager {
+    /// Create a new manager of connections configured by `config`.
+    pub(crate) fn new(config: tokio_postgres::Config) -> Self {
+        Self(PostgresConnectionManager::new(config, NoTls))
+    }
+}
+
+#[async_trait]
+impl ManageConnection for StatementCachingManager {
+    type Connection = StatementCachingClient;
+    type Error = tokio_postgres::Error;
+
+    async fn connect(&self) -> Result<Self::Connection, Self::Error> {
+        Ok(StatementCachingClient {
+            client: self.0.connect().await?,
+            statements: Mutex::default(),
+        })
+    }
+
+    async fn is_valid(&self, conn: &mut Self::Connection) -> Result<(), Self::Error> {
+        self.0.is_valid(&mut conn.client).await
+    }
+
+    fn has_broken(&self, conn: &mut Self::Connection) -> bool {
+        self.0.has_broken(&mut conn.client)
+    }
+}
+
+/// A client and the statements prepared on its connection, by SQL.
+pub(crate) struct StatementCachingClient {
+    /// The connection's client.
+    client: Client,
+    /// Statements prepared on this connection.
+    /// Only locked to look up or insert a statement, never across an `await`.
+    statements: Mutex<HashMap<&'static str, Statement>>,
+}
+
+impl StatementCachingClient {
+    /// The cached statement of `sql`.
+    fn cached(&self, sql: &'static str) -> Option<Statement> {
+        self.statements
+            .lock()
+            .unwrap_or_else(PoisonError::into_inner)
+            .get(sql)
+            .cloned()
+    }
+
+    /// Get the statement of the query `name`, preparing it if it is not cached yet.
+    async fn prepare_cached(
+        &self, name: &str, sql: &'static str,
+    ) -> Result<Statement, tokio_postgres::Error> {
+        if let Some(statement) = self.cached(sql) {
+            metrics::count_statement_cache(name, true);
+            return Ok(statement);
+        }
+        metrics::count_statement_cache(name, false);
+
+        let statement = self.client.prepare(sql).await?;
+        self.statements
+            .lock()
+            .unwrap_or_else(PoisonError::into_inner)
+            .insert(sql, statement.clone());
+        Ok(statement)
+    }
+
+    /// Forget the statement of `sql` if the database failed to run it, it is prepared
+    /// again on its next use.
+    ///
+    /// A statement can become invalid, for example if the schema changes under it.
+    fn evict_on_db_error<T>(&self, sql: &'static str, result: &Result<T, tokio_postgres::Error>) {
+        if result.as_ref().is_err_and(|err| err.code().is_some()) {
+            self.statements
+                .lock()
+                .unwrap_or_else(PoisonError::into_inner)
+                .remove(sql);
+        }
+    }
+
+    /// Run the query `name` with its cached statement, returns the resulting rows.
+    pub(crate) async fn query(
+        &self, name: &str, sql: &'static str, params: &[&(dyn ToSql + Sync)],
+    ) -> Result<Vec<Row>, tokio_postgres::Error> {
+        let statement = self.prepare_cached(name, sql).await?;
+        let rows = self.client.query(&statement, params).await;
+        self.evict_on_db_error(sql, &rows);
+        rows
+    }
+
+    /// Run the query `name` with its cached statement, which returns exactly one row.
+    pub(crate) async fn query_one(
+        &self, name: &str, sql: &'static str, params: &[&(dyn ToSql + Sync)],
+    ) -> Result<Row, tokio_postgres::Error> {
+        let statement = self.prepare_cached(name, sql).await?;
+        let row = self.client.query_one(&statement, params).await;
+        self.evict_on_db_error(sql, &row);
+        row
+    }
+
+    /// Run a dynamically built query, which is prepared on every call.
+    pub(crate) async fn query_uncached(
+        &self, sql: &str, params: &[&(dyn ToSql + Sync)],
+    ) -> Result<Vec<Row>, tokio_postgres::Error> {
+        self.client.query(sql, params).await
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use std::str::FromStr;
+
+    use super::*;
+
+    /// Connect a client to the database of `DATABASE_URL`, outside of any pool.
+    async fn connect() -> StatementCachingClient {
+        let database_url = std::env::var("DATABASE_URL").expect("DATABASE_URL is not set");
+        let config = tokio_postgres::Config::from_str(&database_url).expect("Invalid DATABASE_URL");
+        StatementCachingManager::new(config)
+            .connect()
+            .await
+            .expect("Failed to connect to the database")
+    }
+
+    #[tokio::test]
+    #[ignore = "needs a database, set DATABASE_URL"]
+    async fn statement_is_prepared_once_per_connection() {
+        // Queries are named after the test, the metrics are shared by all the tests.
+        const NAME: &str = "TEST_PREPARED_ONCE_QUERY";
+        const SQL: &str = "SELECT $1::int4 + 1 AS next;";
+        let client = connect().await;
+
+        let first = client
+            .query_one(NAME, SQL, &[&1_i32])
+            .await
+            .expect("First query failed");
+        let second = client
+            .query_one(NAME, SQL, &[&2_i32])
+            .await
+            .expect("Second query failed");
+
+        assert_eq!(first.get::<_, i32>("next"), 2);
+        assert_eq!(second.get::<_, i32>("next"), 3);
+        assert_eq!(metrics::statement_cache_count(NAME, false), 1);
+        assert_eq!(metrics::statement_cache_count(NAME, true), 1);
+    }
+
+    #[tokio::test]
+    #[ignore = "needs a database, set DATABASE_URL"]
+    async fn statement_is_evicted_on_db_error() {
+        const NAME: &str = "TEST_EVICTED_QUERY";
+        const SQL: &str = "SELECT 1 / $1::int4 AS quotient;";
+        let client = connect().await;
+
+        client
+            .query_one(NAME, SQL, &[&1_i32])
+            .await
+            .expect("Query failed");
+        assert!(client.cached(SQL).is_some());
+
+        // Division by zero is an error of the database, raised when the statement runs.
+        let err = client
+            .query_one(NAME, SQL, &[&0_i32])
+            .await
+            .expect_err("Division by zero succeeded");
+        assert!(err.code().is_some());
+        assert!(client.cached(SQL).is_none());
+
+        // Its next use prepares it again.
+        client
+            .query_one(NAME, SQL, &[&1_i32])
+            .await
+            .expect("Query failed");
+        assert!(client.cached(SQL).is_some());
+        assert_eq!(metrics::statement_cache_count(NAME, false), 2);
+        assert_eq!(metrics::statement_cache_count(NAME, true), 1);
+    }
+}
@@ -50,7 +50,6 @@ impl HealthApi {
     /// ## Responses
     ///
     /// * 204 No Content - Service is Ready and can serve requests.
-    /// * 500 Server Error - If anything within this function fails unexpectedly.
     /// * 503 Service Unavailable - Service is not ready, requests to other
     /// endpoints should not be sent until the service becomes ready.
     async fn ready_get(&self, state: Data<&Arc<State>>) -> ready_get::AllResponses {
@@ -5,16 +5,12 @@ use std::sync::Arc;
 use poem::web::Data;
 use poem_extensions::{
     response,
-    UniResponse::{T204, T500, T503},
+    UniResponse::{T204, T503},
 };
 
 use crate::{
-    cli::Error,
-    event_db::error::Error as DBError,
     service::common::responses::{
-        resp_2xx::NoContent,
-        resp_4xx::ApiValidationError,
-        resp_5xx::{server_error, ServerError, ServiceUnavailable},
+        resp_2xx::NoContent, resp_4xx::ApiValidationError, resp_5xx::ServiceUnavailable,
     },
     state::{SchemaVersionStatus, State},
 };
@@ -23,7 +19,6 @@ use crate::{
 pub(crate) type AllResponses = response! {
     204: NoContent,
     400: ApiValidationError,
-    500: ServerError,
     503: ServiceUnavailable,
 };
 
@@ -45,30 +40,29 @@ pub(crate) type AllResponses = response! {
 /// This would let the load balancer shift traffic to other instances of this
 /// service that are ready.
 ///
+/// The service is not ready while the DB schema version does not match the one it
+/// expects, or can not be checked because the DB is unreachable.  The schema version
+/// status is kept current in the background, so probes never query the DB.
+///
 /// ## Responses
 ///
 /// * 204 No Content - Service is Ready to serve requests.
 /// * 400 API Validation Error
-/// * 500 Server Error - If anything within this function fails unexpectedly. (Possible
-///   but unlikely)
 /// * 503 Service Unavailable - Service is not ready, do not send other requests.
+#[allow(clippy::unused_async)]
 pub(crate) async fn endpoint(state: Data<&Arc<State>>) -> AllResponses {
-    match state.schema_version_check().await {
-        Ok(_) => {
+    match state.schema_version_status() {
+        SchemaVersionStatus::Ok => {
             tracing::debug!("DB schema version status ok");
-            state.set_schema_version_status(SchemaVersionStatus::Ok);
             T204(NoContent)
         },
-        Err(Error::EventDb(DBError::MismatchedSchema { was, expected })) => {
-            tracing::error!(
-                expected = expected,
-                current = was,
-                "DB schema version status mismatch"
-            );
-            state.set_schema_version_status(SchemaVersionStatus::Mismatch);
+        SchemaVersionStatus::Mismatch => {
+            tracing::debug!("DB schema version status mismatch");
+            T503(ServiceUnavailable)
+        },
+        SchemaVersionStatus::Unavailable => {
+            tracing::debug!("DB schema version status unavailable");
             T503(ServiceUnavailable)
         },
-        Err(Error::EventDb(DBError::TimedOut)) => T503(ServiceUnavailable),
-        Err(err) => T500(server_error!("{}", err.to_string())),
     }
 }
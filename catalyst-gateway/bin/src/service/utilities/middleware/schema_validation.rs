@@ -6,6 +6,9 @@
 //!
 //! This middleware checks the `State.schema_version_status` value, if it is Ok,
 //! the wrapped endpoint is called and its response is returned.
+//!
+//! The value is kept current by the schema version watcher, and is read without locking
+//! or querying the DB.
 
 use std::sync::Arc;
 
@@ -44,7 +47,7 @@ impl<E: Endpoint> Endpoint for SchemaVersionValidationImpl<E> {
             // if so, return the `ServiceUnavailable` error, which implements
             // `ResponseError`, with status code `503`.
             // Otherwise, return the endpoint as usual.
-            if state.is_schema_version_status(&SchemaVersionStatus::Mismatch) {
+            if state.is_schema_version_status(SchemaVersionStatus::Mismatch) {
                 return Err(ServiceUnavailable.into());
             }
         }
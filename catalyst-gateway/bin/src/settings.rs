@@ -35,6 +35,15 @@ const API_HOST_NAMES_DEFAULT: &str = "https://api.prod.projectcatalyst.io";
 /// Default `API_URL_PREFIX` used in development.
 const API_URL_PREFIX_DEFAULT: &str = "/api";
 
+/// Default interval, in seconds, of the DB schema version poll.
+const SCHEMA_VERSION_POLL_INTERVAL_DEFAULT: &str = "30";
+
+/// Default maximum number of connections of the DB pool.
+const DB_MAX_CONNECTIONS_DEFAULT: &str = "10";
+
+/// Default time, in seconds, to wait for a DB connection from the pool.
+const DB_CONNECTION_TIMEOUT_DEFAULT: &str = "30";
+
 /// Settings for the application.
 ///
 /// This struct represents the configuration settings for the application.
@@ -51,11 +60,54 @@ pub(crate) struct ServiceSettings {
     #[clap(long, default_value = LOG_LEVEL_DEFAULT)]
     pub(crate) log_level: LogLevel,
 
+    /// Interval, in seconds, at which the DB schema version is polled.
+    /// Changes are noticed as soon as they are notified by the DB, the poll only catches
+    /// changes missed while the notification listener is reconnecting.
+    #[clap(
+        long,
+        default_value = SCHEMA_VERSION_POLL_INTERVAL_DEFAULT,
+        env = "SCHEMA_VERSION_POLL_INTERVAL",
+        value_parser = clap::value_parser!(u64).range(1..)
+    )]
+    pub(crate) schema_version_poll_interval: u64,
+
+    /// DB connection pool settings.
+    #[clap(flatten)]
+    pub(crate) db_pool_settings: DbPoolSettings,
+
     /// Docs settings.
     #[clap(flatten)]
     pub(crate) docs_settings: DocsSettings,
 }
 
+/// Settings of the event db connection pool.
+#[derive(Args, Clone)]
+pub(crate) struct DbPoolSettings {
+    /// Maximum number of connections the pool opens to the event db.
+    #[clap(
+        long,
+        default_value = DB_MAX_CONNECTIONS_DEFAULT,
+        env = "DB_MAX_CONNECTIONS",
+        value_parser = clap::value_parser!(u32).range(1..)
+    )]
+    pub(crate) db_max_connections: u32,
+
+    /// Minimum number of idle connections the pool keeps open to the event db.
+    /// They are opened at startup, before the service starts serving requests.
+    /// If omitted, connections are only opened when they are needed.
+    #[clap(long, env = "DB_MIN_IDLE_CONNECTIONS")]
+    pub(crate) db_min_idle_connections: Option<u32>,
+
+    /// Time, in seconds, to wait for a connection from the pool before failing.
+    #[clap(
+        long,
+        default_value = DB_CONNECTION_TIMEOUT_DEFAULT,
+        env = "DB_CONNECTION_TIMEOUT",
+        value_parser = clap::value_parser!(u64).range(1..)
+    )]
+    pub(crate) db_connection_timeout: u64,
+}
+
 /// Settings specifies `OpenAPI` docs generation.
 #[derive(Args, Clone)]
 pub(crate) struct DocsSettings {
@@ -1,20 +1,45 @@
 //! Shared state used by all endpoints.
-use std::sync::{Arc, Mutex, MutexGuard};
+use std::{
+    sync::{
+        atomic::{AtomicU8, Ordering},
+        Arc,
+    },
+    time::Duration,
+};
+
+use tokio::task::JoinHandle;
 
 use crate::{
     cli::Error,
-    event_db::{establish_connection, EventDB},
+    event_db::{error::Error as DBError, establish_connection, EventDB},
     service::Error as ServiceError,
+    settings::DbPoolSettings,
 };
 
 /// The status of the expected DB schema version.
-#[derive(Debug, PartialEq, Eq)]
+#[derive(Debug, PartialEq, Eq, Clone, Copy)]
+#[repr(u8)]
 pub(crate) enum SchemaVersionStatus {
     /// The current DB schema version matches what is expected.
     Ok,
     /// There is a mismatch between the current DB schema version
     /// and what is expected.
     Mismatch,
+    /// The DB schema version could not be checked, the DB is unreachable or it was
+    /// not checked yet.
+    Unavailable,
+}
+
+impl From<u8> for SchemaVersionStatus {
+    fn from(value: u8) -> Self {
+        if value == Self::Ok as u8 {
+            Self::Ok
+        } else if value == Self::Mismatch as u8 {
+            Self::Mismatch
+        } else {
+            Self::Unavailable
+        }
+    }
 }
 
 /// Global State of the service
@@ -27,21 +52,64 @@ pub(crate) struct State {
     // Private need to get it with a function.
     event_db: Arc<EventDB>, /* This needs to be obsoleted, we want the DB
                              * to be able to be down. */
-    /// Status of the last DB schema version check.
-    schema_version_status: Mutex<SchemaVersionStatus>,
+    /// Status of the last DB schema version check, kept current by the schema version
+    /// watcher and read without locking on every request.
+    schema_version_status: Arc<AtomicU8>,
+    /// The background task watching the DB schema version.
+    schema_version_watcher: JoinHandle<()>,
 }
 
 impl State {
-    /// Create a new global [`State`]
-    pub(crate) async fn new(database_url: Option<String>) -> Result<Self, Error> {
-        // Get a configured pool to the Database, runs schema version check internally.
-        let event_db = Arc::new(establish_connection(database_url, false).await?);
+    /// Create a new global [`State`], with a pool of connections to the DB configured by
+    /// `db_pool_settings`, and start watching the DB schema version, polling it every
+    /// `schema_version_poll_interval` in case a change notification is missed.
+    pub(crate) async fn new(
+        database_url: Option<String>, db_pool_settings: &DbPoolSettings,
+        schema_version_poll_interval: Duration,
+    ) -> Result<Self, Error> {
+        // Get a configured pool to the Database, the schema version is checked by the
+        // watcher.
+        let event_db = Arc::new(establish_connection(database_url, db_pool_settings, false).await?);
+
+        // The schema version is unknown until the watcher's first check, which it makes as
+        // soon as it starts.
+        let schema_version_status = Arc::new(AtomicU8::new(SchemaVersionStatus::Unavailable as u8));
+
+        let status = schema_version_status.clone();
+        let schema_version_watcher =
+            event_db.watch_schema_version(schema_version_poll_interval, move |result| {
+                match result {
+                    Ok(_) => {
+                        set_schema_version_status(&status, SchemaVersionStatus::Ok);
+                    },
+                    Err(DBError::MismatchedSchema { was, expected }) => {
+                        if set_schema_version_status(&status, SchemaVersionStatus::Mismatch)
+                            != SchemaVersionStatus::Mismatch
+                        {
+                            tracing::error!(
+                                expected = expected,
+                                current = was,
+                                "DB schema version status mismatch"
+                            );
+                        }
+                    },
+                    Err(err) => {
+                        if set_schema_version_status(&status, SchemaVersionStatus::Unavailable)
+                            != SchemaVersionStatus::Unavailable
+                        {
+                            tracing::warn!(
+                                error = err.to_string(),
+                                "DB schema version check failed"
+                            );
+                        }
+                    },
+                }
+            });
 
         let state = Self {
             event_db,
-            // It is safe to assume that the schema version matches if `event_db` doesn't fail,
-            // due to the interior check ran by `establish_connection`.
-            schema_version_status: Mutex::new(SchemaVersionStatus::Ok),
+            schema_version_status,
+            schema_version_watcher,
         };
 
         // We don't care if this succeeds or not.
@@ -54,48 +122,40 @@ impl State {
     /// Get the reference to the database connection pool for `EventDB`.
     #[allow(dead_code)]
     pub(crate) fn event_db(&self) -> Result<Arc<EventDB>, Error> {
-        let guard = self.schema_version_status_lock();
-        match *guard {
-            SchemaVersionStatus::Ok => Ok(self.event_db.clone()),
+        match self.schema_version_status() {
+            // The DB may be reachable again before the next check, queries report their own
+            // errors if it is not.
+            SchemaVersionStatus::Ok | SchemaVersionStatus::Unavailable => Ok(self.event_db.clone()),
             SchemaVersionStatus::Mismatch => Err(ServiceError::SchemaVersionMismatch.into()),
         }
     }
 
-    /// Check the DB schema version matches the one expected by the service.
-    pub(crate) async fn schema_version_check(&self) -> Result<i32, Error> {
-        Ok(self.event_db.schema_version_check().await?)
+    /// The status of the last DB schema version check.
+    pub(crate) fn schema_version_status(&self) -> SchemaVersionStatus {
+        self.schema_version_status.load(Ordering::Acquire).into()
     }
 
     /// Compare the `State`'s inner value with a given `&SchemaVersionStatus`, returns
     /// `bool`.
-    pub(crate) fn is_schema_version_status(&self, svs: &SchemaVersionStatus) -> bool {
-        let guard = self.schema_version_status_lock();
-        &*guard == svs
+    pub(crate) fn is_schema_version_status(&self, svs: SchemaVersionStatus) -> bool {
+        self.schema_version_status() == svs
     }
+}
+
+impl Drop for State {
+    fn drop(&mut self) {
+        self.schema_version_watcher.abort();
+    }
+}
 
-    /// Set the state's `SchemaVersionStatus`.
-    pub(crate) fn set_schema_version_status(&self, svs: SchemaVersionStatus) {
-        let mut guard = self.schema_version_status_lock();
+/// Set the `SchemaVersionStatus`, returns the previous status.
+fn set_schema_version_status(status: &AtomicU8, svs: SchemaVersionStatus) -> SchemaVersionStatus {
+    let previous = status.swap(svs as u8, Ordering::AcqRel).into();
+    if previous != svs {
         tracing::debug!(
             status = format!("{:?}", svs),
             "db schema version status was set"
         );
-        *guard = svs;
-    }
-
-    /// Get the `MutexGuard<SchemaVersionStatus>` from inner the variable.
-    ///
-    /// Handle poisoned mutex by recovering the guard, and tracing the error.
-    fn schema_version_status_lock(&self) -> MutexGuard<SchemaVersionStatus> {
-        match self.schema_version_status.lock() {
-            Ok(guard) => guard,
-            Err(poisoned) => {
-                tracing::error!(
-                    error = format!("{:?}", poisoned),
-                    "recovering DB schema version status fom poisoned mutex"
-                );
-                poisoned.into_inner()
-            },
-        }
     }
+    previous
 }
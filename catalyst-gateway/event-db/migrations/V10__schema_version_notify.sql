@@ -0,0 +1,28 @@
+-- Catalyst Event Database
+
+-- Title : Schema Version Change Notifications
+
+-- Notify the `schema_version` channel with the current schema version whenever
+-- `refinery_schema_history` changes, so services can notice a schema version change
+-- without polling for it.
+-- The notification is only delivered once the change is committed.
+
+CREATE OR REPLACE FUNCTION notify_schema_version() RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM pg_notify(
+    'schema_version',
+    COALESCE((SELECT MAX(version) FROM refinery_schema_history)::TEXT, '')
+  );
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION notify_schema_version IS
+'Notify the `schema_version` channel with the current schema version (the empty string if there is none).';
+
+CREATE TRIGGER refinery_schema_history_notify
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON refinery_schema_history
+FOR EACH STATEMENT EXECUTE FUNCTION notify_schema_version();
+
+COMMENT ON TRIGGER refinery_schema_history_notify ON refinery_schema_history IS
+'Notify the `schema_version` channel of every schema version change.';
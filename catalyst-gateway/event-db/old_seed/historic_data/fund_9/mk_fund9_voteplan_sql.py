@@ -1,69 +1,25 @@
-import argparse
-import sqlite3
-
-
-event_id = 9
-
-
-def voteplans_sql(sqlite3_con: sqlite3.Connection) -> str:
-    lines = []
-    cur = sqlite3_con.cursor()
-
-    rows = cur.execute(
-        "SELECT chain_voteplan_id, chain_voteplan_payload, chain_vote_encryption_key FROM voteplans"
-    ).fetchall()
-    for row in rows:
-        id = row[0]
-        category = row[1]
-        encryption_key = row[2]
+#!/usr/bin/env python3
+"""
+Extract the voteplans from the Fund 9 sqlite3 database, and generate the SQL loading them
+and linking them to the proposals in the event DB.
 
-        lines.append(
-            f"""
-DELETE FROM voteplan WHERE id = '{id}';
-INSERT INTO voteplan (objective_id, id, category, encryption_key)
-SELECT
-    MIN(row_id),
-    '{id}',
-    '{category}',
-    '{encryption_key}'
-FROM objective;
-""".strip()
-        )
+Both tables are copied into staging tables and inserted with a single join each, see
+`fund_seed/pgcopy.py`.  Run after the Fund 9 data itself has been loaded.
+"""
 
-    cur.close()
-
-    return "\n".join(lines)
-
-
-def proposal_voteplans_sql(sqlite3_con: sqlite3.Connection) -> str:
-    lines = []
-    cur = sqlite3_con.cursor()
-
-    for row in cur.execute("SELECT proposal_id FROM proposals").fetchall():
-        proposal_id = row[0]
-
-        row = cur.execute(
-            "SELECT chain_voteplan_id, chain_proposal_index FROM proposals WHERE proposal_id = $1",
-            (str(proposal_id),),
-        ).fetchone()
+import argparse
+import sqlite3
+import sys
+from pathlib import Path
 
-        chain_voteplan_id = row[0]
-        chain_proposal_index = row[1]
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-        lines.append(
-            f"""
-INSERT INTO proposal_voteplan (proposal_id, voteplan_id, bb_proposal_index)
-SELECT
-    (SELECT row_id FROM proposal WHERE id = {proposal_id}),
-    row_id,
-    {chain_proposal_index}
-FROM voteplan
-WHERE id = '{chain_voteplan_id}';
-""".strip()
-        )
+from fund_seed.__main__ import is_file  # noqa: E402
+from fund_seed.funds import FUNDS  # noqa: E402
+from fund_seed.pgcopy import voteplan_copy  # noqa: E402
+from fund_seed.writer import write_chunks  # noqa: E402
 
-    cur.close()
-    return "\n".join(lines)
+event_id = 9
 
 
 def main():
@@ -73,12 +29,13 @@ def main():
     parser.add_argument(
         "filename",
         help=f"Sqlite3 Fund{event_id} file to read.",
+        type=is_file,
     )
 
     args = parser.parse_args()
 
     con = sqlite3.connect(args.filename)
-    print(voteplans_sql(con) + "\n\n" + proposal_voteplans_sql(con))
+    write_chunks(voteplan_copy(FUNDS[event_id], con), sys.stdout)
     con.close()
 
 
@@ -0,0 +1,13 @@
+"""
+Generate the event-db seed data for the historic Catalyst funds.
+
+One engine converts every fund database, the per fund differences are kept as data in
+`fund_seed.funds`.
+"""
+
+from .funds import FUNDS, FundSpec
+from .pgcopy import fund_copy
+from .sql import fund_sql
+from .writer import write_chunks
+
+__all__ = ["FUNDS", "FundSpec", "fund_copy", "fund_sql", "write_chunks"]
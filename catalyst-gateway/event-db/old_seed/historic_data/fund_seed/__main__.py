@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Generate the SQL seed files for all historic funds at once.
+
+Each fund is converted in its own worker process, so regenerating the historic data
+scales with the number of available cores.
+
+    python3 -m fund_seed                      # every fund with a database present
+    python3 -m fund_seed --fund 4 --fund 5    # only some funds
+
+Funds whose database, `block0.bin`, generator and options did not change since they were
+last generated are skipped, see `fund_seed.manifest`.  `--force` regenerates them anyway.
+
+`--stats` records the time, memory and rows of every stage of every fund, see `fund_seed.instrument`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Iterator
+
+from .block0 import fund_block0
+from .funds import FUNDS
+from .instrument import StageStats, add_stats_args, instrumented, write_stats
+from .manifest import MANIFEST, Manifest, fund_digest
+from .pgcopy import BINARY, TEXT, fund_copy
+from .sql import fund_sql
+from .writer import write_chunks
+
+# Output formats.
+INSERT = "insert"
+COPY = "copy"
+COPY_BINARY = "copy-binary"
+FORMATS = (INSERT, COPY, COPY_BINARY)
+
+HISTORIC_DATA = Path(__file__).resolve().parent.parent
+
+
+def is_dir(dirpath: str | Path):
+    """Check if the directory is a directory."""
+    real_dir = Path(dirpath)
+    if real_dir.exists() and real_dir.is_dir():
+        return real_dir
+    raise argparse.ArgumentTypeError(f"{dirpath} is not a directory.")
+
+
+def is_file(filename: str):
+    """Does the path exist and is it a file"""
+    real_filename = Path(filename)
+    is_dir(real_filename.parent)
+    if real_filename.is_dir():
+        raise argparse.ArgumentTypeError(f"{filename} is not a file.")
+    return real_filename
+
+
+def is_fund(event_id: str) -> int:
+    """Is this a fund we know how to convert."""
+    fund = int(event_id)
+    if fund not in FUNDS:
+        raise argparse.ArgumentTypeError(f"Fund {fund} is not a known historic fund.")
+    return fund
+
+
+def fund_database(data_dir: Path, event_id: int) -> Path:
+    """The default location of a funds SQLite3 database."""
+    return data_dir / f"fund_{event_id}" / f"fund{event_id}_database_encrypted.sqlite3"
+
+
+def fund_script(
+    event_id: int,
+    con: sqlite3.Connection,
+    fmt: str = INSERT,
+    data_dir: Path | None = None,
+    data_prefix: str = "",
+    block0: Path | None = None,
+) -> Iterator[str]:
+    """Yield the SQL script for a fund in the requested output format."""
+    spec = FUNDS[event_id]
+    if fmt == COPY:
+        return fund_copy(spec, con, TEXT, block0=block0)
+    if fmt == COPY_BINARY:
+        return fund_copy(spec, con, BINARY, data_dir, data_prefix, block0)
+    return fund_sql(spec, con, block0)
+
+
+def fund_outputs(event_id: int, out_path: Path, fmt: str = INSERT) -> list[Path]:
+    """Every file written for a fund."""
+    outputs = [out_path]
+    if fmt == COPY_BINARY:
+        outputs.extend(sorted(out_path.parent.glob(f"fund_{event_id}.*.copy")))
+    return outputs
+
+
+def generate_fund(
+    event_id: int,
+    db_path: Path,
+    out_path: Path,
+    fmt: str = INSERT,
+    data_prefix: str = "historic_data",
+    stats: bool = False,
+    profile_dir: Path | None = None,
+) -> tuple[int, Path, int, float, list[StageStats]]:
+    """
+    Stream the SQL for one fund into `out_path`.  Runs in a worker process.
+
+    With `stats` every stage is measured, and profiled into `profile_dir` if given.
+    """
+    start = time.perf_counter()
+
+    con = sqlite3.connect(db_path)
+    try:
+        measure = instrumented(event_id, con, profile_dir=profile_dir) if stats else nullcontext()
+        with out_path.open("w") as out, measure as instrument:
+            size = write_chunks(
+                fund_script(event_id, con, fmt, out_path.parent, data_prefix, fund_block0(db_path.parent)), out
+            )
+    finally:
+        con.close()
+
+    stages = [] if instrument is None else instrument.stages
+    return event_id, out_path, size, time.perf_counter() - start, stages
+
+
+def generate_funds(
+    jobs: dict[int, tuple[Path, Path]],
+    workers: int | None = None,
+    fmt: str = INSERT,
+    data_prefix: str = "historic_data",
+    manifest: Manifest | None = None,
+    digests: dict[int, str] | None = None,
+    stats: list[StageStats] | None = None,
+    profile_dir: Path | None = None,
+) -> int:
+    """
+    Generate every fund in `jobs` in parallel, returns the number of failed funds.
+
+    Successfully generated funds are recorded in `manifest` with their digest.
+    If `stats` is given, the stages of every fund are measured and appended to it.
+    """
+    failed = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(
+                generate_fund, event_id, db_path, out_path, fmt, data_prefix, stats is not None, profile_dir
+            ): event_id
+            for event_id, (db_path, out_path) in jobs.items()
+        }
+        for future in as_completed(futures):
+            event_id = futures[future]
+            try:
+                _, out_path, size, elapsed, stages = future.result()
+            except Exception as exc:  # pylint: disable=broad-except
+                failed += 1
+                print(f"Fund {event_id}: FAILED - {exc}", file=sys.stderr)
+                continue
+            print(f"Fund {event_id}: {out_path} ({size} bytes) in {elapsed:.2f}s", file=sys.stderr)
+            if stats is not None:
+                stats.extend(stages)
+            if manifest is not None and digests is not None:
+                manifest.record(f"fund_{event_id}", digests[event_id], fund_outputs(event_id, out_path, fmt))
+                manifest.save()
+    return failed
+
+
+def add_format_args(parser: argparse.ArgumentParser, copy_dir: bool = True) -> None:
+    """Add the output format options to a parser."""
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default=INSERT,
+        help="Multi-row INSERT statements, or COPY blocks in text or binary format.",
+    )
+    if copy_dir:
+        parser.add_argument(
+            "--copy-dir",
+            type=is_dir,
+            default=Path("."),
+            help="Directory to write the binary COPY data files to.",
+        )
+    parser.add_argument(
+        "--copy-prefix",
+        default="historic_data",
+        help="Path psql uses to reach the binary COPY data files.",
+    )
+
+
+def fund_main(event_id: int) -> int:
+    """Convert a single fund to SQL on stdout, the interface of the `mk_fundN_sql.py` scripts."""
+    parser = argparse.ArgumentParser(description=f"Process Fund {event_id}.")
+    parser.add_argument(
+        "filename",
+        help=f"Sqlite3 Fund{event_id} file to read.",
+        type=is_file,
+    )
+    add_format_args(parser)
+    add_stats_args(parser)
+
+    args = parser.parse_args()
+
+    # Open the sqlite file.
+    con = sqlite3.connect(args.filename)
+
+    measure = instrumented(event_id, con, profile_dir=args.profile_dir) if args.stats else nullcontext()
+    with measure as instrument:
+        write_chunks(
+            fund_script(
+                event_id, con, args.format, args.copy_dir, args.copy_prefix, fund_block0(args.filename.parent)
+            ),
+            sys.stdout,
+        )
+
+    con.close()
+
+    if instrument is not None:
+        write_stats(args.stats, instrument.stages)
+
+    return 0
+
+
+def main() -> int:
+    """Parse CLI arguments."""
+    parser = argparse.ArgumentParser(
+        prog="fund_seed", description="Generate the SQL seed data for all historic funds in parallel."
+    )
+    parser.add_argument(
+        "--fund",
+        action="append",
+        type=is_fund,
+        help="Fund to generate, may be repeated. Defaults to every fund with a database present.",
+    )
+    parser.add_argument(
+        "--data-dir",
+        type=is_dir,
+        default=HISTORIC_DATA,
+        help="Directory holding the `fund_N` directories.",
+    )
+    parser.add_argument(
+        "--out-dir",
+        type=is_dir,
+        default=HISTORIC_DATA,
+        help="Directory to write the `fund_N.sql` files to.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count(),
+        help="Number of worker processes.",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Regenerate every fund, even if its inputs did not change.",
+    )
+    add_format_args(parser, copy_dir=False)
+    add_stats_args(parser)
+
+    args = parser.parse_args()
+
+    manifest = Manifest(args.out_dir / MANIFEST)
+    digests: dict[int, str] = {}
+    jobs: dict[int, tuple[Path, Path]] = {}
+    for event_id in args.fund or sorted(FUNDS):
+        db_path = fund_database(args.data_dir, event_id)
+        if not db_path.is_file():
+            if args.fund:
+                parser.error(f"Fund {event_id} database {db_path} does not exist.")
+            print(f"Fund {event_id}: skipped, no database at {db_path}", file=sys.stderr)
+            continue
+        out_path = args.out_dir / f"fund_{event_id}.sql"
+
+        digest = fund_digest(
+            db_path, fund_block0(db_path.parent), format=args.format, copy_prefix=args.copy_prefix
+        )
+        if not args.force and manifest.fresh(f"fund_{event_id}", digest):
+            print(f"Fund {event_id}: unchanged, {out_path} is up to date", file=sys.stderr)
+            continue
+        digests[event_id] = digest
+        jobs[event_id] = (db_path, out_path)
+
+    stats: list[StageStats] | None = [] if args.stats else None
+    failed = generate_funds(jobs, args.jobs, args.format, args.copy_prefix, manifest, digests, stats, args.profile_dir)
+    if stats is not None:
+        write_stats(args.stats, sorted(stats, key=lambda stage: stage.fund))
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
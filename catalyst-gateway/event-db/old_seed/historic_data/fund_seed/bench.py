@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Benchmark the historic data seed pipeline against the checked in fund databases.
+
+For every fund, and every stage, the wall time, peak RSS and output bytes are measured:
+
+* `generate` - `python3 -m fund_seed` in each output format.
+* `encrypt` - the `encrypt_fundN_sensitive_data.py` script.
+* `load` - `psql` loading each generated script, only with `--db-url`.
+* `loader` - `python3 -m fund_seed.loader`, only with `--db-url`.
+
+Every stage runs in its own process, so the peak RSS is the stage's own.  The target
+database of the load stages must already have the event-db schema, funds are replaced.
+
+    python3 -m fund_seed.bench --output bench.json
+    python3 -m fund_seed.bench --db-url postgres://postgres@localhost/CatalystEventDev --repeat 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from .__main__ import FORMATS, HISTORIC_DATA, fund_database, fund_outputs, is_dir, is_fund
+from .funds import FUNDS
+
+PUBLIC_KEY = HISTORIC_DATA / "sensitive-data-pub.pem"
+
+# The fixtures already hold RSA encrypted values, which are too long to RSA encrypt again.
+ENCRYPT_FORMAT = "envelope"
+
+
+@dataclass
+class StageResult:
+    """The measurements of a single run of a stage for a fund."""
+
+    fund: int
+    stage: str
+    run: int
+    wall_s: float
+    peak_rss_kb: int
+    bytes: int | None = None
+    format: str | None = None
+    ok: bool = True
+    error: str | None = None
+
+
+@dataclass
+class BenchReport:
+    """All the results of a benchmark run, and where they were measured."""
+
+    started: str
+    python: str
+    platform: str
+    cpus: int | None
+    results: list[StageResult] = field(default_factory=list)
+
+    def to_json(self) -> dict[str, Any]:
+        """The report as JSON data."""
+        return asdict(self)
+
+
+def run_stage(command: list[str], cwd: Path) -> tuple[float, int, str | None]:
+    """Run a stage in a child process, returns (wall time, peak RSS in KiB, error or `None`)."""
+    with tempfile.TemporaryFile() as stderr:
+        start = time.perf_counter()
+        proc = subprocess.Popen(command, cwd=cwd, stdout=subprocess.DEVNULL, stderr=stderr)
+        _, status, usage = os.wait4(proc.pid, 0)
+        wall = time.perf_counter() - start
+        proc.returncode = os.waitstatus_to_exitcode(status)
+
+        error = None
+        if proc.returncode != 0:
+            stderr.seek(0)
+            lines = stderr.read().decode("utf-8", errors="replace").strip().splitlines()
+            error = f"exit {proc.returncode}: {lines[-1] if lines else 'failed'}"
+
+    # ru_maxrss is in KiB on Linux.
+    return wall, usage.ru_maxrss, error
+
+
+class Bench:
+    """Run the benchmark stages for a set of funds."""
+
+    def __init__(self, data_dir: Path, work_dir: Path, db_url: str | None, jobs: int, psql: str):
+        self.data_dir = data_dir
+        self.work_dir = work_dir
+        self.db_url = db_url
+        self.jobs = jobs
+        self.psql = psql
+        self.python = sys.executable
+        # Package root, so `-m fund_seed` works from any directory.
+        self.env_root = Path(__file__).resolve().parent.parent
+
+    def out_dir(self, fmt: str) -> Path:
+        """Where the scripts of a format are generated."""
+        path = self.work_dir / fmt
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def generate(self, event_id: int, run: int, fmt: str) -> StageResult:
+        """Generate a fund's script in one format."""
+        out_dir = self.out_dir(fmt)
+        command = [
+            self.python, "-m", "fund_seed",
+            "--fund", str(event_id),
+            "--data-dir", str(self.data_dir),
+            "--out-dir", str(out_dir),
+            "--format", fmt,
+            "--copy-prefix", str(out_dir),
+            "--jobs", "1",
+            "--force",
+        ]  # fmt: skip
+        wall, rss, error = run_stage(command, self.env_root)
+        size = None
+        if error is None:
+            size = sum(path.stat().st_size for path in fund_outputs(event_id, out_dir / f"fund_{event_id}.sql", fmt))
+        return StageResult(event_id, "generate", run, wall, rss, size, fmt, error is None, error)
+
+    def encrypt(self, event_id: int, run: int) -> StageResult:
+        """Encrypt a copy of a fund's database."""
+        encrypt_dir = self.work_dir / "encrypt"
+        encrypt_dir.mkdir(parents=True, exist_ok=True)
+        source = encrypt_dir / f"fund{event_id}_source.sqlite3"
+        shutil.copyfile(fund_database(self.data_dir, event_id), source)
+
+        script = HISTORIC_DATA / f"fund_{event_id}" / f"encrypt_fund{event_id}_sensitive_data.py"
+        command = [
+            self.python, str(script),
+            "--db-path", str(source),
+            "--public-key-path", str(PUBLIC_KEY),
+            "--format", ENCRYPT_FORMAT,
+            "--jobs", str(self.jobs),
+        ]  # fmt: skip
+        wall, rss, error = run_stage(command, encrypt_dir)
+        size = None
+        if error is None:
+            size = (encrypt_dir / f"fund{event_id}_database_encrypted.sqlite3").stat().st_size
+        return StageResult(event_id, "encrypt", run, wall, rss, size, ENCRYPT_FORMAT, error is None, error)
+
+    def load(self, event_id: int, run: int, fmt: str) -> StageResult:
+        """Load a generated script with psql."""
+        assert self.db_url is not None
+        script = self.out_dir(fmt) / f"fund_{event_id}.sql"
+        command = [self.psql, "-q", "-v", "ON_ERROR_STOP=1", "-f", str(script), self.db_url]
+        # A relative `--copy-prefix` reaches the binary COPY data files from the parent of the data.
+        wall, rss, error = run_stage(command, self.data_dir.parent)
+        size = sum(path.stat().st_size for path in fund_outputs(event_id, script, fmt))
+        return StageResult(event_id, "load", run, wall, rss, size, fmt, error is None, error)
+
+    def loader(self, event_id: int, run: int) -> StageResult:
+        """Load a fund with the asyncpg loader."""
+        assert self.db_url is not None
+        command = [
+            self.python, "-m", "fund_seed.loader",
+            "--fund", str(event_id),
+            "--data-dir", str(self.data_dir),
+            "--db-url", self.db_url,
+            "--force",
+        ]  # fmt: skip
+        wall, rss, error = run_stage(command, self.env_root)
+        return StageResult(event_id, "loader", run, wall, rss, None, None, error is None, error)
+
+    def fund(self, event_id: int, run: int, formats: tuple[str, ...], encrypt: bool) -> list[StageResult]:
+        """Every stage for one fund."""
+        results = [self.generate(event_id, run, fmt) for fmt in formats]
+        if encrypt:
+            results.append(self.encrypt(event_id, run))
+        if self.db_url is not None:
+            results.extend(
+                self.load(event_id, run, result.format)
+                for result in results
+                if result.stage == "generate" and result.ok and result.format is not None
+            )
+            results.append(self.loader(event_id, run))
+        return results
+
+
+def print_results(results: list[StageResult]) -> None:
+    """Print a human readable summary."""
+    print(f"{'fund':>4} {'stage':<9} {'format':<12} {'run':>3} {'wall s':>8} {'rss KiB':>9} {'bytes':>10}", file=sys.stderr)
+    for result in results:
+        line = (
+            f"{result.fund:>4} {result.stage:<9} {result.format or '':<12} {result.run:>3} "
+            f"{result.wall_s:>8.3f} {result.peak_rss_kb:>9} {'' if result.bytes is None else result.bytes:>10}"
+        )
+        if not result.ok:
+            line += f"  FAILED {result.error}"
+        print(line, file=sys.stderr)
+
+
+def main() -> int:
+    """Parse CLI arguments."""
+    parser = argparse.ArgumentParser(prog="fund_seed.bench", description="Benchmark the historic data seed pipeline.")
+    parser.add_argument(
+        "--fund",
+        action="append",
+        type=is_fund,
+        help="Fund to benchmark, may be repeated. Defaults to every fund with a database present.",
+    )
+    parser.add_argument(
+        "--data-dir",
+        type=is_dir,
+        default=HISTORIC_DATA,
+        help="Directory holding the `fund_N` directories.",
+    )
+    parser.add_argument(
+        "--format",
+        action="append",
+        choices=FORMATS,
+        help="Output format to benchmark, may be repeated. Defaults to all of them.",
+    )
+    parser.add_argument(
+        "--no-encrypt",
+        action="store_true",
+        help="Skip the encryption stage.",
+    )
+    parser.add_argument(
+        "--db-url",
+        help="Event-db to benchmark loading into. The load stages are skipped without it.",
+    )
+    parser.add_argument(
+        "--psql",
+        default="psql",
+        help="psql executable used by the load stage.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count(),
+        help="Number of worker processes of the encryption stage.",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="Number of times every stage is run.",
+    )
+    parser.add_argument(
+        "--work-dir",
+        type=is_dir,
+        help="Directory for the generated files, a temporary directory by default.",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        help="Write the JSON report to this file instead of stdout.",
+    )
+
+    args = parser.parse_args()
+    if args.db_url is not None and shutil.which(args.psql) is None:
+        parser.error(f"{args.psql} not found, it is needed to benchmark loading.")
+
+    funds = args.fund or [event_id for event_id in sorted(FUNDS) if fund_database(args.data_dir, event_id).is_file()]
+    formats = tuple(args.format or FORMATS)
+
+    report = BenchReport(
+        started=datetime.now(timezone.utc).isoformat(),
+        python=platform.python_version(),
+        platform=platform.platform(),
+        cpus=os.cpu_count(),
+    )
+
+    with tempfile.TemporaryDirectory(prefix="fund_seed_bench_") as tmp:
+        bench = Bench(args.data_dir, args.work_dir or Path(tmp), args.db_url, args.jobs, args.psql)
+        for run in range(args.repeat):
+            for event_id in funds:
+                report.results.extend(bench.fund(event_id, run, formats, not args.no_encrypt))
+
+    print_results(report.results)
+
+    data = json.dumps(report.to_json(), indent=2) + "\n"
+    if args.output is None:
+        sys.stdout.write(data)
+    else:
+        args.output.write_text(data)
+
+    return 0 if all(result.ok for result in report.results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
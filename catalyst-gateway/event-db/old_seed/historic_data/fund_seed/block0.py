@@ -0,0 +1,76 @@
+"""
+Stream a fund's `block0.bin` in fixed size chunks, computing its hash on the way.
+
+The hash of block 0 is the hash of its header, which is the first thing in the file:
+
+    header size (u16, big endian) | header (header size bytes) | content ...
+
+and is the Blake2b-256 of the header bytes, as used by jormungandr.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import struct
+from pathlib import Path
+from typing import Iterator
+
+BLOCK0 = "block0.bin"
+
+# Read this many bytes at a time.
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+HEADER_SIZE = struct.Struct("!H")
+HASH_SIZE = 32
+
+
+def header_hash(header: bytes) -> str:
+    """The hex encoded Blake2b-256 hash of a block header."""
+    return hashlib.blake2b(header, digest_size=HASH_SIZE).hexdigest()
+
+
+def fund_block0(fund_dir: Path) -> Path | None:
+    """The `block0.bin` of a fund directory, `None` if the fund has none."""
+    path = fund_dir / BLOCK0
+    return path if path.is_file() else None
+
+
+class Block0Reader:
+    """Read a `block0.bin` in chunks, hashing its header as it goes past."""
+
+    def __init__(self, path: Path | None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.size = 0
+        # Hex encoded, known once the header has been read.
+        self.hash: str | None = None
+        self._header = b""
+
+    def _update(self, chunk: bytes) -> None:
+        """Collect the header from the start of the file, and hash it once complete."""
+        if self.hash is not None:
+            return
+        # The header is at most 64 KiB, so this never holds more than a couple of chunks.
+        self._header += chunk
+        if len(self._header) < HEADER_SIZE.size:
+            return
+        (size,) = HEADER_SIZE.unpack_from(self._header)
+        end = HEADER_SIZE.size + size
+        if len(self._header) >= end:
+            self.hash = header_hash(self._header[HEADER_SIZE.size : end])
+            self._header = b""
+
+    def chunks(self) -> Iterator[bytes]:
+        """Yield the file a chunk at a time, nothing if there is no file."""
+        if self.path is None:
+            return
+
+        with self.path.open("rb") as block0:
+            while chunk := block0.read(self.chunk_size):
+                self._update(chunk)
+                self.size += len(chunk)
+                yield chunk
+
+        if self.hash is None:
+            raise ValueError(f"{self.path} is too short to hold a block header.")
+
@@ -0,0 +1,387 @@
+"""
+Encrypt the sensitive column of a historic fund database with an RSA 4096 public key.
+
+Two formats are supported.  In the `rsa` format every value is encrypted with
+RSA-OAEP-SHA256 and stored as
+
+    RSA:<base64 DER public key>:<base64 ciphertext>
+
+In the `envelope` format a random AES-256-GCM data key is generated for the database and
+stored RSA-OAEP-SHA256 wrapped in its `encryption_keys` table.  Every value is encrypted
+with the data key, and stored with the short id of the key as
+
+    AES:<key id>:<base64 nonce + ciphertext>
+
+The generated seeds carry the wrapped keys along into the event's `extra`, as
+`encryption_keys`, so the values stay readable once loaded into the event-db.  Both formats
+can be read back by a `Decryptor`, from either database.
+
+The source database is snapshotted with the SQLite backup API, and the rows are
+encrypted in chunks by a pool of worker processes which each load the key once.  They are
+written back into the snapshot with `executemany` in a single WAL mode transaction.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPrivateKey, RSAPublicKey
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from .funds import FUNDS
+from .instrument import add_stats_args, emitted, instrumented, measured, read, write_stats
+from .rows import KEYS_TABLE, encryption_keys
+
+KEY_SIZE = 4096
+
+# Encryption formats.
+RSA = "rsa"
+ENVELOPE = "envelope"
+FORMATS = (RSA, ENVELOPE)
+
+DATA_KEY_SIZE = 256
+NONCE_SIZE = 12
+KEY_ID_SIZE = 8
+
+# Rows sent to a worker at a time.
+DEFAULT_CHUNK_SIZE = 128
+
+# Set on the snapshot while it is encrypted.  Nothing is synced until the single commit.
+SNAPSHOT_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -65536",
+)
+
+
+def oaep() -> padding.OAEP:
+    """The RSA padding used for both formats."""
+    return padding.OAEP(
+        padding.MGF1(algorithm=hashes.SHA256()),
+        algorithm=hashes.SHA256(),
+        label=None,
+    )
+
+
+class Encryptor:
+    """Encrypt values with a RSA public key."""
+
+    @staticmethod
+    def from_public_key_pem_file(path: str | Path) -> Encryptor:
+        """Load the public key from a PEM file."""
+        with open(path, "rb") as f:
+            return Encryptor.from_public_key(serialization.load_pem_public_key(data=f.read()))
+
+    @staticmethod
+    def from_public_key(rsa_pk: object) -> Encryptor:
+        """Check the public key is a RSA 4096 key."""
+        if not isinstance(rsa_pk, RSAPublicKey):
+            raise ValueError("Invalid key type: must be a RSA key")
+        if rsa_pk.key_size != KEY_SIZE:
+            raise ValueError(f"Invalid key size: must be {KEY_SIZE} bits")
+        return Encryptor(rsa_pk)
+
+    def __init__(self, pk: RSAPublicKey):
+        self.rsa_pk = pk
+        self.rsa_pk_der = self.rsa_pk.public_bytes(
+            serialization.Encoding.DER,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+        self.encoded_rsa_pk_der = base64.b64encode(self.rsa_pk_der).decode()
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Key objects can not be pickled, send the DER encoding to worker processes.
+        return {"rsa_pk_der": self.rsa_pk_der}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__init__(serialization.load_der_public_key(state["rsa_pk_der"]))  # type: ignore[misc]
+
+    def encrypt(self, plaintext: bytes) -> str:
+        """Encrypt a single value."""
+        ciphertext = self.rsa_pk.encrypt(plaintext, padding=oaep())
+
+        encoded_ciphertext = base64.b64encode(ciphertext).decode()
+
+        return f"RSA:{self.encoded_rsa_pk_der}:{encoded_ciphertext}"
+
+    def encrypt_rows(self, rows: Iterable[tuple[int, str]]) -> list[tuple[str, int]]:
+        """Encrypt (id, value) rows into (encrypted value, id) `UPDATE` parameters."""
+        return [(self.encrypt(value.encode("utf-8")), row_id) for row_id, value in rows]
+
+    def prepare(self, con: sqlite3.Connection) -> None:
+        """Store whatever is needed to decrypt the values in the database.  Nothing in this format."""
+
+
+class EnvelopeEncryptor(Encryptor):
+    """Encrypt values with an AES-GCM data key, itself encrypted with a RSA public key."""
+
+    def __init__(self, pk: RSAPublicKey, data_key: bytes | None = None, wrapped_key: bytes | None = None):
+        super().__init__(pk)
+        if data_key is None:
+            data_key = AESGCM.generate_key(bit_length=DATA_KEY_SIZE)
+        if wrapped_key is None:
+            wrapped_key = self.rsa_pk.encrypt(data_key, padding=oaep())
+        self.data_key = data_key
+        self.wrapped_key = wrapped_key
+        self.key_id = hashlib.sha256(wrapped_key).hexdigest()[: KEY_ID_SIZE * 2]
+        self.aead = AESGCM(data_key)
+
+    def __getstate__(self) -> dict[str, Any]:
+        # RSA-OAEP is randomized, workers keep the wrapped key and so the key id of the parent.
+        return {"rsa_pk_der": self.rsa_pk_der, "data_key": self.data_key, "wrapped_key": self.wrapped_key}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__init__(  # type: ignore[misc]
+            serialization.load_der_public_key(state["rsa_pk_der"]), state["data_key"], state["wrapped_key"]
+        )
+
+    def encrypt(self, plaintext: bytes) -> str:
+        """Encrypt a single value, authenticated together with the key id."""
+        nonce = os.urandom(NONCE_SIZE)
+        ciphertext = self.aead.encrypt(nonce, plaintext, self.key_id.encode())
+
+        encoded_ciphertext = base64.b64encode(nonce + ciphertext).decode()
+
+        return f"AES:{self.key_id}:{encoded_ciphertext}"
+
+    def prepare(self, con: sqlite3.Connection) -> None:
+        """Store the wrapped data key in the `encryption_keys` table."""
+        con.execute(
+            f"""CREATE TABLE IF NOT EXISTS {KEYS_TABLE}
+(
+    key_id VARCHAR NOT NULL
+        primary key,
+    public_key VARCHAR NOT NULL,
+    wrapped_key VARCHAR NOT NULL
+)"""
+        )
+        con.execute(
+            f"INSERT OR REPLACE INTO {KEYS_TABLE} (key_id, public_key, wrapped_key) VALUES (?, ?, ?)",
+            (self.key_id, self.encoded_rsa_pk_der, base64.b64encode(self.wrapped_key).decode()),
+        )
+
+
+class Decryptor:
+    """Decrypt values of either format with the RSA private key."""
+
+    @staticmethod
+    def from_private_key_pem_file(path: str | Path, password: bytes | None = None) -> Decryptor:
+        """Load the private key from a PEM file."""
+        with open(path, "rb") as f:
+            sk = serialization.load_pem_private_key(f.read(), password=password)
+        if not isinstance(sk, RSAPrivateKey):
+            raise ValueError("Invalid key type: must be a RSA key")
+        return Decryptor(sk)
+
+    def __init__(self, sk: RSAPrivateKey):
+        self.rsa_sk = sk
+        # key id -> AES-GCM data key
+        self.data_keys: dict[str, AESGCM] = {}
+
+    def add_keys(self, keys: dict[str, dict[str, str]]) -> None:
+        """Unwrap data keys, by key id, in the shape of `fund_seed.rows.encryption_keys`."""
+        for key_id, key in keys.items():
+            wrapped_key = base64.b64decode(key["wrapped_key"])
+            self.data_keys[key_id] = AESGCM(self.rsa_sk.decrypt(wrapped_key, padding=oaep()))
+
+    def load_keys(self, con: sqlite3.Connection) -> None:
+        """Unwrap the data keys of a fund database, if it has any."""
+        self.add_keys(encryption_keys(con))
+
+    def load_event_keys(self, extra: dict[str, Any] | None) -> None:
+        """Unwrap the data keys carried by an event-db event's `extra`, if it has any."""
+        self.add_keys((extra or {}).get(KEYS_TABLE, {}))
+
+    def decrypt(self, value: str) -> bytes:
+        """Decrypt a single value."""
+        kind, key, encoded_ciphertext = value.split(":", 2)
+        ciphertext = base64.b64decode(encoded_ciphertext)
+
+        if kind == "RSA":
+            return self.rsa_sk.decrypt(ciphertext, padding=oaep())
+        if kind == "AES":
+            if key not in self.data_keys:
+                raise ValueError(f"Unknown data key: {key}")
+            return self.data_keys[key].decrypt(ciphertext[:NONCE_SIZE], ciphertext[NONCE_SIZE:], key.encode())
+        raise ValueError(f"Unknown encryption format: {kind}")
+
+
+# The encryptor of a worker process, loaded once by `init_worker`.
+_worker_encryptor: Encryptor | None = None
+
+
+def init_worker(encryptor: Encryptor) -> None:
+    """Keep the encryptor in a worker process."""
+    global _worker_encryptor  # pylint: disable=global-statement
+    _worker_encryptor = encryptor
+
+
+def encrypt_chunk(rows: list[tuple[int, str]]) -> list[tuple[str, int]]:
+    """Encrypt a chunk of rows in a worker process."""
+    assert _worker_encryptor is not None, "Worker was not initialized."
+    return _worker_encryptor.encrypt_rows(rows)
+
+
+def chunked(rows: list[tuple[int, str]], chunk_size: int) -> Iterator[list[tuple[int, str]]]:
+    """Split rows into chunks of `chunk_size`."""
+    for start in range(0, len(rows), chunk_size):
+        yield rows[start : start + chunk_size]
+
+
+def encrypt_proposals_sensitive_data(
+    encryptor: Encryptor,
+    src_con: sqlite3.Connection,
+    dst_con: sqlite3.Connection,
+    column: str,
+    workers: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """Encrypt `column` of every proposal from `src_con` into `dst_con`, returns the number of rows."""
+    src_cur = src_con.cursor()
+    rows = list(read(src_cur.execute(f"SELECT id, {column} FROM proposals")))
+    src_cur.close()
+
+    update = f"UPDATE proposals SET {column} = ? WHERE id = ?"
+
+    # All updates are made in a single transaction, committed on success.
+    with dst_con:
+        encryptor.prepare(dst_con)
+        if workers == 1:
+            for chunk in chunked(rows, chunk_size):
+                dst_con.executemany(update, emitted(encryptor.encrypt_rows(chunk)))
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=init_worker, initargs=(encryptor,)
+            ) as pool:
+                # Chunks come back in order, and are written while the next ones are encrypted.
+                for encrypted in pool.map(encrypt_chunk, chunked(rows, chunk_size)):
+                    dst_con.executemany(update, emitted(encrypted))
+
+    return len(rows)
+
+
+def snapshot(src_path: str | Path, dst_path: str | Path) -> sqlite3.Connection:
+    """Copy a database with the backup API, returns a connection to the copy ready for encryption."""
+    src_con = sqlite3.connect(f"file:{src_path}?mode=ro", uri=True)
+    dst_con = sqlite3.connect(dst_path)
+    try:
+        src_con.backup(dst_con)
+    except sqlite3.Error:
+        dst_con.close()
+        raise
+    finally:
+        src_con.close()
+
+    for pragma in SNAPSHOT_PRAGMAS:
+        dst_con.execute(pragma)
+    return dst_con
+
+
+def finish(con: sqlite3.Connection, vacuum: bool = False) -> None:
+    """Fold the WAL back into the database, so it is a single file again, and close it."""
+    con.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    con.execute("PRAGMA journal_mode = DELETE")
+    if vacuum:
+        con.execute("VACUUM")
+    con.close()
+
+
+def encrypt_main(event_id: int) -> int:
+    """Encrypt a single fund, the interface of the `encrypt_fundN_sensitive_data.py` scripts."""
+    parser = argparse.ArgumentParser(description=f"Encrypt fund {event_id} sensitive data.")
+    parser.add_argument(
+        "--db-path",
+        required=True,
+        help=f"Sqlite3 Fund{event_id} file to read.",
+    )
+    parser.add_argument(
+        "--public-key-path",
+        required=True,
+        help="PEM file path for the RSA (4096 bits) public key to use when encrypting data.",
+    )
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default=RSA,
+        help="Encrypt every value with RSA, or with an RSA wrapped AES-GCM data key.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count(),
+        help="Number of worker processes encrypting rows.",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Number of rows encrypted by a worker at a time.",
+    )
+    parser.add_argument(
+        "--vacuum",
+        action="store_true",
+        help="Compact the encrypted database, reclaiming the space of values which got smaller.",
+    )
+
+    add_stats_args(parser)
+
+    args = parser.parse_args()
+
+    try:
+        encryptor = Encryptor.from_public_key_pem_file(args.public_key_path)
+    except ValueError as exc:
+        print(exc)
+        return 1
+    if args.format == ENVELOPE:
+        encryptor = EnvelopeEncryptor(encryptor.rsa_pk)
+
+    (db_path_base, _) = os.path.split(args.db_path)
+    out_filepath = os.path.join(db_path_base, f"fund{event_id}_database_encrypted.sqlite3")
+
+    if os.path.abspath(args.db_path) == os.path.abspath(out_filepath):
+        print(f"{args.db_path} is already the encrypted database.")
+        return 1
+
+    measure = instrumented(event_id, profile_dir=args.profile_dir) if args.stats else nullcontext()
+    with measure as instrument:
+        start = time.perf_counter()
+        with measured("snapshot"):
+            con = snapshot(args.db_path, out_filepath)
+        copied = time.perf_counter()
+        try:
+            with measured("encryption"):
+                # The snapshot is both read from and written to.
+                rows = encrypt_proposals_sensitive_data(
+                    encryptor, con, con, FUNDS[event_id].sensitive_column, args.jobs, args.chunk_size
+                )
+            encrypted = time.perf_counter()
+        finally:
+            finish(con, args.vacuum)
+        elapsed = time.perf_counter() - start
+
+    if instrument is not None:
+        write_stats(args.stats, instrument.stages)
+
+    size = os.path.getsize(out_filepath)
+    print(
+        f"Encrypted {rows} proposals into {out_filepath} ({size} bytes) in {elapsed:.2f}s: "
+        f"snapshot {copied - start:.2f}s, "
+        f"encryption {encrypted - copied:.2f}s ({rows / max(encrypted - copied, 1e-9):.0f} rows/s), "
+        f"{size / max(elapsed, 1e-9) / 1e6:.1f} MB/s overall",
+        file=sys.stderr,
+    )
+
+    return 0
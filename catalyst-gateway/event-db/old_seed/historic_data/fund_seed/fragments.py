@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+Decode the fragments of a fund's `block0.bin`, without copying them.
+
+After the block header, the content of block 0 is a sequence of fragments:
+
+    header size (u16) | header | fragment ...
+    fragment = size | padding (u8, 0) | tag (u8) | content
+
+The size is a u16 up to fund 5, and a u32 from fund 6 (where transactions also gained
+a `valid_until` block date).  Everything is big endian.
+
+The file is memory mapped, and every fragment, and every address, id and key decoded
+from one, is a `memoryview` slice of the map.  Only the values a caller keeps are ever
+copied, so walking the voteplans, initial UTxOs and committee of the largest block 0
+costs no more memory than walking the smallest.  The slices are only valid inside the
+`with Block0(...)` block, `bytes()` or `.hex()` anything kept beyond it.
+
+    python3 -m fund_seed.fragments fund_7/block0.bin
+    python3 -m fund_seed.fragments --links fund_5/block0.bin > fund_5_links.csv
+
+`--links` writes the voteplan of every proposal, as `chain_proposal_id`,
+`chain_voteplan_id` and `chain_proposal_index` like the fund databases hold them.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import mmap
+import struct
+import sys
+from enum import IntEnum
+from pathlib import Path
+from typing import Iterator, NamedTuple, Union
+
+from .block0 import HASH_SIZE, HEADER_SIZE
+
+U8 = struct.Struct("!B")
+U16 = struct.Struct("!H")
+U32 = struct.Struct("!I")
+U64 = struct.Struct("!Q")
+BLOCK_DATE = struct.Struct("!II")
+
+# Size of an input (index, value, utxo or account id) and of a voteplan's proof
+# (committee member id and signature).
+INPUT_SIZE = 1 + 8 + 32
+VOTE_PLAN_PROOF_SIZE = 32 + 64
+
+# The low 7 bits of an address' first byte are its kind, the top bit is its discrimination.
+ADDRESS_KIND_MASK = 0x7F
+ADDRESS_TEST = 0x80
+ADDRESS_SIZES = {
+    0x3: 1 + 32,  # Single
+    0x4: 1 + 32 + 32,  # Group
+    0x5: 1 + 32,  # Account
+    0x6: 1 + 32,  # Multisig
+}
+
+# Config params are prefixed with a u16 holding the tag, and the size in the low 6 bits.
+CONFIG_SIZE_BITS = 6
+CONFIG_SIZE_MASK = (1 << CONFIG_SIZE_BITS) - 1
+
+VOTE_PAYLOADS = {1: "public", 2: "private"}
+VOTE_ACTION_OFF_CHAIN = 0
+
+
+class FragmentTag(IntEnum):
+    """The kind of a fragment."""
+
+    INITIAL = 0
+    OLD_UTXO_DECLARATION = 1
+    TRANSACTION = 2
+    OWNER_STAKE_DELEGATION = 3
+    STAKE_DELEGATION = 4
+    POOL_REGISTRATION = 5
+    POOL_RETIREMENT = 6
+    POOL_UPDATE = 7
+    UPDATE_PROPOSAL = 8
+    UPDATE_VOTE = 9
+    VOTE_PLAN = 10
+    VOTE_CAST = 11
+    VOTE_TALLY = 12
+    ENCRYPTED_VOTE_TALLY = 13
+
+
+class ConfigTag(IntEnum):
+    """The config params of the initial fragment which are decoded."""
+
+    DISCRIMINATION = 1
+    BLOCK0_DATE = 2
+    SLOTS_PER_EPOCH = 4
+    SLOT_DURATION = 5
+    ADD_BFT_LEADER = 11
+    ADD_COMMITTEE_ID = 26
+
+
+class Fragment(NamedTuple):
+    """A fragment, `data` is its padding, tag and content."""
+
+    offset: int
+    tag: int
+    data: memoryview
+
+    @property
+    def content(self) -> memoryview:
+        """The content, after the padding and tag."""
+        return self.data[2:]
+
+    @property
+    def id(self) -> str:
+        """The hex encoded fragment id, the Blake2b-256 of the fragment."""
+        return hashlib.blake2b(self.data, digest_size=HASH_SIZE).hexdigest()
+
+
+class ConfigParam(NamedTuple):
+    """A blockchain configuration parameter of the initial fragment."""
+
+    tag: int
+    value: memoryview
+
+
+class CommitteeMember(NamedTuple):
+    """A member of the vote committee, its id is its public key."""
+
+    id: memoryview
+
+
+class InitialUtxo(NamedTuple):
+    """An output of a block 0 transaction, `index` is its position in the fragment."""
+
+    fragment: Fragment
+    index: int
+    address: memoryview
+    value: int
+
+
+class BlockDate(NamedTuple):
+    """A block date, an epoch and a slot within it."""
+
+    epoch: int
+    slot: int
+
+
+class VotePlanProposal(NamedTuple):
+    """A proposal voted on by a voteplan, `index` is its position in the voteplan."""
+
+    external_id: memoryview
+    index: int
+    options: int
+
+
+class VotePlan(NamedTuple):
+    """A voteplan certificate."""
+
+    # Hex encoded, the Blake2b-256 of the certificate.
+    id: str
+    vote_start: BlockDate
+    vote_end: BlockDate
+    committee_end: BlockDate
+    # `public` or `private`.
+    payload: str
+    proposals: list[VotePlanProposal]
+    # The committee member's election keys of a private voteplan.
+    committee_keys: list[memoryview]
+
+
+Decoded = Union[CommitteeMember, InitialUtxo, VotePlan]
+
+
+def config_params(fragment: Fragment) -> Iterator[ConfigParam]:
+    """Yield the config params of the initial fragment."""
+    content = fragment.content
+    (params,) = U16.unpack_from(content)
+    offset = U16.size
+    for _ in range(params):
+        (tag_size,) = U16.unpack_from(content, offset)
+        offset += U16.size
+        end = offset + (tag_size & CONFIG_SIZE_MASK)
+        yield ConfigParam(tag_size >> CONFIG_SIZE_BITS, content[offset:end])
+        offset = end
+    if offset != len(content):
+        raise ValueError(f"Initial fragment at {fragment.offset} has {len(content) - offset} trailing bytes.")
+
+
+def address_size(content: memoryview, offset: int) -> int:
+    """The size of the address at `offset`."""
+    kind = content[offset] & ADDRESS_KIND_MASK
+    try:
+        return ADDRESS_SIZES[kind]
+    except KeyError:
+        raise ValueError(f"Address kind {kind:#x} at {offset} is not supported.") from None
+
+
+class Block0:
+    """A memory mapped `block0.bin`, decoded one fragment at a time."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = None
+        self._map: mmap.mmap | None = None
+        self._view: memoryview | None = None
+
+    def __enter__(self) -> Block0:
+        self._file = self.path.open("rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        assert self._view is not None and self._map is not None and self._file is not None
+        self._view.release()
+        try:
+            self._map.close()
+        except BufferError:
+            # The caller still holds slices, the map is closed once the last of them is gone.
+            pass
+        self._file.close()
+        self._view = self._map = self._file = None
+
+    @property
+    def view(self) -> memoryview:
+        """The whole file."""
+        if self._view is None:
+            raise ValueError(f"{self.path} is not open, use `with Block0(path)`.")
+        return self._view
+
+    @property
+    def content_offset(self) -> int:
+        """Offset of the first fragment, after the header."""
+        if len(self.view) < HEADER_SIZE.size:
+            raise ValueError(f"{self.path} is too short to hold a block header.")
+        (size,) = HEADER_SIZE.unpack_from(self.view)
+        return HEADER_SIZE.size + size
+
+    @property
+    def wide(self) -> bool:
+        """Whether fragment sizes are u32, and transactions have a `valid_until` date."""
+        # The first fragment is never empty, so a u16 size of zero is the top of a u32 size.
+        (size,) = U16.unpack_from(self.view, self.content_offset)
+        return size == 0
+
+    def fragments(self) -> Iterator[Fragment]:
+        """Yield every fragment, in file order."""
+        view = self.view
+        offset = self.content_offset
+        size_format = U32 if self.wide else U16
+        while offset < len(view):
+            (size,) = size_format.unpack_from(view, offset)
+            start = offset + size_format.size
+            end = start + size
+            if size < 2 or end > len(view):
+                raise ValueError(f"{self.path}: fragment at {offset} of {size} bytes is truncated.")
+            yield Fragment(offset, view[start + 1], view[start:end])
+            offset = end
+
+    def _transaction(self, fragment: Fragment, offset: int) -> tuple[int, int, int]:
+        """Skip the header of the transaction at `offset`, returns (inputs, outputs, offset)."""
+        content = fragment.content
+        if self.wide:
+            offset += BLOCK_DATE.size  # valid_until
+        inputs, outputs = content[offset], content[offset + 1]
+        return inputs, outputs, offset + 2
+
+    def outputs(self, fragment: Fragment) -> Iterator[InitialUtxo]:
+        """Yield the outputs of a transaction fragment."""
+        content = fragment.content
+        inputs, outputs, offset = self._transaction(fragment, 0)
+        offset += inputs * INPUT_SIZE
+        for index in range(outputs):
+            end = offset + address_size(content, offset)
+            (value,) = U64.unpack_from(content, end)
+            yield InitialUtxo(fragment, index, content[offset:end], value)
+            offset = end + U64.size
+        # Initial funds have no inputs, and so no witnesses, to account for.
+        if not inputs and offset != len(content):
+            raise ValueError(f"Transaction at {fragment.offset} has {len(content) - offset} trailing bytes.")
+
+    def vote_plan(self, fragment: Fragment) -> VotePlan:
+        """Decode a voteplan fragment."""
+        content = fragment.content
+        vote_start = BlockDate(*BLOCK_DATE.unpack_from(content, 0))
+        vote_end = BlockDate(*BLOCK_DATE.unpack_from(content, BLOCK_DATE.size))
+        committee_end = BlockDate(*BLOCK_DATE.unpack_from(content, 2 * BLOCK_DATE.size))
+        offset = 3 * BLOCK_DATE.size
+        payload_type = content[offset]
+        if payload_type not in VOTE_PAYLOADS:
+            raise ValueError(f"Voteplan at {fragment.offset} has an unknown payload type {payload_type}.")
+
+        proposals = []
+        count, offset = content[offset + 1], offset + 2
+        for index in range(count):
+            external_id = content[offset : offset + HASH_SIZE]
+            options, action = content[offset + HASH_SIZE], content[offset + HASH_SIZE + 1]
+            if action != VOTE_ACTION_OFF_CHAIN:
+                raise ValueError(f"Voteplan at {fragment.offset}: only off chain proposals are supported.")
+            proposals.append(VotePlanProposal(external_id, index, options))
+            offset += HASH_SIZE + 2
+
+        committee_keys = []
+        count, offset = content[offset], offset + 1
+        for _ in range(count):
+            committee_keys.append(content[offset : offset + HASH_SIZE])
+            offset += HASH_SIZE
+        certificate = content[:offset]
+
+        inputs, outputs, offset = self._transaction(fragment, offset)
+        if inputs or outputs or offset + VOTE_PLAN_PROOF_SIZE != len(content):
+            raise ValueError(f"Voteplan at {fragment.offset} is not a block 0 certificate.")
+
+        return VotePlan(
+            id=hashlib.blake2b(certificate, digest_size=HASH_SIZE).hexdigest(),
+            vote_start=vote_start,
+            vote_end=vote_end,
+            committee_end=committee_end,
+            payload=VOTE_PAYLOADS[payload_type],
+            proposals=proposals,
+            committee_keys=committee_keys,
+        )
+
+    def decode(self) -> Iterator[Decoded]:
+        """Yield the committee members, initial UTxOs and voteplans, in file order."""
+        for fragment in self.fragments():
+            if fragment.tag == FragmentTag.INITIAL:
+                for param in config_params(fragment):
+                    if param.tag == ConfigTag.ADD_COMMITTEE_ID:
+                        yield CommitteeMember(param.value)
+            elif fragment.tag == FragmentTag.TRANSACTION:
+                yield from self.outputs(fragment)
+            elif fragment.tag == FragmentTag.VOTE_PLAN:
+                yield self.vote_plan(fragment)
+
+    def config(self) -> Iterator[ConfigParam]:
+        """Yield the config params of the initial fragment."""
+        for fragment in self.fragments():
+            if fragment.tag == FragmentTag.INITIAL:
+                yield from config_params(fragment)
+                return
+        raise ValueError(f"{self.path} has no initial fragment.")
+
+    def committee(self) -> Iterator[CommitteeMember]:
+        """Yield the members of the vote committee."""
+        yield from (item for item in self.decode() if isinstance(item, CommitteeMember))
+
+    def initial_utxos(self) -> Iterator[InitialUtxo]:
+        """Yield the initial funds."""
+        for fragment in self.fragments():
+            if fragment.tag == FragmentTag.TRANSACTION:
+                yield from self.outputs(fragment)
+
+    def vote_plans(self) -> Iterator[VotePlan]:
+        """Yield the voteplans."""
+        for fragment in self.fragments():
+            if fragment.tag == FragmentTag.VOTE_PLAN:
+                yield self.vote_plan(fragment)
+
+
+BECH32_CHARSET = "qpzry9x8gf2tvdw0s3jn54khce6mua7l"
+BECH32_GENERATOR = (0x3B6A57B2, 0x26508E6D, 0x1EA119FA, 0x3D4233DD, 0x2A1462B3)
+
+
+def _bech32_polymod(values: list[int]) -> int:
+    check = 1
+    for value in values:
+        top = check >> 25
+        check = (check & 0x1FFFFFF) << 5 ^ value
+        for i, generator in enumerate(BECH32_GENERATOR):
+            if (top >> i) & 1:
+                check ^= generator
+    return check
+
+
+def bech32(hrp: str, data: bytes | memoryview) -> str:
+    """Bech32 encode `data`, the way genesis files and wallets show addresses."""
+    words = []
+    accumulator = bits = 0
+    for byte in data:
+        accumulator = (accumulator << 8) | byte
+        bits += 8
+        while bits >= 5:
+            bits -= 5
+            words.append((accumulator >> bits) & 31)
+    if bits:
+        words.append((accumulator << (5 - bits)) & 31)
+
+    expanded = [ord(char) >> 5 for char in hrp] + [0] + [ord(char) & 31 for char in hrp]
+    polymod = _bech32_polymod(expanded + words + [0] * 6) ^ 1
+    checksum = [(polymod >> 5 * (5 - i)) & 31 for i in range(6)]
+    return f"{hrp}1" + "".join(BECH32_CHARSET[word] for word in words + checksum)
+
+
+def address_hrp(address: memoryview) -> str:
+    """The bech32 prefix of an address, by its discrimination."""
+    return "ta" if address[0] & ADDRESS_TEST else "ca"
+
+
+def summarize(block0: Block0) -> None:
+    """Print what a block 0 holds."""
+    utxos = value = 0
+    for item in block0.decode():
+        if isinstance(item, CommitteeMember):
+            print(f"committee member {item.id.hex()}")
+        elif isinstance(item, InitialUtxo):
+            utxos += 1
+            value += item.value
+        else:
+            print(
+                f"voteplan {item.id} {item.payload}, {len(item.proposals)} proposals, "
+                f"epochs {item.vote_start.epoch}-{item.vote_end.epoch}-{item.committee_end.epoch}"
+            )
+    print(f"{utxos} initial UTxOs holding {value}")
+
+
+def write_links(block0: Block0) -> None:
+    """Write the voteplan of every proposal as CSV."""
+    writer = csv.writer(sys.stdout)
+    writer.writerow(("chain_proposal_id", "chain_voteplan_id", "chain_proposal_index"))
+    for plan in block0.vote_plans():
+        writer.writerows((proposal.external_id.hex(), plan.id, proposal.index) for proposal in plan.proposals)
+
+
+def main() -> int:
+    """Parse CLI arguments."""
+    parser = argparse.ArgumentParser(
+        prog="fund_seed.fragments", description="Decode the voteplans, initial funds and committee of a block0.bin."
+    )
+    parser.add_argument("block0", type=Path, help="The block0.bin to decode.")
+    parser.add_argument(
+        "--links",
+        action="store_true",
+        help="Write the voteplan and index of every proposal as CSV, instead of a summary.",
+    )
+
+    args = parser.parse_args()
+    if not args.block0.is_file():
+        parser.error(f"{args.block0} does not exist.")
+
+    with Block0(args.block0) as block0:
+        if args.links:
+            write_links(block0)
+        else:
+            summarize(block0)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
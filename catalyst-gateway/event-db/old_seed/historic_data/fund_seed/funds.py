@@ -0,0 +1,454 @@
+"""
+Per fund differences between the historic Catalyst fund databases.
+
+Every fund was exported by a different version of Vit-SS, so the column layout of the
+SQLite3 tables and the accuracy of the fund schedule varies from fund to fund.
+Everything that differs is described here as data, the SQL generation itself lives in
+`fund_seed.sql`.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class Time:
+    """
+    A single time in the event schedule.
+
+    A time is either hard coded (`literal`), read from a column of the `funds` row,
+    read from a column of the first `voteplans` row or not known at all (`NULL`).
+    """
+
+    note: str
+    literal: str | None = None
+    funds: int | None = None
+    voteplans: int | None = None
+
+
+def at(literal: str, note: str) -> Time:
+    """A hard coded time."""
+    return Time(note, literal=literal)
+
+
+def from_funds(column: int, note: str) -> Time:
+    """A time read from the `funds` table."""
+    return Time(note, funds=column)
+
+
+def from_voteplans(column: int, note: str) -> Time:
+    """A time read from the `voteplans` table."""
+    return Time(note, voteplans=column)
+
+
+def unknown(note: str) -> Time:
+    """A time which is not known, or did not exist for the fund."""
+    return Time(note)
+
+
+@dataclass(frozen=True)
+class Schedule:
+    """The event schedule, in the column order of the `event` table."""
+
+    start_time: Time
+    end_time: Time
+    registration_snapshot_time: Time
+    snapshot_start: Time
+    insight_sharing_start: Time
+    proposal_submission_start: Time
+    refine_proposals_start: Time
+    finalize_proposals_start: Time
+    proposal_assessment_start: Time
+    assessment_qa_start: Time
+    voting_start: Time
+    voting_end: Time
+    tallying_end: Time
+
+
+@dataclass(frozen=True)
+class Objective:
+    """A hard coded objective, for funds whose database has no `challenges` table."""
+
+    id: int
+    category: str
+    title: str
+    description: str
+    rewards_total: int
+    rewards_total_lovelace: int | None
+
+
+@dataclass(frozen=True)
+class ChallengeColumns:
+    """Column positions in the `challenges` table."""
+
+    id: int
+    challenge_type: int
+    title: int
+    description: int
+    rewards_total: int
+    proposers_rewards: int | None
+    url: int
+    highlights: int | None = None
+
+
+# Extra proposal data held in side tables, keyed by `proposal_id`.
+# (extra key, table, column)
+PROPOSAL_NOTES: tuple[tuple[str, str, str], ...] = (
+    ("solution", "proposal_simple_challenge", "proposal_solution"),
+    ("brief", "proposal_community_choice_challenge", "proposal_brief"),
+    ("importance", "proposal_community_choice_challenge", "proposal_importance"),
+    ("goal", "proposal_community_choice_challenge", "proposal_goal"),
+    ("metrics", "proposal_community_choice_challenge", "proposal_metrics"),
+)
+
+
+@dataclass(frozen=True)
+class ProposalColumns:
+    """Column positions in the `proposals` table."""
+
+    id: int
+    proposal_id: int = 1
+    title: int = 3
+    summary: int = 4
+    public_key: int = 5
+    funds: int = 6
+    url: int = 7
+    files_url: int = 8
+    impact_score: int = 9
+    proposer_name: int = 10
+    proposer_contact: int = 11
+    proposer_url: int = 12
+    relevant_experience: int = 13
+    challenge: int | None = 18
+    # Extra data stored inline in the proposals row. (extra key, column)
+    extra: tuple[tuple[str, int], ...] = ()
+    # Extra data stored in the `PROPOSAL_NOTES` side tables.
+    notes: bool = False
+
+
+@dataclass(frozen=True)
+class FundSpec:
+    """Everything needed to convert a single historic fund."""
+
+    event_id: int
+    schedule: Schedule
+    proposals: ProposalColumns
+    challenges: ChallengeColumns | None = None
+    objective: Objective | None = None
+    # Row of the `funds` table to use, `None` if the database only holds one fund.
+    funds_row_id: int | None = None
+    fund_goal: int = 2
+    voting_power_threshold: int = 4
+    header: tuple[str, ...] = field(default_factory=tuple)
+    # Column of the `proposals` table which is encrypted in the published database.
+    sensitive_column: str = "proposal_public_key"
+
+    @property
+    def name(self) -> str:
+        """The name of the event."""
+        return f"Catalyst Fund {self.event_id}"
+
+
+FUNDS: dict[int, FundSpec] = {}
+
+
+def _register(spec: FundSpec) -> None:
+    FUNDS[spec.event_id] = spec
+
+
+_register(
+    FundSpec(
+        event_id=2,
+        header=("First Funded Event",),
+        sensitive_column="proposer_contact",
+        schedule=Schedule(
+            start_time=at("2020-09-23 00:00:00", "Date accurate, time not known."),
+            end_time=at("2021-01-10 20:00:00", "Date/Time accurate."),
+            registration_snapshot_time=at(
+                "2020-12-15 17:00:04",
+                "Date/time Accurate. Slot 16485313 (DB Says 2020-12-15T17:00:00Z -- Inaccurate)",
+            ),
+            snapshot_start=at("2020-12-15 17:30:00", "Date/time Accurate. Slot?"),
+            insight_sharing_start=unknown("None"),
+            proposal_submission_start=at("2020-09-23 00:00:00", "Date accurate, time not known."),
+            refine_proposals_start=unknown("Date accurate, time not known."),
+            finalize_proposals_start=at("2020-10-21 23:59:59", "Date accurate, time not known."),
+            proposal_assessment_start=unknown("None"),
+            assessment_qa_start=unknown("None"),
+            voting_start=from_funds(6, "Date/time Accurate."),
+            voting_end=from_funds(7, "Date/time Accurate."),
+            tallying_end=from_voteplans(4, "Date/time Accurate."),
+        ),
+        objective=Objective(
+            id=0,
+            category="catalyst-simple",
+            title="Fund 2 Challenge",
+            description="",
+            rewards_total=250000,
+            rewards_total_lovelace=2336450000000,
+        ),
+        proposals=ProposalColumns(
+            id=1,
+            public_key=7,
+            funds=8,
+            url=9,
+            files_url=10,
+            impact_score=11,
+            proposer_name=12,
+            proposer_contact=13,
+            proposer_url=14,
+            relevant_experience=15,
+            challenge=None,
+            extra=(("problem", 5), ("solution", 6)),
+        ),
+    )
+)
+
+_register(
+    FundSpec(
+        event_id=3,
+        header=(
+            "Fund 3 was unusual.  It had two parts, and the DB only exists for the second part with Yoroi",
+            "wallet.  So we do not import everything we could because its not accurate over the whole fund.",
+        ),
+        schedule=Schedule(
+            start_time=at("2021-01-06 21:00:00", "Date/Time accurate."),
+            end_time=at("2021-04-02 19:00:00", "Date/Time accurate."),
+            registration_snapshot_time=at("2021-03-05 19:00:53", "Date/time Accurate. Slot 23404562"),
+            snapshot_start=at("2021-03-05 19:00:53", "Date/time Accurate. Slot?"),
+            insight_sharing_start=unknown("None"),
+            proposal_submission_start=at("2021-01-13 21:00:00", "Date/time accurate."),
+            refine_proposals_start=at("2021-01-20 21:00:00", "Date/time accurate."),
+            finalize_proposals_start=at("2021-01-27 21:00:00", "Date/time accurate."),
+            proposal_assessment_start=at("2021-02-03 21:00:00", "None"),
+            assessment_qa_start=at("2021-02-10 21:00:00", "Date accurate, time unknown."),
+            voting_start=at("2021-03-05 19:10:00", "Date/time not sure because very close to snapshot."),
+            voting_end=at("2021-03-29 19:00:00", "Date/time Accurate."),
+            tallying_end=at("2021-04-02 19:00:00", "Date/time Accurate."),
+        ),
+        challenges=ChallengeColumns(
+            id=0,
+            challenge_type=1,
+            title=2,
+            description=3,
+            rewards_total=4,
+            proposers_rewards=None,
+            url=6,
+        ),
+        proposals=ProposalColumns(
+            id=0,
+            extra=(
+                ("solution", 19),
+                ("brief", 20),
+                ("importance", 21),
+                ("goal", 22),
+                ("metrics", 23),
+            ),
+        ),
+    )
+)
+
+_register(
+    FundSpec(
+        event_id=4,
+        schedule=Schedule(
+            start_time=at("2021-02-17 22:00:00", "Date/Time accurate."),
+            end_time=at("2021-07-04 11:00:00", "Date/Time accurate."),
+            registration_snapshot_time=at(
+                "2021-06-11 11:00:26", "Date/time Accurate. Slot 31842935 (Vit-SS Says 2021-06-11 11:00:00)"
+            ),
+            snapshot_start=at("2021-06-12 11:00:00", "Date/time Unknown."),
+            insight_sharing_start=unknown("None"),
+            proposal_submission_start=at("2021-02-24 22:00:00", "Date/time accurate."),
+            refine_proposals_start=at("2021-03-03 22:00:00", "Date/time accurate."),
+            finalize_proposals_start=at("2021-03-10 22:00:00", "Date/time accurate."),
+            proposal_assessment_start=at("2021-03-17 19:00:00", "Date/time accurate."),
+            assessment_qa_start=at("2021-03-24 19:00:00", "Datetime accurate."),
+            voting_start=from_funds(6, "Date/time accurate."),
+            voting_end=from_funds(7, "Date/time Accurate."),
+            tallying_end=from_voteplans(4, "Date/time Accurate."),
+        ),
+        challenges=ChallengeColumns(
+            id=0,
+            challenge_type=1,
+            title=2,
+            description=3,
+            rewards_total=4,
+            proposers_rewards=5,
+            url=7,
+        ),
+        proposals=ProposalColumns(id=0, notes=True),
+    )
+)
+
+_register(
+    FundSpec(
+        event_id=5,
+        schedule=Schedule(
+            start_time=at("2021-03-31 19:00:00", "Date/Time accurate."),
+            end_time=at("2021-08-09 11:00:00", "Date/Time accurate."),
+            registration_snapshot_time=at(
+                "2021-07-19 11:00:20", "Date/time Accurate. Slot 35126129 (Vit-SS Says 2021-07-19 11:00:00)"
+            ),
+            snapshot_start=at("2021-07-20 11:00:00", "Date/time Unknown."),
+            insight_sharing_start=unknown("None"),
+            proposal_submission_start=at("2021-04-07 19:00:00", "Date/time accurate."),
+            refine_proposals_start=at("2021-04-14 19:00:00", "Date/time accurate."),
+            finalize_proposals_start=at("2021-04-21 19:00:00", "Date/time accurate."),
+            proposal_assessment_start=at("2021-04-28 19:00:00", "Date/time accurate."),
+            assessment_qa_start=at("2021-05-12 19:00:00", "Datetime accurate."),
+            voting_start=from_funds(6, "Date/time accurate. July 22, 2021 8:51:12"),
+            voting_end=from_funds(7, "Date/time Accurate."),
+            tallying_end=from_voteplans(4, "Date/time Accurate."),
+        ),
+        challenges=ChallengeColumns(
+            id=0,
+            challenge_type=1,
+            title=2,
+            description=3,
+            rewards_total=4,
+            proposers_rewards=5,
+            url=7,
+        ),
+        proposals=ProposalColumns(id=0, notes=True),
+    )
+)
+
+_register(
+    FundSpec(
+        event_id=6,
+        schedule=Schedule(
+            start_time=at("2021-08-12 11:00:00", "Date/Time accurate."),
+            end_time=at("2021-10-28 11:00:00", "Date/Time accurate."),
+            registration_snapshot_time=at("2021-10-04 11:00:00", "Date/time Accurate."),
+            snapshot_start=at("2021-10-05 11:00:00", "Date/time Unknown."),
+            insight_sharing_start=at("2021-08-26 11:00:00", "None"),
+            proposal_submission_start=at("2021-08-19 11:00:00", "Date/time accurate."),
+            refine_proposals_start=at("2021-08-14 11:00:00", "Date/time accurate."),
+            finalize_proposals_start=at("2021-09-02 11:00:00", "Date/time accurate."),
+            proposal_assessment_start=at("2021-09-09 11:00:00", "Date/time accurate."),
+            assessment_qa_start=at("2021-09-16 11:00:00", "Datetime accurate."),
+            voting_start=from_funds(5, "Date/time accurate."),
+            voting_end=from_funds(6, "Date/time Accurate."),
+            tallying_end=from_voteplans(4, "Date/time Accurate."),
+        ),
+        challenges=ChallengeColumns(
+            id=0,
+            challenge_type=1,
+            title=2,
+            description=3,
+            rewards_total=4,
+            proposers_rewards=5,
+            url=7,
+        ),
+        proposals=ProposalColumns(id=1, notes=True),
+    )
+)
+
+_register(
+    FundSpec(
+        event_id=7,
+        schedule=Schedule(
+            start_time=at("2021-11-11 11:00:00", "Date/Time accurate."),
+            end_time=at("2022-02-10 11:00:00", "Date/Time accurate."),
+            registration_snapshot_time=at(
+                "2022-01-06 11:00:00",
+                "Date/time Unknown (confluence schedule doesn't mention snapshot specifically).",
+            ),
+            snapshot_start=at("2022-01-07 11:00:00", "Date/time Unknown."),
+            insight_sharing_start=at("2021-11-11 11:00:00", "None"),
+            proposal_submission_start=at("2021-11-18 11:00:00", "Date/time accurate."),
+            refine_proposals_start=at("2021-11-25 11:00:00", "Date/time accurate."),
+            finalize_proposals_start=at("2021-12-02 11:00:00", "Date/time accurate."),
+            proposal_assessment_start=at("2021-12-09 11:00:00", "Date/time accurate."),
+            assessment_qa_start=at("2021-12-16 11:00:00", "Datetime accurate."),
+            voting_start=from_funds(5, "Date/time accurate."),
+            voting_end=from_funds(6, "Date/time Accurate."),
+            tallying_end=from_voteplans(4, "Date/time Accurate."),
+        ),
+        challenges=ChallengeColumns(
+            id=0,
+            challenge_type=1,
+            title=2,
+            description=3,
+            rewards_total=4,
+            proposers_rewards=5,
+            url=7,
+        ),
+        proposals=ProposalColumns(id=1, notes=True),
+    )
+)
+
+_register(
+    FundSpec(
+        event_id=8,
+        schedule=Schedule(
+            start_time=at("2022-02-17 11:00:00", "Date/Time accurate."),
+            end_time=at("2022-05-12 11:00:00", "Date/Time accurate."),
+            registration_snapshot_time=at(
+                "2022-04-07 11:00:00",
+                "Date/time Unknown (confluence schedule doesn't mention snapshot specifically).",
+            ),
+            snapshot_start=at("2022-04-08 11:00:00", "Date/time Unknown."),
+            insight_sharing_start=at("2022-02-17 11:00:00", "None"),
+            proposal_submission_start=at("2022-02-24 11:00:00", "Date/time accurate."),
+            refine_proposals_start=at("2022-03-03 11:00:00", "Date/time accurate."),
+            finalize_proposals_start=at("2022-03-10 11:00:00", "Date/time accurate."),
+            proposal_assessment_start=at("2022-03-17 11:00:00", "Date/time accurate."),
+            assessment_qa_start=at("2022-03-24 11:00:00", "Datetime accurate."),
+            voting_start=from_funds(5, "Date/time accurate."),
+            voting_end=from_funds(6, "Date/time Accurate."),
+            tallying_end=from_voteplans(4, "Date/time Accurate."),
+        ),
+        challenges=ChallengeColumns(
+            id=0,
+            challenge_type=1,
+            title=2,
+            description=3,
+            rewards_total=4,
+            proposers_rewards=5,
+            url=7,
+        ),
+        proposals=ProposalColumns(id=1, notes=True),
+    )
+)
+
+_register(
+    FundSpec(
+        event_id=9,
+        funds_row_id=9,
+        schedule=Schedule(
+            start_time=at("2022-06-02 00:00:00", "Date/Time accurate."),
+            end_time=at(
+                "2022-10-11 00:00:00", "Date/Time -- 7 days after tallying end time (confluence says 2022-09-02)."
+            ),
+            registration_snapshot_time=from_funds(
+                3, "Date/time Unknown (confluence schedule doesn't mention snapshot specifically)."
+            ),
+            snapshot_start=from_funds(
+                15, "Date/time (same as confluence schedule but it doesn't mention snapshot time specifically)."
+            ),
+            insight_sharing_start=from_funds(9, "Accurate"),
+            proposal_submission_start=from_funds(10, "Date/time accurate."),
+            refine_proposals_start=from_funds(11, "Date/time accurate."),
+            finalize_proposals_start=from_funds(12, "Date/time accurate."),
+            proposal_assessment_start=from_funds(13, "Date/time accurate."),
+            assessment_qa_start=from_funds(14, "Datetime (Confluence says 2022-07-15)."),
+            voting_start=from_funds(16, "Date/time (Confluence says 2022-08-11)."),
+            voting_end=from_funds(17, "Date/time (Confluence says 2022-08-25)."),
+            tallying_end=from_funds(18, "Date/time (Confluence schedule says 2022-09-02)."),
+        ),
+        challenges=ChallengeColumns(
+            id=1,
+            challenge_type=2,
+            title=3,
+            description=4,
+            rewards_total=5,
+            proposers_rewards=6,
+            url=8,
+            highlights=9,
+        ),
+        proposals=ProposalColumns(id=1, notes=True),
+    )
+)
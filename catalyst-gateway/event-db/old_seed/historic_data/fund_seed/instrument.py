@@ -0,0 +1,230 @@
+"""
+Per stage timing, memory and row count instrumentation of the seed generators.
+
+The generator stages (event, objectives, proposals, voteplans, encryption) are wrapped with
+`stage`, the row readers and writers count their rows with `read` and `emitted`.  All of
+these pass straight through unless an `Instrument` is active, so nothing is measured, or
+slowed down, by default.
+
+Stages are lazy generators, interleaved with the writing of their output.  Time, CPU time,
+memory and profiles are only taken while the stage's own code is running, so a stage is not
+charged for the time its output spends being written.
+"""
+
+from __future__ import annotations
+
+import argparse
+import cProfile
+import json
+import os
+import re
+import sqlite3
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+# The instrument of the fund being generated, there is only ever one per process.
+_ACTIVE: Instrument | None = None
+
+
+@dataclass
+class StageStats:
+    """The measurements of one stage of one fund."""
+
+    fund: int
+    stage: str
+    wall_s: float = 0.0
+    # Including the worker processes the stage waited for.
+    cpu_s: float = 0.0
+    # Peak memory traced by `tracemalloc` while the stage ran, `None` if memory is not traced.
+    peak_memory_bytes: int | None = None
+    rows_read: int = 0
+    rows_emitted: int = 0
+    chars_emitted: int = 0
+    # SQLite statement -> number of times it was run, on the connection being generated from.
+    queries: dict[str, int] = field(default_factory=dict)
+    # `pstats` file of the stage, only when profiling.
+    profile: str | None = None
+
+
+def cpu_time() -> float:
+    """CPU time of this process, and of its child processes which have finished."""
+    times = os.times()
+    return time.process_time() + times.children_user + times.children_system
+
+
+class Instrument:
+    """Measure the stages of one fund."""
+
+    def __init__(self, event_id: int, trace_memory: bool = True, profile_dir: Path | None = None):
+        self.event_id = event_id
+        self.trace_memory = trace_memory
+        self.profile_dir = profile_dir
+        self.stages: list[StageStats] = []
+        self.current: StageStats | None = None
+        self._profiles: dict[str, cProfile.Profile] = {}
+
+    def query(self, statement: str) -> None:
+        """Count a SQLite statement against the running stage."""
+        if self.current is not None:
+            statement = re.sub(r"\s+", " ", statement).strip()
+            self.current.queries[statement] = self.current.queries.get(statement, 0) + 1
+
+    def _resume(self, stats: StageStats) -> tuple[StageStats | None, float, float]:
+        """Start measuring `stats`, returns the stage it interrupted and the start times."""
+        previous, self.current = self.current, stats
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        if self.profile_dir is not None:
+            self._profiles.setdefault(stats.stage, cProfile.Profile()).enable()
+        return previous, time.perf_counter(), cpu_time()
+
+    def _pause(self, stats: StageStats, resumed: tuple[StageStats | None, float, float]) -> None:
+        """Stop measuring `stats`, and go back to the stage it interrupted."""
+        previous, wall, cpu = resumed
+        stats.wall_s += time.perf_counter() - wall
+        stats.cpu_s += cpu_time() - cpu
+        if self.profile_dir is not None:
+            self._profiles[stats.stage].disable()
+        if self.trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            stats.peak_memory_bytes = max(stats.peak_memory_bytes or 0, peak)
+        self.current = previous
+
+    def stage(self, name: str, chunks: Iterable[str]) -> Iterator[str]:
+        """Measure a stage while it produces its output."""
+        stats = StageStats(self.event_id, name)
+        self.stages.append(stats)
+        iterator = iter(chunks)
+        while True:
+            resumed = self._resume(stats)
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self._pause(stats, resumed)
+            stats.chars_emitted += len(chunk)
+            yield chunk
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[StageStats]:
+        """Measure a stage which is not a generator, the caller counts its rows."""
+        stats = StageStats(self.event_id, name)
+        self.stages.append(stats)
+        resumed = self._resume(stats)
+        try:
+            yield stats
+        finally:
+            self._pause(stats, resumed)
+
+    def finish(self) -> list[StageStats]:
+        """Write out the profiles, returns the stats of every stage."""
+        if self.profile_dir is not None:
+            for stats in self.stages:
+                path = self.profile_dir / f"fund_{self.event_id}.{stats.stage}.pstats"
+                self._profiles[stats.stage].dump_stats(path)
+                stats.profile = str(path)
+        return self.stages
+
+
+@contextmanager
+def instrumented(
+    event_id: int,
+    con: sqlite3.Connection | None = None,
+    trace_memory: bool = True,
+    profile_dir: Path | None = None,
+) -> Iterator[Instrument]:
+    """Measure every stage run inside the block, and the statements run on `con`."""
+    global _ACTIVE  # pylint: disable=global-statement
+
+    instrument = Instrument(event_id, trace_memory, profile_dir)
+    if profile_dir is not None:
+        profile_dir.mkdir(parents=True, exist_ok=True)
+    if con is not None:
+        con.set_trace_callback(instrument.query)
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+
+    _ACTIVE = instrument
+    try:
+        yield instrument
+    finally:
+        _ACTIVE = None
+        if started_tracing:
+            tracemalloc.stop()
+        if con is not None:
+            con.set_trace_callback(None)
+        instrument.finish()
+
+
+def stage(name: str, chunks: Iterable[str]) -> Iterator[str]:
+    """Measure a generator stage, if instrumented."""
+    if _ACTIVE is None:
+        yield from chunks
+    else:
+        yield from _ACTIVE.stage(name, chunks)
+
+
+@contextmanager
+def measured(name: str) -> Iterator[StageStats | None]:
+    """Measure a stage which is not a generator, if instrumented."""
+    if _ACTIVE is None:
+        yield None
+    else:
+        with _ACTIVE.measure(name) as stats:
+            yield stats
+
+
+def count(rows_read: int = 0, rows_emitted: int = 0) -> None:
+    """Count single rows read or written against the running stage, if instrumented."""
+    if _ACTIVE is not None and _ACTIVE.current is not None:
+        _ACTIVE.current.rows_read += rows_read
+        _ACTIVE.current.rows_emitted += rows_emitted
+
+
+def _count(rows: Iterable[T], instrument: Instrument, attribute: str) -> Iterator[T]:
+    for row in rows:
+        if instrument.current is not None:
+            setattr(instrument.current, attribute, getattr(instrument.current, attribute) + 1)
+        yield row
+
+
+def read(rows: Iterable[T]) -> Iterable[T]:
+    """Count rows read from the fund database against the running stage, if instrumented."""
+    return rows if _ACTIVE is None else _count(rows, _ACTIVE, "rows_read")
+
+
+def emitted(rows: Iterable[T]) -> Iterable[T]:
+    """Count rows written to the output against the running stage, if instrumented."""
+    return rows if _ACTIVE is None else _count(rows, _ACTIVE, "rows_emitted")
+
+
+def add_stats_args(parser: argparse.ArgumentParser) -> None:
+    """Add the instrumentation options to a parser."""
+    parser.add_argument(
+        "--stats",
+        type=Path,
+        help="Write the time, CPU time, peak memory, rows and queries of every stage to this JSON file.",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        type=Path,
+        help="With --stats, also write a cProfile `fund_N.<stage>.pstats` file for every stage to this directory.",
+    )
+
+
+def stats_json(stages: Iterable[StageStats]) -> dict[str, Any]:
+    """The stats of every stage as JSON data."""
+    return {"stages": [asdict(stats) for stats in stages]}
+
+
+def write_stats(path: Path, stages: Iterable[StageStats]) -> None:
+    """Write the stats of every stage to a JSON file."""
+    path.write_text(json.dumps(stats_json(stages), indent=2) + "\n")
@@ -0,0 +1,96 @@
+"""
+Content addressed cache of the generated historic funds.
+
+Every fund is keyed by a digest of its inputs: the fund database, its `block0.bin`, the
+source of `fund_seed` itself and the output options.  The manifest records the digest each
+fund was last generated with, so a fund whose inputs did not change can be skipped.
+
+The loaders do not use the manifest, a database can be dropped and recreated at the same
+URL, so they store the digest in the database they load instead.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterable
+
+MANIFEST = "fund_seed.manifest.json"
+
+# Read this many bytes at a time while hashing.
+HASH_CHUNK_SIZE = 1024 * 1024
+
+PACKAGE = Path(__file__).resolve().parent
+
+
+def file_digest(path: Path | None) -> str | None:
+    """The SHA-256 of a file, `None` if there is no file."""
+    if path is None:
+        return None
+    digest = hashlib.sha256()
+    with path.open("rb") as data:
+        while chunk := data.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def generator_digest() -> str:
+    """The SHA-256 of the `fund_seed` source, any change to the generator invalidates the cache."""
+    digest = hashlib.sha256()
+    for source in sorted(PACKAGE.glob("*.py")):
+        digest.update(source.name.encode("utf-8"))
+        digest.update(source.read_bytes())
+    return digest.hexdigest()
+
+
+def fund_digest(db_path: Path, block0: Path | None, **options: Any) -> str:
+    """The digest of everything a fund's output depends on."""
+    inputs = {
+        "generator": generator_digest(),
+        "database": file_digest(db_path),
+        "block0": file_digest(block0),
+        "options": options,
+    }
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class Manifest:
+    """The digests and outputs funds were last generated with."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: dict[str, dict[str, Any]] = {}
+        if path.is_file():
+            try:
+                self.entries = json.loads(path.read_text())
+            except ValueError:
+                # A corrupt manifest only means everything is regenerated.
+                self.entries = {}
+
+    def fresh(self, key: str, digest: str) -> bool:
+        """Was `key` produced from `digest`, with every output still as it was written."""
+        entry = self.entries.get(key)
+        if entry is None or entry.get("digest") != digest:
+            return False
+        for output, size in entry.get("outputs", {}).items():
+            path = Path(output)
+            if not path.is_file() or path.stat().st_size != size:
+                return False
+        return True
+
+    def record(self, key: str, digest: str, outputs: Iterable[Path] = ()) -> None:
+        """Record that `key` was produced from `digest`."""
+        self.entries[key] = {
+            "digest": digest,
+            "outputs": {str(output): output.stat().st_size for output in outputs},
+        }
+
+    def save(self) -> None:
+        """Write the manifest, atomically."""
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.entries, indent=2, sort_keys=True) + "\n")
+        os.replace(tmp, self.path)
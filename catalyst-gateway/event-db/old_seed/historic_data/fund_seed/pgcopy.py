@@ -0,0 +1,457 @@
+"""
+Generate a historic fund as PostgreSQL `COPY` blocks instead of multi-row `INSERT`s.
+
+Rows are copied into temporary staging tables with well known column types, then moved
+into the event-db tables with a single `INSERT ... SELECT` per table.  Staging means the
+binary format never depends on the exact types of the event-db columns, and the
+proposals can be joined against their objectives once instead of per row.
+
+Text format data is inlined in the SQL script, the way `pg_dump` does it.  Binary format
+data can not be inlined, so each table is written to its own file next to the script and
+loaded with `\\copy`.
+
+`block0.bin` is streamed in chunks into its own staging table and reassembled by postgres,
+its hash is computed on the way, so it is never held in memory or in a psql variable.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import struct
+from dataclasses import fields
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable, Iterator
+
+from .block0 import Block0Reader
+from .funds import FundSpec, Schedule
+from .instrument import emitted, stage
+from .rows import (
+    ObjectiveRow,
+    ProposalRow,
+    event_row,
+    objective_rows,
+    proposal_rows,
+    proposal_voteplan_rows,
+    voteplan_rows,
+)
+from .sql import BLOCK0_CONTENTS, lit
+
+TEXT = "text"
+BINARY = "binary"
+
+# Staging table columns. (name, postgres type)
+BLOCK0_COLUMNS: tuple[tuple[str, str], ...] = (("chunk", "bytea"),)
+
+EVENT_COLUMNS: tuple[tuple[str, str], ...] = (
+    ("row_id", "int4"),
+    ("name", "text"),
+    ("description", "text"),
+    ("voting_power_threshold", "int8"),
+) + tuple((time.name, "timestamp") for time in fields(Schedule)) + (("extra", "jsonb"),)
+
+OBJECTIVE_COLUMNS: tuple[tuple[str, str], ...] = (
+    ("id", "int4"),
+    ("event", "int4"),
+    ("category", "text"),
+    ("title", "text"),
+    ("description", "text"),
+    ("rewards_currency", "text"),
+    ("rewards_total", "int8"),
+    ("rewards_total_lovelace", "int8"),
+    ("proposers_rewards", "int8"),
+    ("vote_options", "int4"),
+    ("extra", "jsonb"),
+)
+
+PROPOSAL_COLUMNS: tuple[tuple[str, str], ...] = (
+    ("id", "int8"),
+    ("objective", "int4"),
+    ("title", "text"),
+    ("summary", "text"),
+    ("category", "text"),
+    ("public_key", "text"),
+    ("funds", "int8"),
+    ("url", "text"),
+    ("files_url", "text"),
+    ("impact_score", "int8"),
+    ("extra", "jsonb"),
+    ("proposer_name", "text"),
+    ("proposer_contact", "text"),
+    ("proposer_url", "text"),
+    ("proposer_relevant_experience", "text"),
+)
+
+VOTEPLAN_COLUMNS: tuple[tuple[str, str], ...] = (
+    ("id", "text"),
+    ("category", "text"),
+    ("encryption_key", "text"),
+)
+
+PROPOSAL_VOTEPLAN_COLUMNS: tuple[tuple[str, str], ...] = (
+    ("proposal_id", "int8"),
+    ("voteplan_id", "text"),
+    ("bb_proposal_index", "int8"),
+)
+
+# Postgres binary COPY framing.
+BINARY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+PG_EPOCH = datetime(2000, 1, 1)
+
+
+def copy_text_escape(value: str) -> str:
+    """Escape a value for the COPY text format."""
+    return (
+        value.replace("\\", "\\\\")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+        .replace("\t", "\\t")
+    )
+
+
+def copy_text_field(value: Any, pg_type: str) -> str:
+    """Encode a single field for the COPY text format."""
+    if value is None:
+        return "\\N"
+    if pg_type == "jsonb":
+        value = json.dumps(value)
+    elif pg_type == "bytea":
+        value = "\\x" + bytes(value).hex()
+    return copy_text_escape(str(value))
+
+
+def copy_text_row(row: Iterable[Any], columns: tuple[tuple[str, str], ...]) -> str:
+    """Encode a row for the COPY text format."""
+    return "\t".join(copy_text_field(value, pg_type) for value, (_, pg_type) in zip(row, columns)) + "\n"
+
+
+def int_field(value: Any, pg_type: str) -> int:
+    """Check an `int4` or `int8` field is an integer, `int()` would truncate floats and parse strings."""
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError(f"Expected an integer {pg_type} field, got {value!r}")
+    return value
+
+
+def copy_binary_field(value: Any, pg_type: str) -> bytes:
+    """Encode a single field, including its length, for the COPY binary format."""
+    if value is None:
+        return struct.pack("!i", -1)
+
+    if pg_type == "int4":
+        data = struct.pack("!i", int_field(value, pg_type))
+    elif pg_type == "int8":
+        data = struct.pack("!q", int_field(value, pg_type))
+    elif pg_type == "text":
+        data = str(value).encode("utf-8")
+    elif pg_type == "jsonb":
+        # jsonb binary format version 1, followed by the json text.
+        data = b"\x01" + json.dumps(value).encode("utf-8")
+    elif pg_type == "timestamp":
+        delta = datetime.strptime(value, "%Y-%m-%d %H:%M:%S") - PG_EPOCH
+        micros = (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+        data = struct.pack("!q", micros)
+    elif pg_type == "bytea":
+        data = bytes(value)
+    else:
+        raise ValueError(f"Unsupported COPY binary type: {pg_type}")
+
+    return struct.pack("!i", len(data)) + data
+
+
+class BinaryCopyWriter:
+    """Write rows in the postgres binary COPY format."""
+
+    def __init__(self, out: BinaryIO, columns: tuple[tuple[str, str], ...]):
+        self.out = out
+        self.columns = columns
+        self.rows = 0
+        # Signature, flags and header extension length.
+        out.write(BINARY_SIGNATURE + struct.pack("!ii", 0, 0))
+
+    def write_row(self, row: Iterable[Any]) -> None:
+        """Write a single tuple."""
+        data = [struct.pack("!h", len(self.columns))]
+        data.extend(copy_binary_field(value, pg_type) for value, (_, pg_type) in zip(row, self.columns))
+        self.out.write(b"".join(data))
+        self.rows += 1
+
+    def close(self) -> None:
+        """Write the file trailer."""
+        self.out.write(struct.pack("!h", -1))
+
+
+def event_stage_row(spec: FundSpec, con: sqlite3.Connection) -> tuple:
+    """The event, in the column order of `EVENT_COLUMNS`."""
+    event = event_row(spec, con)
+    times = tuple(event.time(getattr(spec.schedule, time.name)) for time in fields(Schedule))
+    return (
+        spec.event_id,
+        spec.name,
+        event.funds[spec.fund_goal],
+        event.funds[spec.voting_power_threshold],
+    ) + times + (event.extra,)
+
+
+def objective_stage_row(objective: ObjectiveRow) -> tuple:
+    """An objective, in the column order of `OBJECTIVE_COLUMNS`."""
+    return tuple(objective)
+
+
+def proposal_stage_row(proposal: ProposalRow) -> tuple:
+    """A proposal, in the column order of `PROPOSAL_COLUMNS`."""
+    return tuple(proposal)
+
+
+def stage_table(name: str, columns: tuple[tuple[str, str], ...]) -> str:
+    """Create a temporary staging table, dropped when the fund's transaction commits."""
+    column_defs = ",\n".join(f"    {column} {pg_type}" for column, pg_type in columns)
+    return f"""CREATE TEMPORARY TABLE {name}
+(
+    seq BIGINT GENERATED ALWAYS AS IDENTITY,
+{column_defs}
+) ON COMMIT DROP;
+"""
+
+
+def event_insert(block0: str, block0_hash: str) -> str:
+    """Move the staged event into `event`, `block0` and `block0_hash` are SQL expressions."""
+    times = [time.name for time in fields(Schedule)]
+    return f"""INSERT INTO event
+(row_id, name, description,
+ {", ".join(times[:4])},
+ voting_power_threshold, max_voting_power_pct,
+ {", ".join(times[4:])},
+ block0, block0_hash, committee_size, committee_threshold, extra)
+SELECT
+ row_id, name, description,
+ {", ".join(times[:4])},
+ voting_power_threshold, 100,
+ {", ".join(times[4:])},
+ {block0}, {block0_hash}, 0, 0, extra
+FROM seed_event;
+"""
+
+
+def objective_insert() -> str:
+    """Move the staged objectives into `objective`."""
+    columns = ", ".join(column for column, _ in OBJECTIVE_COLUMNS)
+    return f"""INSERT INTO objective
+({columns})
+SELECT {columns}
+FROM seed_objective
+ORDER BY seq;
+"""
+
+
+def proposal_insert(event_id: int) -> str:
+    """Move the staged proposals into `proposal`, joined once against their objectives."""
+    return f"""INSERT INTO proposal
+(
+    id,
+    objective,
+    title,
+    summary,
+    category,
+    public_key,
+    funds,
+    url,
+    files_url,
+    impact_score,
+    extra,
+    proposer_name,
+    proposer_contact,
+    proposer_url,
+    proposer_relevant_experience,
+    bb_proposal_id,
+    bb_vote_options
+)
+SELECT
+    p.id,
+    o.row_id,
+    p.title,
+    p.summary,
+    COALESCE(p.category, o.category),
+    p.public_key,
+    p.funds,
+    p.url,
+    p.files_url,
+    p.impact_score,
+    p.extra,
+    p.proposer_name,
+    p.proposer_contact,
+    p.proposer_url,
+    p.proposer_relevant_experience,
+    'None', -- bb_proposal_id
+    '{{ "yes", "no" }}' -- bb_vote_options - Deprecated VitSS compat ONLY.
+FROM seed_proposal AS p
+LEFT JOIN objective AS o ON o.id = p.objective AND o.event = {event_id}
+ORDER BY p.seq;
+"""
+
+
+def voteplan_insert(event_id: int) -> str:
+    """Replace the staged voteplans, attached to the first objective of the event."""
+    return f"""DELETE FROM voteplan WHERE id IN (SELECT id FROM seed_voteplan);
+INSERT INTO voteplan (objective_id, id, category, encryption_key)
+SELECT
+    (SELECT MIN(row_id) FROM objective WHERE event = {event_id}),
+    v.id,
+    v.category,
+    v.encryption_key
+FROM seed_voteplan AS v
+ORDER BY v.seq;
+"""
+
+
+def proposal_voteplan_insert(event_id: int) -> str:
+    """Link the staged proposals to their voteplans, with one join for the whole event."""
+    return f"""INSERT INTO proposal_voteplan (proposal_id, voteplan_id, bb_proposal_index)
+SELECT
+    p.row_id,
+    v.row_id,
+    s.bb_proposal_index
+FROM seed_proposal_voteplan AS s
+JOIN objective AS o ON o.event = {event_id}
+JOIN proposal AS p ON p.objective = o.row_id AND p.id = s.proposal_id
+JOIN voteplan AS v ON v.id = s.voteplan_id
+ORDER BY s.seq;
+"""
+
+
+class FundCopy:
+    """Generate the COPY script for a single fund."""
+
+    def __init__(
+        self,
+        spec: FundSpec,
+        con: sqlite3.Connection,
+        fmt: str = TEXT,
+        data_dir: Path | None = None,
+        data_prefix: str = "historic_data",
+        block0: Path | None = None,
+    ):
+        if fmt not in (TEXT, BINARY):
+            raise ValueError(f"Unknown COPY format: {fmt}")
+        if fmt == BINARY and data_dir is None:
+            raise ValueError("The binary COPY format needs a directory for its data files.")
+
+        self.spec = spec
+        self.con = con
+        self.fmt = fmt
+        self.data_dir = data_dir
+        self.data_prefix = data_prefix
+        self.block0 = block0
+
+    def copy(self, table: str, columns: tuple[tuple[str, str], ...], rows: Iterable[tuple]) -> Iterator[str]:
+        """Yield the staging table, and the COPY of `rows` into it."""
+        name = f"seed_{table}"
+        column_list = ", ".join(column for column, _ in columns)
+
+        yield stage_table(name, columns)
+
+        if self.fmt == TEXT:
+            yield f"COPY {name} ({column_list}) FROM STDIN;\n"
+            for row in emitted(rows):
+                yield copy_text_row(row, columns)
+            yield "\\.\n\n"
+            return
+
+        assert self.data_dir is not None
+        filename = f"fund_{self.spec.event_id}.{table}.copy"
+        with (self.data_dir / filename).open("wb") as out:
+            writer = BinaryCopyWriter(out, columns)
+            for row in emitted(rows):
+                writer.write_row(row)
+            writer.close()
+
+        yield f"\\copy {name} ({column_list}) FROM '{self.data_prefix}/{filename}' WITH (FORMAT binary)\n\n"
+
+    def event_table(self) -> Iterator[str]:
+        """Yield Block 0 and the Event record."""
+        block0 = Block0Reader(self.block0)
+
+        yield "-- Stream the raw Block0 Binary from the file.\n"
+        yield from self.copy("block0", BLOCK0_COLUMNS, ((chunk,) for chunk in block0.chunks()))
+        yield from self.copy("event", EVENT_COLUMNS, [event_stage_row(self.spec, self.con)])
+        # Block 0 has been read by now, so its hash is known.
+        yield event_insert(BLOCK0_CONTENTS, lit(block0.hash)) + "\n"
+
+    def objective_table(self) -> Iterator[str]:
+        """Yield the Objectives."""
+        rows = (objective_stage_row(objective) for objective in objective_rows(self.spec, self.con))
+
+        yield from self.copy("objective", OBJECTIVE_COLUMNS, rows)
+        yield objective_insert() + "\n"
+
+    def proposals_table(self) -> Iterator[str]:
+        """Yield the Proposals, joined once against their objectives."""
+        rows = (proposal_stage_row(proposal) for proposal in proposal_rows(self.spec, self.con))
+
+        yield from self.copy("proposal", PROPOSAL_COLUMNS, rows)
+        yield proposal_insert(self.spec.event_id) + "\n"
+
+    def voteplans_table(self) -> Iterator[str]:
+        """Yield the Voteplans, and link the proposals to them with a single join."""
+        yield from self.copy("voteplan", VOTEPLAN_COLUMNS, voteplan_rows(self.con))
+        yield voteplan_insert(self.spec.event_id) + "\n"
+        links = proposal_voteplan_rows(self.spec, self.con)
+        yield from self.copy("proposal_voteplan", PROPOSAL_VOTEPLAN_COLUMNS, links)
+        yield proposal_voteplan_insert(self.spec.event_id) + "\n"
+
+    def voteplan_script(self) -> Iterator[str]:
+        """Yield the script loading the voteplans of a fund which has already been loaded."""
+        yield f"""--sql
+-- Voteplans of {self.spec.name}
+-- AUTOGENERATED - DO NOT EDIT
+-- Bulk loaded with COPY ({self.fmt}) through temporary staging tables.
+
+BEGIN;
+
+"""
+        yield from stage("voteplans", self.voteplans_table())
+        yield "COMMIT;\n"
+
+    def script(self) -> Iterator[str]:
+        """Yield the complete script for the fund."""
+        spec = self.spec
+        header = "".join(f"-- {line}\n" for line in spec.header)
+
+        yield f"""--sql
+-- Data from {spec.name}
+{header}-- AUTOGENERATED - DO NOT EDIT
+-- Bulk loaded with COPY ({self.fmt}) through temporary staging tables.
+
+BEGIN;
+
+-- Purge all Fund {spec.event_id} data before re-inserting it.
+DELETE FROM event WHERE row_id = {spec.event_id};
+
+"""
+        yield from stage("event", self.event_table())
+        yield from stage("objective", self.objective_table())
+        yield from stage("proposals", self.proposals_table())
+        yield "COMMIT;\n"
+
+
+def fund_copy(
+    spec: FundSpec,
+    con: sqlite3.Connection,
+    fmt: str = TEXT,
+    data_dir: Path | None = None,
+    data_prefix: str = "historic_data",
+    block0: Path | None = None,
+) -> Iterator[str]:
+    """Yield the COPY script for a fund, piece by piece."""
+    yield from FundCopy(spec, con, fmt, data_dir, data_prefix, block0).script()
+
+
+def voteplan_copy(
+    spec: FundSpec,
+    con: sqlite3.Connection,
+    fmt: str = TEXT,
+    data_dir: Path | None = None,
+    data_prefix: str = "historic_data",
+) -> Iterator[str]:
+    """Yield the COPY script for the voteplans of a fund, piece by piece."""
+    yield from FundCopy(spec, con, fmt, data_dir, data_prefix).voteplan_script()
@@ -0,0 +1,46 @@
+"""
+Bulk prefetch of the proposal side tables.
+
+Instead of querying the side tables once per proposal and note, each table is read once
+with a single projected query into an in memory index keyed by `proposal_id`.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+
+from .funds import PROPOSAL_NOTES
+from .instrument import read
+
+
+def note_tables(notes: tuple[tuple[str, str, str], ...] = PROPOSAL_NOTES) -> dict[str, list[tuple[str, str]]]:
+    """Group the notes by table, keeping their order.  table -> [(extra key, column)]"""
+    tables: dict[str, list[tuple[str, str]]] = {}
+    for key, table, column in notes:
+        tables.setdefault(table, []).append((key, column))
+    return tables
+
+
+def prefetch_notes(
+    con: sqlite3.Connection, notes: tuple[tuple[str, str, str], ...] = PROPOSAL_NOTES
+) -> dict[str, dict[str, str]]:
+    """
+    Load every proposal note with one query per side table.
+
+    Returns `proposal_id` -> {extra key: note}, only notes which are not NULL are present.
+    Keys are in the order of `notes`.
+    """
+    index: dict[str, dict[str, str]] = {}
+
+    cur = con.cursor()
+    for table, columns in note_tables(notes).items():
+        projection = ", ".join(column for _, column in columns)
+        cur.execute(f"SELECT proposal_id, {projection} FROM {table}")
+        for row in read(cur):
+            proposal_notes = index.setdefault(str(row[0]), {})
+            for (key, _), value in zip(columns, row[1:]):
+                if value is not None:
+                    proposal_notes.setdefault(key, value)
+    cur.close()
+
+    return index
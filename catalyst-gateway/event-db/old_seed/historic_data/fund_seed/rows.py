@@ -0,0 +1,247 @@
+"""
+Read the rows of a historic fund database, lazily, in the shape of the event-db tables.
+
+Values are returned raw, quoting and escaping is left to the output format.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from time import gmtime, strftime
+from typing import Any, Iterator, NamedTuple
+
+from .funds import FundSpec, Time
+from .instrument import count, read
+from .prefetch import prefetch_notes
+
+# The table of the RSA wrapped data keys of an `envelope` encrypted database.
+KEYS_TABLE = "encryption_keys"
+
+
+def epoch_to_time(epoch: int) -> str:
+    """Convert an epoch time into a time string."""
+    return strftime("%Y-%m-%d %H:%M:%S", gmtime(epoch))
+
+
+def proposal_id(value: int | str) -> int:
+    """Convert a proposal id, Fund 2 keys its proposals by their Ideascale id, stored as text."""
+    return int(value) if isinstance(value, str) else value
+
+
+class EventRow(NamedTuple):
+    """The `funds` and first `voteplans` row a fund's event is built from, and its data keys."""
+
+    funds: tuple
+    voteplans: tuple | None
+    # key id -> public key and wrapped data key, see `fund_seed.encrypt`.
+    encryption_keys: dict[str, dict[str, str]]
+
+    def time(self, time: Time) -> str | None:
+        """Resolve a time in the event schedule, `None` if it is not known."""
+        if time.funds is not None:
+            return epoch_to_time(self.funds[time.funds])
+        if time.voteplans is not None and self.voteplans is not None:
+            return epoch_to_time(self.voteplans[time.voteplans])
+        return time.literal
+
+    @property
+    def extra(self) -> dict[str, Any] | None:
+        """The event's `extra`, carrying the data keys its `AES:` values can be decrypted with."""
+        if not self.encryption_keys:
+            return None
+        return {KEYS_TABLE: self.encryption_keys}
+
+
+class ObjectiveRow(NamedTuple):
+    """A row of the `objective` table."""
+
+    id: int
+    event: int
+    category: str
+    title: str
+    description: str
+    rewards_currency: str
+    rewards_total: int
+    rewards_total_lovelace: int | None
+    proposers_rewards: int | None
+    vote_options: int
+    extra: dict[str, Any] | None
+
+
+class ProposalRow(NamedTuple):
+    """A row of the `proposal` table."""
+
+    id: int
+    # Ideascale id of the objective, unique within the event.
+    objective: int
+    title: str
+    summary: str
+    # `None` if the category has to be looked up from the objective.
+    category: str | None
+    public_key: str
+    funds: int
+    url: str
+    files_url: str
+    impact_score: int
+    extra: dict[str, Any]
+    proposer_name: str
+    proposer_contact: str
+    proposer_url: str
+    proposer_relevant_experience: str
+
+
+class VoteplanRow(NamedTuple):
+    """A row of the `voteplan` table."""
+
+    id: str
+    category: str
+    encryption_key: str
+
+
+class ProposalVoteplanRow(NamedTuple):
+    """A row of the `proposal_voteplan` table, keyed by the ids of both sides."""
+
+    proposal_id: int
+    voteplan_id: str
+    bb_proposal_index: int
+
+
+def event_row(spec: FundSpec, con: sqlite3.Connection) -> EventRow:
+    """Read the source data of the fund's event."""
+    cur = con.cursor()
+    if spec.funds_row_id is None:
+        funds = cur.execute("SELECT * FROM funds LIMIT 1").fetchone()
+    else:
+        funds = cur.execute("SELECT * FROM funds WHERE id = ?", (spec.funds_row_id,)).fetchone()
+
+    voteplans = cur.execute("SELECT * FROM voteplans LIMIT 1").fetchone()
+    cur.close()
+    count(rows_read=(funds is not None) + (voteplans is not None))
+
+    return EventRow(funds, voteplans, encryption_keys(con))
+
+
+def encryption_keys(con: sqlite3.Connection) -> dict[str, dict[str, str]]:
+    """Read the wrapped data keys of the fund, if it was encrypted in the `envelope` format."""
+    cur = con.cursor()
+    exists = cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (KEYS_TABLE,))
+    keys: dict[str, dict[str, str]] = {}
+    if exists.fetchone() is not None:
+        for key_id, public_key, wrapped_key in read(
+            cur.execute(f"SELECT key_id, public_key, wrapped_key FROM {KEYS_TABLE} ORDER BY key_id")
+        ):
+            keys[key_id] = {"public_key": public_key, "wrapped_key": wrapped_key}
+    cur.close()
+    return keys
+
+
+def objective_rows(spec: FundSpec, con: sqlite3.Connection) -> Iterator[ObjectiveRow]:
+    """Yield the objectives of the fund."""
+
+    if spec.objective is not None:
+        objective = spec.objective
+        yield ObjectiveRow(
+            id=objective.id,
+            event=spec.event_id,
+            category=objective.category,
+            title=objective.title,
+            description=objective.description,
+            rewards_currency="USD_ADA",
+            rewards_total=objective.rewards_total,
+            rewards_total_lovelace=objective.rewards_total_lovelace,
+            proposers_rewards=None,
+            vote_options=1,
+            extra=None,
+        )
+        return
+
+    columns = spec.challenges
+    assert columns is not None, f"Fund {spec.event_id} has neither challenges nor a fixed objective."
+
+    cur = con.cursor()
+    for challenge in read(cur.execute("SELECT * FROM challenges")):
+        extra: dict[str, Any] = {"url": {"objective": challenge[columns.url]}}
+        if columns.highlights is not None:
+            challenge_highlights = challenge[columns.highlights]
+            if challenge_highlights == "null":
+                challenge_highlights = None
+            extra["highlights"] = challenge_highlights
+
+        yield ObjectiveRow(
+            id=challenge[columns.id],
+            event=spec.event_id,
+            category=f"catalyst-{challenge[columns.challenge_type]}",
+            title=challenge[columns.title],
+            description=challenge[columns.description],
+            rewards_currency="USD_ADA",
+            rewards_total=challenge[columns.rewards_total],
+            rewards_total_lovelace=None,
+            proposers_rewards=None if columns.proposers_rewards is None else challenge[columns.proposers_rewards],
+            vote_options=1,
+            extra=extra,
+        )
+    cur.close()
+
+
+def proposal_rows(spec: FundSpec, con: sqlite3.Connection) -> Iterator[ProposalRow]:
+    """Yield the proposals of the fund."""
+
+    columns = spec.proposals
+    notes = prefetch_notes(con) if columns.notes else {}
+
+    cur = con.cursor()
+    for proposal in read(cur.execute("SELECT * FROM proposals")):
+        if columns.challenge is None:
+            objective_id = spec.objective.id if spec.objective is not None else 0
+        else:
+            objective_id = proposal[columns.challenge]
+
+        extra: dict[str, Any] = {}
+        for key, column in columns.extra:
+            if proposal[column] is not None:
+                extra[key] = proposal[column]
+        extra.update(notes.get(str(proposal[columns.proposal_id]), {}))
+
+        yield ProposalRow(
+            id=proposal_id(proposal[columns.id]),
+            objective=objective_id,
+            title=proposal[columns.title],
+            summary=proposal[columns.summary],
+            category=spec.objective.category if spec.objective is not None else None,
+            public_key=proposal[columns.public_key],
+            funds=proposal[columns.funds],
+            url=proposal[columns.url],
+            files_url=proposal[columns.files_url],
+            impact_score=proposal[columns.impact_score],
+            extra=extra,
+            proposer_name=proposal[columns.proposer_name],
+            proposer_contact=proposal[columns.proposer_contact],
+            proposer_url=proposal[columns.proposer_url],
+            proposer_relevant_experience=proposal[columns.relevant_experience],
+        )
+    cur.close()
+
+
+def voteplan_rows(con: sqlite3.Connection) -> Iterator[VoteplanRow]:
+    """Yield the voteplans of the fund."""
+    cur = con.cursor()
+    yield from (
+        VoteplanRow(*voteplan)
+        for voteplan in read(
+            cur.execute("SELECT chain_voteplan_id, chain_voteplan_payload, chain_vote_encryption_key FROM voteplans")
+        )
+    )
+    cur.close()
+
+
+def proposal_voteplan_rows(spec: FundSpec, con: sqlite3.Connection) -> Iterator[ProposalVoteplanRow]:
+    """Yield the voteplan of every proposal of the fund, with a single projected query."""
+    cur = con.cursor()
+    names = [column[1] for column in cur.execute("PRAGMA table_info(proposals)")]
+    id_column = names[spec.proposals.id]
+
+    yield from (
+        ProposalVoteplanRow(proposal_id(link_id), voteplan_id, bb_proposal_index)
+        for link_id, voteplan_id, bb_proposal_index in read(cur.execute(f"SELECT {id_column}, chain_voteplan_id, chain_proposal_index FROM proposals"))
+    )
+    cur.close()
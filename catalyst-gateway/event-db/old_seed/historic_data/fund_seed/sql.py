@@ -0,0 +1,319 @@
+"""
+Generate the SQL for a single historic fund, driven by its `FundSpec`.
+
+The SQL is yielded in small pieces as the rows are read from the fund database, so it
+can be streamed to its destination without ever holding the whole file in memory.
+
+`block0.bin` is streamed in chunks into a temporary staging table, one `INSERT` per chunk,
+and reassembled by postgres, the same way the `COPY` scripts stage it.  Its hash is computed
+on the way, so it is never held in memory or in a psql variable.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from pathlib import Path
+from typing import Any, Iterator
+
+from .block0 import Block0Reader
+from .funds import FundSpec, Time
+from .instrument import count, emitted, stage
+from .rows import ObjectiveRow, ProposalRow, event_row, objective_rows, proposal_rows
+
+# Block 0, reassembled from its staged chunks.  NULL if there were none.
+BLOCK0_CONTENTS = "(SELECT string_agg(chunk, ''::bytea ORDER BY seq) FROM seed_block0)"
+
+
+def pg_esc(line: str | None) -> str | None:
+    """Escape a string for postgres."""
+    if line is None:
+        return None
+    return line.replace("'", "''")
+
+
+def lit(value: Any) -> str:
+    """Return a value as a quoted postgres string literal, or `NULL`."""
+    if value is None:
+        return "NULL"
+    return f"'{pg_esc(str(value))}'"
+
+
+def num(value: Any) -> str:
+    """Return a value as a postgres numeric literal, or `NULL`."""
+    if value is None:
+        return "NULL"
+    return str(value)
+
+
+def jsonb(value: Any) -> str:
+    """Return a value as a quoted postgres JSON literal, or `NULL`."""
+    if value is None:
+        return "NULL"
+    return lit(json.dumps(value))
+
+
+def block0_table(block0: Block0Reader) -> Iterator[str]:
+    """Yield the Block 0 staging table, and an `INSERT` of every chunk of Block 0 into it."""
+    yield """CREATE TEMPORARY TABLE seed_block0
+(
+    seq BIGINT GENERATED ALWAYS AS IDENTITY,
+    chunk bytea
+);
+"""
+    for chunk in block0.chunks():
+        yield f"INSERT INTO seed_block0 (chunk) VALUES (decode('{chunk.hex()}', 'hex'));\n"
+
+
+def event_table(spec: FundSpec, con: sqlite3.Connection, block0: Path | None = None) -> Iterator[str]:
+    """Yield the start of the SQL file and the Event table definition."""
+
+    event = event_row(spec, con)
+    funds = event.funds
+
+    event_id = spec.event_id
+    schedule = spec.schedule
+
+    def time(name: str, label: str) -> str:
+        value: Time = getattr(schedule, name)
+        return f" {lit(event.time(value))}, -- {label} - {value.note}"
+
+    header = "".join(f"-- {line}\n" for line in spec.header)
+
+    count(rows_emitted=1)
+    yield f"""--sql
+-- Data from {spec.name}
+{header}-- AUTOGENERATED - DO NOT EDIT
+
+-- Purge all Fund {event_id} data before re-inserting it.
+DELETE FROM event WHERE row_id = {event_id};
+
+-- Stream the raw Block0 Binary from the file.
+"""
+    reader = Block0Reader(block0)
+    yield from block0_table(reader)
+
+    # Block 0 has been read by now, so its hash is known.
+    yield f"""
+-- Create the Event record for Fund {event_id}
+
+INSERT INTO event
+(row_id, name, description,
+ start_time,
+ end_time,
+ registration_snapshot_time,
+ snapshot_start,
+ voting_power_threshold,
+ max_voting_power_pct,
+ insight_sharing_start,
+ proposal_submission_start,
+ refine_proposals_start,
+ finalize_proposals_start,
+ proposal_assessment_start,
+ assessment_qa_start,
+ voting_start,
+ voting_end,
+ tallying_end,
+ block0,
+ block0_hash,
+ committee_size,
+ committee_threshold,
+ extra)
+VALUES
+
+({event_id}, '{spec.name}', {lit(funds[spec.fund_goal])},
+{time("start_time", "Start Time")}
+{time("end_time", "End Time  ")}
+{time("registration_snapshot_time", "Registration Snapshot Time")}
+{time("snapshot_start", "Snapshot Start")}
+ {funds[spec.voting_power_threshold]},            -- Voting Power Threshold -- Accurate
+ 100,                   -- Max Voting Power PCT - No max% threshold used in this fund.
+{time("insight_sharing_start", "Insight Sharing Start")}
+{time("proposal_submission_start", "Proposal Submission Start")}
+{time("refine_proposals_start", "Refine Proposals Start")}
+{time("finalize_proposals_start", "Finalize Proposals Start")}
+{time("proposal_assessment_start", "Proposal Assessment Start")}
+{time("assessment_qa_start", "Assessment QA Start")}
+{time("voting_start", "Voting Starts")}
+{time("voting_end", "Voting Ends")}
+{time("tallying_end", "Tallying Ends")}
+ {BLOCK0_CONTENTS},
+                        -- Block 0 Data - From File
+ {lit(reader.hash)},
+                        -- Block 0 Hash - Of the header in the file
+ 0,                     -- Committee Size - No Encrypted Votes
+ 0,                     -- Committee Threshold - No Encrypted Votes
+ {jsonb(event.extra)}
+                        -- Extra - The wrapped data keys of `AES:` encrypted values
+ );
+
+-- Free large binary file contents
+DROP TABLE seed_block0;
+
+"""
+
+
+def values(rows: Iterator[str]) -> Iterator[str]:
+    """Join the rows of a multi-row `VALUES` list."""
+    first = True
+    for row in emitted(rows):
+        if not first:
+            yield ",\n"
+        first = False
+        yield row
+
+
+def objective_value(objective: ObjectiveRow) -> str:
+    """Return a single objective of the `VALUES` list."""
+    return f"""
+(
+    {objective.id}, -- Objective ID
+    {objective.event}, -- event id
+    {lit(objective.category)}, -- category
+    {lit(objective.title)}, -- title
+    {lit(objective.description)}, -- description
+    {lit(objective.rewards_currency)}, -- Currency
+    {num(objective.rewards_total)}, -- rewards total
+    {num(objective.rewards_total_lovelace)}, -- rewards_total_lovelace
+    {num(objective.proposers_rewards)}, -- proposers rewards
+    {num(objective.vote_options)}, -- vote_options
+    {jsonb(objective.extra)} -- extra objective data
+)
+"""
+
+
+def objective_table(spec: FundSpec, con: sqlite3.Connection) -> Iterator[str]:
+    """Yield the Objective table data."""
+
+    yield f"""--sql
+-- Challenges for Fund {spec.event_id}
+INSERT INTO objective
+(
+    id,
+    event,
+    category,
+    title,
+    description,
+    rewards_currency,
+    rewards_total,
+    rewards_total_lovelace,
+    proposers_rewards,
+    vote_options,
+    extra)
+VALUES
+"""
+    yield from values(objective_value(objective) for objective in objective_rows(spec, con))
+    yield """
+;
+
+"""
+
+
+def proposal_value(proposal: ProposalRow, seq: int) -> str:
+    """Return a single proposal of the `VALUES` list, in file order `seq`."""
+
+    return f"""
+(
+    {seq}, -- seq
+    {proposal.id},  -- id
+    {proposal.objective}, -- objective id, resolved to its row_id by the join
+    {lit(proposal.title)},  -- title
+    {lit(proposal.summary)},  -- summary
+    {lit(proposal.category)}, -- category - VITSS Compat ONLY
+    {lit(proposal.public_key)}, -- Public Payment Key
+    {lit(proposal.funds)}, -- funds
+    {lit(proposal.url)}, -- url
+    {lit(proposal.files_url)}, -- files_url
+    {num(proposal.impact_score)}, -- impact_score
+    {jsonb(proposal.extra)}, -- extra
+    {lit(proposal.proposer_name)}, -- proposer name
+    {lit(proposal.proposer_contact)}, -- proposer contact
+    {lit(proposal.proposer_url)}, -- proposer URL
+    {lit(proposal.proposer_relevant_experience)} -- relevant experience
+)
+"""
+
+
+def proposals_table(spec: FundSpec, con: sqlite3.Connection) -> Iterator[str]:
+    """
+    Yield the proposals.
+
+    The objective `row_id`s are only known to the database, they are resolved with a
+    single join for all the proposals, as are the categories taken from their objective.
+    """
+
+    event_id = spec.event_id
+
+    yield f"""--sql
+-- All Proposals for  FUND {event_id}
+INSERT INTO proposal
+(
+    id,
+    objective,
+    title,
+    summary,
+    category,
+    public_key,
+    funds,
+    url,
+    files_url,
+    impact_score,
+    extra,
+    proposer_name,
+    proposer_contact,
+    proposer_url,
+    proposer_relevant_experience,
+    bb_proposal_id,
+    bb_vote_options
+)
+SELECT
+    p.id,
+    o.row_id,
+    p.title,
+    p.summary,
+    COALESCE(p.category, o.category),
+    p.public_key,
+    p.funds::BIGINT,
+    p.url,
+    p.files_url,
+    p.impact_score,
+    p.extra::JSONB,
+    p.proposer_name,
+    p.proposer_contact,
+    p.proposer_url,
+    p.proposer_relevant_experience,
+    'None', -- bb_proposal_id
+    '{{ "yes", "no" }}' -- bb_vote_options - Deprecated VitSS compat ONLY.
+FROM (VALUES
+"""
+    yield from values(proposal_value(proposal, seq) for seq, proposal in enumerate(proposal_rows(spec, con)))
+    yield f"""
+) AS p (
+    seq,
+    id,
+    objective,
+    title,
+    summary,
+    category,
+    public_key,
+    funds,
+    url,
+    files_url,
+    impact_score,
+    extra,
+    proposer_name,
+    proposer_contact,
+    proposer_url,
+    proposer_relevant_experience
+)
+LEFT JOIN objective AS o ON o.id = p.objective AND o.event = {event_id}
+ORDER BY p.seq
+;
+"""
+
+
+def fund_sql(spec: FundSpec, con: sqlite3.Connection, block0: Path | None = None) -> Iterator[str]:
+    """Yield the complete SQL for a fund, piece by piece.  `block0` is streamed and hashed for `block0_hash`."""
+    yield from stage("event", event_table(spec, con, block0))
+    yield from stage("objective", objective_table(spec, con))
+    yield from stage("proposals", proposals_table(spec, con))
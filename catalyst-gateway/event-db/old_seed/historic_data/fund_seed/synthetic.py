@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Generate synthetic historic fund databases, at any scale, for scale testing.
+
+The schema of the generated database is copied verbatim from a checked in fund database
+(`--like`), so the output is read by `fund_seed` exactly as that fund's database is.  The
+`funds` row and the voteplan times are copied as well, so the event schedule is real, the
+`challenges`, `proposals`, proposal side tables and `voteplans` are generated.
+
+Every value is drawn from a random generator seeded by `--seed`, so the same arguments
+always produce the same database:
+
+    python3 -m fund_seed.synthetic --proposals 100000 --challenges 500 --out-dir /tmp/synthetic
+    python3 -m fund_seed --data-dir /tmp/synthetic --fund 5 --format copy-binary
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import shutil
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from .__main__ import HISTORIC_DATA, fund_database, is_dir, is_fund
+from .block0 import BLOCK0
+
+# Jormungandr allows at most this many proposals in a single voteplan.
+PROPOSALS_PER_VOTEPLAN = 255
+
+# Rows are inserted in batches of this many.
+BATCH_SIZE = 10_000
+
+# Paragraphs are drawn from a fixed pool, generating fresh text for every row dominates the run time.
+PARAGRAPHS = 4096
+
+COMMUNITY_CHOICE = "community-choice"
+SIMPLE = "simple"
+
+# Side table holding the notes of the proposals of each challenge type.
+NOTE_TABLES = {
+    SIMPLE: "proposal_simple_challenge",
+    COMMUNITY_CHOICE: "proposal_community_choice_challenge",
+}
+
+WORDS = (
+    "cardano catalyst community proposal fund project developer wallet adoption ecosystem "
+    "governance treasury voting stake pool dapp smart contract plutus marlowe education "
+    "outreach africa latin america asia europe integration oracle identity defi nft "
+    "metadata tooling library documentation research security audit scale network node "
+    "infrastructure open source impact budget milestone team experience deliver growth "
+    "users partners local global sustainable transparent decentralized"
+).split()
+
+
+def is_positive(value: str) -> int:
+    """Is this a positive number."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"{value} is not a positive number.")
+    return number
+
+
+def batched(rows: Iterable[tuple], size: int = BATCH_SIZE) -> Iterator[list[tuple]]:
+    """Split rows into batches of `size` rows."""
+    iterator = iter(rows)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def hex_id(rng: random.Random) -> str:
+    """A random 32 byte hex encoded id, like the chain ids."""
+    return rng.randbytes(32).hex()
+
+
+class Text:
+    """Deterministic filler text, drawn from a pool of pre generated paragraphs."""
+
+    def __init__(self, rng: random.Random, paragraphs: int = PARAGRAPHS):
+        self.rng = rng
+        self.paragraphs = [self.words(rng.randint(15, 120)) for _ in range(paragraphs)]
+
+    def words(self, count: int) -> str:
+        """`count` random words, as a sentence."""
+        return " ".join(self.rng.choices(WORDS, k=count)).capitalize() + "."
+
+    def title(self) -> str:
+        """A short title."""
+        return self.words(self.rng.randint(3, 8))[:-1].title()
+
+    def paragraph(self) -> str:
+        """A paragraph from the pool."""
+        return self.rng.choice(self.paragraphs)
+
+
+@dataclass(frozen=True)
+class Template:
+    """What is copied from the checked in database of the fund being scaled up."""
+
+    event_id: int
+    schema: list[str]
+    funds: list[tuple]
+    fund_id: int
+    fund_name: str
+    voteplan_times: tuple[int, int, int]
+    columns: dict[str, list[str]]
+    # The oldest funds used the numeric Ideascale id as `proposal_id`, not the chain id.
+    numeric_proposal_ids: bool
+
+    @classmethod
+    def read(cls, event_id: int, path: Path) -> Template:
+        """Read the template from a fund database."""
+        con = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            schema = [
+                sql
+                for (sql,) in con.execute(
+                    "SELECT sql FROM sqlite_master"
+                    " WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%'"
+                    " ORDER BY CASE type WHEN 'table' THEN 0 WHEN 'index' THEN 1 ELSE 2 END, rowid"
+                )
+            ]
+            tables = [name for (name,) in con.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+            columns = {
+                table: [column[1] for column in con.execute(f"PRAGMA table_info({table})")]
+                for table in tables
+                if not table.startswith("sqlite_")
+            }
+            funds = con.execute("SELECT * FROM funds").fetchall()
+            fund_id, fund_name = con.execute("SELECT id, fund_name FROM funds ORDER BY id DESC LIMIT 1").fetchone()
+            voteplan_times = con.execute(
+                "SELECT chain_vote_start_time, chain_vote_end_time, chain_committee_end_time FROM voteplans LIMIT 1"
+            ).fetchone()
+            (proposal_id,) = con.execute("SELECT proposal_id FROM proposals LIMIT 1").fetchone()
+        finally:
+            con.close()
+
+        return cls(event_id, schema, funds, fund_id, fund_name, voteplan_times, columns, str(proposal_id).isdigit())
+
+
+class SyntheticFund:
+    """Generate the rows of a synthetic fund, in the column order of the template."""
+
+    def __init__(self, template: Template, proposals: int, challenges: int, seed: int, community_choice: float):
+        self.template = template
+        self.proposals = proposals
+        self.challenges = challenges
+        self.community_choice = community_choice
+        self.rng = random.Random(seed)
+        self.text = Text(self.rng)
+        self.voteplan_ids = [hex_id(self.rng) for _ in range(-(-proposals // PROPOSALS_PER_VOTEPLAN))]
+        # challenge id -> challenge type
+        self.challenge_types: dict[int, str] = {}
+
+    def rows(self, table: str, values: Iterator[dict[str, Any]]) -> Iterator[tuple]:
+        """Order generated values by the columns of the template's table."""
+        columns = self.template.columns[table]
+        for row in values:
+            missing = set(columns) - row.keys()
+            if missing:
+                raise ValueError(f"Can not generate {table} columns {', '.join(sorted(missing))}.")
+            yield tuple(row[column] for column in columns)
+
+    def challenge_values(self) -> Iterator[dict[str, Any]]:
+        """Generate the challenges."""
+        for challenge_id in range(1, self.challenges + 1):
+            challenge_type = COMMUNITY_CHOICE if self.rng.random() < self.community_choice else SIMPLE
+            self.challenge_types[challenge_id] = challenge_type
+            rewards_total = self.rng.randrange(100_000, 10_000_000, 50_000)
+            yield {
+                "id": challenge_id,
+                "internal_id": challenge_id,
+                "challenge_type": challenge_type,
+                "title": self.text.title(),
+                "description": self.text.paragraph(),
+                "rewards_total": rewards_total,
+                "proposers_rewards": rewards_total,
+                "fund_id": self.template.fund_id,
+                "challenge_url": f"https://cardano.ideascale.com/a/campaign-home/{30000 + challenge_id}",
+                "highlights": None,
+            }
+
+    def proposal_values(self) -> Iterator[dict[str, Any]]:
+        """Generate the proposals, with the notes stored inline."""
+        rng = self.rng
+        text = self.text
+        for index in range(self.proposals):
+            chain_proposal_id = hex_id(rng)
+            proposal_id = str(300_000 + index) if self.template.numeric_proposal_ids else chain_proposal_id
+            challenge_id = rng.randint(1, self.challenges)
+            community_choice = self.challenge_types[challenge_id] == COMMUNITY_CHOICE
+            yield {
+                "id": index,
+                "proposal_id": proposal_id,
+                "proposal_category": self.template.fund_name,
+                "proposal_title": text.title(),
+                "proposal_summary": text.paragraph(),
+                "proposal_problem": text.paragraph(),
+                "proposal_solution": None if community_choice else text.paragraph(),
+                "proposal_public_key": rng.randbytes(48).hex(),
+                "proposal_funds": rng.randint(5, 800_000),
+                "proposal_url": f"http://app.ideascale.com/t/{rng.randbytes(6).hex()}",
+                "proposal_files_url": "",
+                "proposal_impact_score": rng.randint(100, 500),
+                "proposer_name": text.title(),
+                "proposer_contact": "",
+                "proposer_url": f"https://{rng.choice(WORDS)}{index}.example",
+                "proposer_relevant_experience": text.paragraph(),
+                "chain_proposal_id": chain_proposal_id.encode("ascii"),
+                "chain_proposal_index": index % PROPOSALS_PER_VOTEPLAN,
+                "chain_vote_options": "blank,yes,no",
+                "chain_voteplan_id": self.voteplan_ids[index // PROPOSALS_PER_VOTEPLAN],
+                "challenge_id": challenge_id,
+                "proposal_brief": text.paragraph() if community_choice else None,
+                "proposal_importance": text.paragraph() if community_choice else None,
+                "proposal_goal": text.paragraph() if community_choice else None,
+                "proposal_metrics": text.paragraph() if community_choice else None,
+            }
+
+    def voteplan_values(self) -> Iterator[dict[str, Any]]:
+        """Generate the voteplans."""
+        start, end, committee_end = self.template.voteplan_times
+        for voteplan_id in self.voteplan_ids:
+            yield {
+                "id": self.rng.randint(-(2**31), 2**31 - 1),
+                "chain_voteplan_id": voteplan_id,
+                "chain_vote_start_time": start,
+                "chain_vote_end_time": end,
+                "chain_committee_end_time": committee_end,
+                "chain_voteplan_payload": "public",
+                "chain_vote_encryption_key": "",
+                "fund_id": self.template.fund_id,
+            }
+
+
+def insert(con: sqlite3.Connection, table: str, rows: Iterable[tuple], width: int) -> int:
+    """Insert rows into a table in batches, returns the number of rows."""
+    statement = f"INSERT INTO {table} VALUES ({', '.join('?' * width)})"
+    count = 0
+    for batch in batched(rows):
+        con.executemany(statement, batch)
+        count += len(batch)
+    return count
+
+
+def generate(fund: SyntheticFund, path: Path) -> dict[str, int]:
+    """Write the synthetic fund database, returns the number of rows of each table."""
+    template = fund.template
+    columns = template.columns
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.unlink(missing_ok=True)
+    con = sqlite3.connect(path, isolation_level=None)
+    # Nothing to recover from, a failed run is just run again.
+    con.execute("PRAGMA journal_mode = OFF")
+    con.execute("PRAGMA synchronous = OFF")
+
+    counts: dict[str, int] = {}
+    try:
+        con.execute("BEGIN")
+        for sql in template.schema:
+            con.execute(sql)
+
+        counts["funds"] = insert(con, "funds", template.funds, len(columns["funds"]))
+        if "challenges" in columns:
+            counts["challenges"] = insert(
+                con, "challenges", fund.rows("challenges", fund.challenge_values()), len(columns["challenges"])
+            )
+        else:
+            fund.challenge_types = {challenge_id: SIMPLE for challenge_id in range(1, fund.challenges + 1)}
+
+        notes = {challenge_type: table for challenge_type, table in NOTE_TABLES.items() if table in columns}
+        note_statements = {
+            table: f"INSERT INTO {table} VALUES ({', '.join('?' * len(columns[table]))})" for table in notes.values()
+        }
+        counts.update({table: 0 for table in notes.values()})
+        proposal_statement = f"INSERT INTO proposals VALUES ({', '.join('?' * len(columns['proposals']))})"
+        counts["proposals"] = 0
+
+        # The notes are written alongside each batch of proposals, nothing is held for the whole fund.
+        for batch in batched(fund.proposal_values()):
+            note_rows: dict[str, list[tuple]] = {table: [] for table in notes.values()}
+            for proposal in batch:
+                table = notes.get(fund.challenge_types[proposal["challenge_id"]])
+                if table is not None:
+                    note_rows[table].append(tuple(proposal[column] for column in columns[table]))
+            for table, rows in note_rows.items():
+                con.executemany(note_statements[table], rows)
+                counts[table] += len(rows)
+            con.executemany(proposal_statement, list(fund.rows("proposals", iter(batch))))
+            counts["proposals"] += len(batch)
+
+        counts["voteplans"] = insert(
+            con, "voteplans", fund.rows("voteplans", fund.voteplan_values()), len(columns["voteplans"])
+        )
+        con.execute("COMMIT")
+    finally:
+        con.close()
+
+    return counts
+
+
+def main() -> int:
+    """Parse CLI arguments."""
+    parser = argparse.ArgumentParser(
+        prog="fund_seed.synthetic", description="Generate a synthetic historic fund database for scale testing."
+    )
+    parser.add_argument(
+        "--like",
+        type=is_fund,
+        default=5,
+        help="Fund whose database schema, `funds` row and voteplan times are copied.",
+    )
+    parser.add_argument(
+        "--proposals",
+        type=is_positive,
+        default=10_000,
+        help="Number of proposals to generate.",
+    )
+    parser.add_argument(
+        "--challenges",
+        type=is_positive,
+        default=100,
+        help="Number of challenges to generate.",
+    )
+    parser.add_argument(
+        "--community-choice",
+        type=float,
+        default=0.1,
+        help="Fraction of the challenges which are community choice challenges.",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed of the random generator, the same seed always generates the same database.",
+    )
+    parser.add_argument(
+        "--data-dir",
+        type=is_dir,
+        default=HISTORIC_DATA,
+        help="Directory holding the `fund_N` directory of the template fund.",
+    )
+    parser.add_argument(
+        "--out-dir",
+        type=Path,
+        required=True,
+        help="Directory to write `fund_N/fundN_database_encrypted.sqlite3` to, usable as `fund_seed --data-dir`.",
+    )
+
+    args = parser.parse_args()
+
+    template_path = fund_database(args.data_dir, args.like)
+    if not template_path.is_file():
+        parser.error(f"Fund {args.like} has no database at {template_path}.")
+    out_path = fund_database(args.out_dir, args.like)
+    if out_path.resolve() == template_path.resolve():
+        parser.error("Refusing to overwrite the template fund database.")
+
+    start = time.perf_counter()
+    template = Template.read(args.like, template_path)
+    fund = SyntheticFund(template, args.proposals, args.challenges, args.seed, args.community_choice)
+    counts = generate(fund, out_path)
+
+    # Keep the real block 0, so the synthetic fund loads exactly like the real one.
+    block0 = template_path.parent / BLOCK0
+    if block0.is_file():
+        shutil.copyfile(block0, out_path.parent / BLOCK0)
+
+    elapsed = time.perf_counter() - start
+    rows = ", ".join(f"{count} {table}" for table, count in counts.items())
+    print(
+        f"Fund {args.like}: {rows} -> {out_path} ({out_path.stat().st_size} bytes) in {elapsed:.1f}s", file=sys.stderr
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+Round trip `envelope` encrypted values through every kind of generated seed.
+
+Fund 2 is encrypted with a throwaway key, loaded into the event-db by each output format
+and by the loader, and its proposals are decrypted with only what the event-db holds.
+
+Needs an event-db with the old seed schema in $EVENT_DB_URL, its Fund 2 is replaced, and
+`psql`, or $PSQL, to load the scripts.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import shutil
+import sqlite3
+import subprocess
+from pathlib import Path
+
+import asyncpg
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from .__main__ import FORMATS, HISTORIC_DATA, fund_database, fund_script
+from .block0 import fund_block0
+from .encrypt import Decryptor, EnvelopeEncryptor, encrypt_proposals_sensitive_data, finish, snapshot
+from .funds import FUNDS
+from .loader import DATABASE_URL_ENVVAR, load_funds
+from .rows import proposal_rows
+from .writer import write_chunks
+
+EVENT_ID = 2
+DB_URL = os.environ.get(DATABASE_URL_ENVVAR)
+PSQL = os.environ.get("PSQL", "psql")
+
+pytestmark = pytest.mark.skipif(DB_URL is None, reason=f"needs an event-db, set {DATABASE_URL_ENVVAR}")
+
+
+@pytest.fixture(scope="module")
+def private_key() -> rsa.RSAPrivateKey:
+    # Smaller than the production key, only the round trip is tested.
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+@pytest.fixture(scope="module")
+def encrypted_db(tmp_path_factory, private_key) -> Path:
+    path = tmp_path_factory.mktemp("encrypted") / "fund.sqlite3"
+    con = snapshot(fund_database(HISTORIC_DATA, EVENT_ID), path)
+    try:
+        encryptor = EnvelopeEncryptor(private_key.public_key())
+        encrypt_proposals_sensitive_data(encryptor, con, con, FUNDS[EVENT_ID].sensitive_column, workers=1)
+    finally:
+        finish(con)
+    return path
+
+
+def plaintexts() -> dict[int, str]:
+    """The sensitive `proposer_contact` of every source proposal, by proposal id."""
+    con = sqlite3.connect(fund_database(HISTORIC_DATA, EVENT_ID))
+    try:
+        return {proposal.id: proposal.proposer_contact for proposal in proposal_rows(FUNDS[EVENT_ID], con)}
+    finally:
+        con.close()
+
+
+async def loaded_fund() -> tuple[dict | None, dict[int, str]]:
+    """The loaded event's `extra`, and the `proposer_contact` of every proposal by id."""
+    conn = await asyncpg.connect(DB_URL)
+    try:
+        extra = await conn.fetchval("SELECT extra FROM event WHERE row_id = $1", EVENT_ID)
+        rows = await conn.fetch(
+            "SELECT p.id, p.proposer_contact FROM proposal p JOIN objective o ON o.row_id = p.objective WHERE o.event = $1",
+            EVENT_ID,
+        )
+    finally:
+        await conn.close()
+    return None if extra is None else json.loads(extra), {row["id"]: row["proposer_contact"] for row in rows}
+
+
+def assert_decrypts(private_key: rsa.RSAPrivateKey) -> None:
+    extra, contacts = asyncio.run(loaded_fund())
+    decryptor = Decryptor(private_key)
+    decryptor.load_event_keys(extra)
+
+    expected = plaintexts()
+    assert contacts.keys() == expected.keys()
+    for proposal_id, value in contacts.items():
+        assert value.startswith("AES:")
+        assert decryptor.decrypt(value).decode("utf-8") == expected[proposal_id]
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_script_round_trip(tmp_path, encrypted_db, private_key, fmt):
+    if shutil.which(PSQL) is None:
+        pytest.skip(f"{PSQL} not found")
+
+    script = tmp_path / f"fund_{EVENT_ID}.sql"
+    con = sqlite3.connect(encrypted_db)
+    try:
+        with script.open("w") as out:
+            block0 = fund_block0(HISTORIC_DATA / f"fund_{EVENT_ID}")
+            write_chunks(fund_script(EVENT_ID, con, fmt, tmp_path, str(tmp_path), block0), out)
+    finally:
+        con.close()
+
+    subprocess.run([PSQL, "-q", "-v", "ON_ERROR_STOP=1", "-f", str(script), DB_URL], check=True)
+    assert_decrypts(private_key)
+
+
+def test_loader_round_trip(encrypted_db, private_key):
+    block0 = fund_block0(HISTORIC_DATA / f"fund_{EVENT_ID}")
+    assert asyncio.run(load_funds(DB_URL, {EVENT_ID: (encrypted_db, block0)}, 1, force=True)) == 0
+    assert_decrypts(private_key)
@@ -0,0 +1,46 @@
+"""
+Stream generated SQL to a file or stdout in fixed size chunks.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, TextIO
+
+# Flush once this many characters are buffered.
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class ChunkedWriter:
+    """Buffer small pieces of text and write them out in chunks."""
+
+    def __init__(self, out: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.out = out
+        self.chunk_size = chunk_size
+        self.written = 0
+        self._buffer: list[str] = []
+        self._buffered = 0
+
+    def write(self, text: str) -> None:
+        """Buffer `text`, writing the buffer out once it reaches the chunk size."""
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write out everything buffered so far."""
+        if self._buffer:
+            self.out.write("".join(self._buffer))
+            self.written += self._buffered
+            self._buffer.clear()
+            self._buffered = 0
+        self.out.flush()
+
+
+def write_chunks(chunks: Iterable[str], out: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Write every chunk to `out`, returns the number of characters written."""
+    writer = ChunkedWriter(out, chunk_size)
+    for chunk in chunks:
+        writer.write(chunk)
+    writer.flush()
+    return writer.written
@@ -0,0 +1,11 @@
+"""Fixtures shared by the schema mismatch tests."""
+import pytest
+
+from schema_mismatch.harness import Harness
+
+
+@pytest.fixture(scope="session")
+def harness():
+    """The event-db pool and gateway client, opened once and closed at the end of the session."""
+    with Harness() as harness:
+        yield harness
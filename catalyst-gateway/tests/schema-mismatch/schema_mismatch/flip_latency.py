@@ -0,0 +1,151 @@
+"""
+Measure how long `cat-gateway` takes to notice a DB schema version change.
+
+The schema version is flipped to a mismatching version and back, many times.  After each
+flip an endpoint (`/api/health/ready` by default) is polled at a high frequency until its
+status reflects the new version: `503` for a mismatch, anything else once the versions
+match again.  The time from the committed change to the first probe showing it is the
+detection latency, reported as a distribution for each direction:
+
+    poetry run python -m schema_mismatch.flip_latency --flips 100 --output flips.json
+
+The version is always changed back, even if the run fails or is interrupted.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from dataclasses import asdict, dataclass
+
+from loguru import logger
+
+from schema_mismatch import DEFAULT_TIMEOUT
+from schema_mismatch.harness import Harness
+from schema_mismatch.latency import distribution
+
+READY_ENDPOINT = "/api/health/ready"
+MISMATCH_STATUS = 503
+
+# Time between the probes of a flip.
+DEFAULT_POLL_INTERVAL: float = 0.001
+
+
+@dataclass
+class Flip:
+    """A single version change, and how long it took to be noticed."""
+
+    direction: str
+    from_version: int
+    to_version: int
+    # `None` if the change was not noticed within the timeout.
+    latency_s: float | None
+    probes: int
+
+
+async def detect(
+    harness: Harness, endpoint: str, mismatch: bool, started: float, interval: float, timeout: float
+) -> tuple[float | None, int]:
+    """Poll `endpoint` until it shows the (mis)match, returns the latency and number of probes."""
+    probes = 0
+    while time.perf_counter() - started < timeout:
+        response = await harness.http.request("GET", endpoint)
+        probes += 1
+        if (response.status == MISMATCH_STATUS) == mismatch:
+            return time.perf_counter() - started, probes
+        await asyncio.sleep(interval)
+    return None, probes
+
+
+async def flip(
+    harness: Harness, endpoint: str, from_version: int, to_version: int, mismatch: bool, interval: float, timeout: float
+) -> Flip:
+    """Change the schema version, and wait for the gateway to notice."""
+    await harness.change_version_async(from_version, to_version)
+    started = time.perf_counter()
+    latency, probes = await detect(harness, endpoint, mismatch, started, interval, timeout)
+    direction = "to_mismatch" if mismatch else "to_match"
+    return Flip(direction, from_version, to_version, latency, probes)
+
+
+async def flips(
+    harness: Harness,
+    count: int,
+    endpoint: str = READY_ENDPOINT,
+    interval: float = DEFAULT_POLL_INTERVAL,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> list[Flip]:
+    """Flip the schema version to a mismatch and back `count` times."""
+    version = await harness.fetch_schema_version_async()
+    changed = version + 1
+    results = []
+    current = version
+    try:
+        for _ in range(count):
+            results.append(await flip(harness, endpoint, version, changed, True, interval, timeout))
+            current = changed
+            results.append(await flip(harness, endpoint, changed, version, False, interval, timeout))
+            current = version
+    finally:
+        if current != version:
+            await harness.change_version_async(current, version)
+    return results
+
+
+def report(results: list[Flip]) -> dict:
+    """The latency distribution of each direction, and every flip."""
+    summary = {}
+    for direction in ("to_mismatch", "to_match"):
+        of_direction = [result for result in results if result.direction == direction]
+        summary[direction] = {
+            **distribution([result.latency_s for result in of_direction if result.latency_s is not None]),
+            "undetected": sum(result.latency_s is None for result in of_direction),
+            "probes": sum(result.probes for result in of_direction),
+        }
+    return {"summary": summary, "flips": [asdict(result) for result in results]}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="schema_mismatch.flip_latency",
+        description="Measure how long cat-gateway takes to notice DB schema version changes.",
+    )
+    parser.add_argument("--flips", type=int, default=20, help="Number of times to flip the version and back.")
+    parser.add_argument(
+        "--endpoint",
+        default=READY_ENDPOINT,
+        help="Endpoint to poll, any endpoint behind the schema version validation can be used.",
+    )
+    parser.add_argument(
+        "--interval-ms",
+        type=float,
+        default=DEFAULT_POLL_INTERVAL * 1000,
+        help="Time between probes, in milliseconds.",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help="Seconds to wait for a flip to be noticed before giving up on it.",
+    )
+    parser.add_argument("--output", help="Write the report to this JSON file, instead of stdout.")
+    args = parser.parse_args()
+
+    with Harness() as harness:
+        results = harness.run(flips(harness, args.flips, args.endpoint, args.interval_ms / 1000, args.timeout))
+
+    data = report(results)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(json.dumps(data, indent=2) + "\n")
+    else:
+        print(json.dumps(data, indent=2))
+
+    for direction, summary in data["summary"].items():
+        logger.info(f"{direction}: {summary}")
+    return 0 if all(result.latency_s is not None for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
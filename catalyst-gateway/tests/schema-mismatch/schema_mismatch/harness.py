@@ -0,0 +1,182 @@
+"""
+A reusable async harness for the tests, shared by the whole test session.
+
+The harness owns a single event loop, an `asyncpg` pool connected to the event-db and a
+keep-alive HTTP client connected to `cat-gateway`.  Connections are set up once and reused
+by every test, and are all closed when the session ends.
+
+Tests are plain functions, the harness runs the coroutines on its loop:
+
+    def test_something(harness):
+        assert harness.call_api_url("GET", "/api/health/live").status == 204
+"""
+
+import asyncio
+import http.client
+import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import asyncpg
+
+from schema_mismatch import DB_POOL_SIZE, DB_URL, DEFAULT_TIMEOUT, GET_VERSION_QUERY, HOST, PORT, UPDATE_QUERY
+
+# Methods which can be sent again, if their connection was closed before the response.
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "DELETE", "OPTIONS"})
+
+
+@dataclass
+class Response:
+    """A HTTP response, read in full."""
+
+    status: int
+    reason: str
+    headers: dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class HttpClient:
+    """
+    An asyncio HTTP/1.1 client, which keeps its connections alive.
+
+    Requests are made with `http.client`, in threads of the client's own.  Idle connections
+    are reused by the next request, a request made while every connection is busy opens
+    another one, up to `max_connections`.
+    """
+
+    def __init__(self, host: str, port: int, timeout: float = DEFAULT_TIMEOUT, max_connections: int = 64):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._idle: deque[http.client.HTTPConnection] = deque()
+        self._slots = asyncio.Semaphore(max_connections)
+        self._executor = ThreadPoolExecutor(max_connections, thread_name_prefix="http-client")
+        # Number of connections opened, a keep-alive client opens few.
+        self.connections_opened = 0
+
+    def _connect(self) -> http.client.HTTPConnection:
+        self.connections_opened += 1
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    @staticmethod
+    def _send(
+        connection: http.client.HTTPConnection, method: str, endpoint: str, body: bytes | None, headers: dict[str, str]
+    ) -> tuple[Response, bool]:
+        """Make a request, returns the response and whether the connection can be reused."""
+        connection.request(method, endpoint, body, headers)
+        with connection.getresponse() as resp:
+            response = Response(resp.status, resp.reason, {name.lower(): value for name, value in resp.getheaders()}, resp.read())
+            return response, not resp.will_close
+
+    async def request(self, method: str, endpoint: str, body=None, headers: dict[str, str] | None = None) -> Response:
+        """Make a request, `body` is sent as JSON unless it is already `bytes`."""
+        if body is not None and not isinstance(body, bytes):
+            body = json.dumps(body).encode()
+            headers = {"Content-Type": "application/json", **(headers or {})}
+        headers = headers or {}
+        loop = asyncio.get_running_loop()
+
+        async with self._slots:
+            while True:
+                reused = bool(self._idle)
+                connection = self._idle.popleft() if reused else self._connect()
+                try:
+                    response, keep_alive = await loop.run_in_executor(
+                        self._executor, self._send, connection, method, endpoint, body, headers
+                    )
+                except ConnectionError:
+                    connection.close()
+                    # The server may close an idle connection at any time, retry on a new one
+                    # unless the request may have had an effect already.
+                    if reused and method in IDEMPOTENT_METHODS:
+                        continue
+                    raise
+                except BaseException:
+                    connection.close()
+                    raise
+                if keep_alive:
+                    self._idle.append(connection)
+                else:
+                    connection.close()
+                return response
+
+    async def close(self):
+        """Close every idle connection, and wait for the running requests."""
+        while self._idle:
+            self._idle.popleft().close()
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+
+
+class Harness:
+    """The event loop, event-db pool and gateway client of a test session."""
+
+    def __init__(self, db_url: str = DB_URL, host: str = HOST, port: int = PORT, pool_size: int = DB_POOL_SIZE):
+        self.db_url = db_url
+        self.host = host
+        self.port = port
+        self.pool_size = pool_size
+        self._runner: asyncio.Runner | None = None
+        self.pool: asyncpg.Pool | None = None
+        self.http: HttpClient | None = None
+
+    def __enter__(self):
+        self._runner = asyncio.Runner()
+        try:
+            self.run(self._open())
+        except BaseException:
+            self.close()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    async def _open(self):
+        self.http = HttpClient(self.host, self.port)
+        self.pool = await asyncpg.create_pool(self.db_url, min_size=1, max_size=self.pool_size)
+
+    async def _close(self):
+        if self.http is not None:
+            await self.http.close()
+        if self.pool is not None:
+            await asyncio.wait_for(self.pool.close(), DEFAULT_TIMEOUT)
+
+    def close(self):
+        """Close every connection, and the event loop."""
+        if self._runner is None:
+            return
+        try:
+            self.run(self._close())
+        finally:
+            self.pool = self.http = None
+            self._runner.close()
+            self._runner = None
+
+    def run(self, coro):
+        """Run a coroutine on the harness' event loop."""
+        assert self._runner is not None, "The harness is not open."
+        return self._runner.run(coro)
+
+    async def fetch_schema_version_async(self) -> int:
+        version = await self.pool.fetchval(GET_VERSION_QUERY)
+        if version is None:
+            raise Exception("failed to fetch version from db")
+        return version
+
+    async def change_version_async(self, from_value: int, change_to: int):
+        update = await self.pool.execute(UPDATE_QUERY, change_to, from_value)
+        if update != "UPDATE 1":
+            raise Exception(f"failed to change version {from_value} to {change_to}: {update}")
+
+    def fetch_schema_version(self) -> int:
+        return self.run(self.fetch_schema_version_async())
+
+    def change_version(self, from_value: int, change_to: int):
+        self.run(self.change_version_async(from_value, change_to))
+
+    def call_api_url(self, method: str, endpoint: str, body=None, headers: dict[str, str] | None = None) -> Response:
+        return self.run(self.http.request(method, endpoint, body, headers))
@@ -0,0 +1,27 @@
+"""Summarize latency samples as a distribution."""
+
+import math
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """The nearest rank percentile of sorted `samples`."""
+    if not samples:
+        return math.nan
+    rank = max(math.ceil(pct / 100 * len(samples)), 1)
+    return samples[rank - 1]
+
+
+def distribution(samples: list[float]) -> dict[str, float]:
+    """The distribution of latencies in seconds, reported in milliseconds."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {"count": 0}
+    return {
+        "count": len(ordered),
+        "min_ms": ordered[0] * 1000,
+        "mean_ms": sum(ordered) / len(ordered) * 1000,
+        "p50_ms": percentile(ordered, 50) * 1000,
+        "p95_ms": percentile(ordered, 95) * 1000,
+        "p99_ms": percentile(ordered, 99) * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
@@ -0,0 +1,263 @@
+"""
+Drive concurrent request mixes against `cat-gateway`, and report throughput and latency.
+
+Each of `--concurrency` workers picks a scenario at random, weighted by `--mix`, makes its
+request and records the latency, until `--duration` seconds or `--requests` requests are
+done.  Requests made during `--warmup` are not recorded.  Workers are seeded from `--seed`,
+so the same options replay the same sequence of requests:
+
+    poetry run python -m schema_mismatch.load --concurrency 32 --duration 30 \\
+        --mix live=1,ready=1,plans=4,account_votes=4,fragments=2 --output load.json
+
+Throughput, the status codes and the p50/p95/p99 latencies of every scenario, and of the
+whole mix, are reported as JSON.
+"""
+
+import argparse
+import asyncio
+import http.client
+import json
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from loguru import logger
+
+from schema_mismatch import DEFAULT_TIMEOUT, HOST, PORT
+from schema_mismatch.harness import HttpClient
+from schema_mismatch.latency import distribution
+
+# The example account of the API docs, it has no votes in the historic data.
+DEFAULT_ACCOUNT_ID = "0xa6a3c0447aeb9cc54cf6422ba32b294e5e1c3ef6d782f2acff4a70694c4d1663"
+DEFAULT_MIX = "live=1,ready=1,plans=4,account_votes=4,fragments=2"
+FRAGMENTS_PER_BATCH = 10
+
+
+@dataclass
+class Scenario:
+    """A request, `body` makes the JSON body of each request from the worker's random source."""
+
+    method: str
+    endpoint: str
+    body: Callable[[random.Random], Any] | None = None
+
+
+def fragments_batch(rng: random.Random) -> dict:
+    """A batch of random fragments, the gateway does not process them."""
+    return {
+        "fail_fast": False,
+        "fragments": [f"0x{rng.getrandbits(256):064x}" for _ in range(FRAGMENTS_PER_BATCH)],
+    }
+
+
+def scenarios(account_id: str = DEFAULT_ACCOUNT_ID) -> dict[str, Scenario]:
+    """Every scenario which can be part of a mix."""
+    return {
+        "live": Scenario("GET", "/api/health/live"),
+        "ready": Scenario("GET", "/api/health/ready"),
+        "plans": Scenario("GET", "/api/v0/vote/active/plans"),
+        "account_votes": Scenario("GET", f"/api/v1/votes/plan/account-votes/{account_id}"),
+        "fragments": Scenario("POST", "/api/v1/fragments", fragments_batch),
+    }
+
+
+def parse_mix(mix: str, known: dict[str, Scenario]) -> dict[str, float]:
+    """Parse `name=weight,...`."""
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in known:
+            raise ValueError(f"Unknown scenario {name!r}, expected one of {', '.join(known)}.")
+        weights[name] = float(weight) if weight else 1.0
+    if not any(weights.values()):
+        raise ValueError("The mix has no weight.")
+    return weights
+
+
+@dataclass
+class ScenarioStats:
+    """The requests made for one scenario."""
+
+    latencies: list[float] = field(default_factory=list)
+    statuses: dict[int, int] = field(default_factory=dict)
+    # Requests which failed without a response.
+    failures: int = 0
+
+    def record(self, latency: float, status: int | None):
+        self.latencies.append(latency)
+        if status is None:
+            self.failures += 1
+        else:
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def report(self, elapsed: float) -> dict:
+        errors = self.failures + sum(count for status, count in self.statuses.items() if status >= 400)
+        return {
+            "requests": len(self.latencies),
+            "errors": errors,
+            "failures": self.failures,
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+            "throughput_rps": len(self.latencies) / elapsed if elapsed else 0.0,
+            "latency": distribution(self.latencies),
+        }
+
+
+async def run_load(
+    client: HttpClient,
+    mix: dict[str, float],
+    known: dict[str, Scenario],
+    concurrency: int,
+    duration: float | None = None,
+    requests: int | None = None,
+    warmup: float = 0.0,
+    seed: int = 0,
+) -> dict:
+    """Run the load, returns the report."""
+    if duration is None and requests is None:
+        raise ValueError("Either a duration or a number of requests is required.")
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    stats = {name: ScenarioStats() for name in names}
+    remaining = requests
+
+    started = time.perf_counter()
+    measure_from = started + warmup
+    deadline = None if duration is None else measure_from + duration
+
+    async def worker(index: int):
+        nonlocal remaining
+        rng = random.Random(seed * 1_000_003 + index)
+        while True:
+            now = time.perf_counter()
+            if deadline is not None and now >= deadline:
+                return
+            measured = now >= measure_from
+            if measured and remaining is not None:
+                if remaining <= 0:
+                    return
+                remaining -= 1
+
+            name = rng.choices(names, weights)[0]
+            scenario = known[name]
+            body = scenario.body(rng) if scenario.body is not None else None
+            request_start = time.perf_counter()
+            try:
+                status = (await client.request(scenario.method, scenario.endpoint, body)).status
+            except (OSError, http.client.HTTPException) as exc:
+                logger.debug(f"{name} failed: {exc!r}")
+                status = None
+            if measured:
+                stats[name].record(time.perf_counter() - request_start, status)
+
+    await asyncio.gather(*(worker(index) for index in range(concurrency)))
+    elapsed = time.perf_counter() - max(measure_from, started)
+
+    total = ScenarioStats()
+    for scenario_stats in stats.values():
+        total.latencies += scenario_stats.latencies
+        total.failures += scenario_stats.failures
+        for status, count in scenario_stats.statuses.items():
+            total.statuses[status] = total.statuses.get(status, 0) + count
+
+    return {
+        "config": {
+            "mix": mix,
+            "concurrency": concurrency,
+            "duration_s": duration,
+            "requests": requests,
+            "warmup_s": warmup,
+            "seed": seed,
+        },
+        "elapsed_s": elapsed,
+        "connections_opened": client.connections_opened,
+        "total": total.report(elapsed),
+        "scenarios": {name: scenario_stats.report(elapsed) for name, scenario_stats in stats.items()},
+    }
+
+
+async def load(
+    mix: str = DEFAULT_MIX,
+    concurrency: int = 16,
+    duration: float | None = None,
+    requests: int | None = None,
+    warmup: float = 0.0,
+    seed: int = 0,
+    account_id: str = DEFAULT_ACCOUNT_ID,
+    host: str = HOST,
+    port: int = PORT,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> dict:
+    """Run a mix against the gateway at `host`:`port`, over `concurrency` keep-alive connections."""
+    known = scenarios(account_id)
+    weights = parse_mix(mix, known)
+    client = HttpClient(host, port, timeout, max_connections=concurrency)
+    try:
+        return await run_load(client, weights, known, concurrency, duration, requests, warmup, seed)
+    finally:
+        await client.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="schema_mismatch.load", description="Drive concurrent request mixes against cat-gateway."
+    )
+    parser.add_argument(
+        "--mix",
+        default=DEFAULT_MIX,
+        help=f"Scenarios and their weights, `name=weight,...`, of {', '.join(scenarios())}. Default: {DEFAULT_MIX}.",
+    )
+    parser.add_argument("--concurrency", type=int, default=16, help="Number of concurrent workers, and connections.")
+    parser.add_argument("--duration", type=float, help="Seconds to measure for, after the warmup.")
+    parser.add_argument("--requests", type=int, help="Number of requests to measure, instead of a duration.")
+    parser.add_argument("--warmup", type=float, default=0.0, help="Seconds of unmeasured requests first.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the workers' scenario and body choices.")
+    parser.add_argument("--account-id", default=DEFAULT_ACCOUNT_ID, help="Account of the `account_votes` scenario.")
+    parser.add_argument("--host", default=HOST, help="cat-gateway host.")
+    parser.add_argument("--port", type=int, default=PORT, help="cat-gateway port.")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Seconds before a request fails.")
+    parser.add_argument("--output", help="Write the report to this JSON file, instead of stdout.")
+    args = parser.parse_args()
+
+    if args.duration is None and args.requests is None:
+        args.duration = 10.0
+    try:
+        parse_mix(args.mix, scenarios(args.account_id))
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    report = asyncio.run(
+        load(
+            args.mix,
+            args.concurrency,
+            args.duration,
+            args.requests,
+            args.warmup,
+            args.seed,
+            args.account_id,
+            args.host,
+            args.port,
+            args.timeout,
+        )
+    )
+
+    data = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(data + "\n")
+    else:
+        print(data)
+
+    total = report["total"]
+    logger.info(
+        f"{total['requests']} requests, {total['throughput_rps']:.0f} req/s, "
+        f"p50 {total['latency'].get('p50_ms', 0):.2f} ms, p95 {total['latency'].get('p95_ms', 0):.2f} ms, "
+        f"p99 {total['latency'].get('p99_ms', 0):.2f} ms, {total['errors']} errors"
+    )
+    return 0 if total["failures"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,18 @@
+"""Smoke test the load generator against `catalyst-gateway`."""
+from loguru import logger
+
+from schema_mismatch.load import DEFAULT_MIX, load, scenarios
+
+def test_load_mix_is_served(harness):
+    # A short run of every scenario over a few concurrent connections.
+    report = harness.run(load(DEFAULT_MIX, concurrency=4, requests=200, seed=1))
+    logger.info(f"Load: {report['total']}")
+
+    assert report["total"]["requests"] == 200
+    assert report["total"]["failures"] == 0
+    assert set(report["scenarios"]) == set(scenarios())
+    for name, scenario in report["scenarios"].items():
+        server_errors = sum(count for status, count in scenario["statuses"].items() if int(status) >= 500)
+        assert server_errors == 0, f"{name}: {scenario['statuses']}"
+    # Connections are kept alive, not opened per request.
+    assert report["connections_opened"] <= 4
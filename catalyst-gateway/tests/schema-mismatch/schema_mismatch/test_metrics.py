@@ -0,0 +1,42 @@
+"""Test the Event DB metrics exported by `catalyst-gateway`."""
+import time
+
+from loguru import logger
+
+from schema_mismatch import DEFAULT_TIMEOUT
+
+METRICS_ENDPOINT = "/metrics"
+# The query of the schema version watcher, the only one which is run without a request.
+SCHEMA_VERSION_QUERY_LABEL = 'query="SCHEMA_VERSION_QUERY"'
+
+
+def metric_lines(harness, name: str) -> list[str]:
+    resp = harness.call_api_url("GET", METRICS_ENDPOINT)
+    assert resp.status == 200
+    return [line for line in resp.body.decode().splitlines() if line.startswith(name)]
+
+def wait_for_metric(harness, name: str, label: str) -> list[str]:
+    # The watcher checks the schema version in the background, poll until it did, or the timeout.
+    deadline = time.perf_counter() + DEFAULT_TIMEOUT
+    while True:
+        lines = metric_lines(harness, name)
+        if any(label in line for line in lines) or time.perf_counter() > deadline:
+            return lines
+        time.sleep(0.1)
+
+def test_db_metrics_are_exported(harness):
+    # The schema version watcher queries the event-db, with a pooled connection, as soon as it starts.
+    queries = wait_for_metric(harness, "db_query_duration_ms_count", SCHEMA_VERSION_QUERY_LABEL)
+    logger.info(f"DB query metrics: {queries}")
+    assert any(SCHEMA_VERSION_QUERY_LABEL in line for line in queries)
+
+    assert metric_lines(harness, "db_pool_checkout_wait_ms_count")
+
+    statements = metric_lines(harness, "db_statement_cache_count")
+    logger.info(f"DB statement cache metrics: {statements}")
+    assert any(SCHEMA_VERSION_QUERY_LABEL in line for line in statements)
+
+    connections = metric_lines(harness, "db_pool_connections")
+    logger.info(f"DB pool metrics: {connections}")
+    assert any('state="in_use"' in line for line in connections)
+    assert any('state="idle"' in line for line in connections)
@@ -1,58 +1,100 @@
 """Test the `catalyst-gateway` service when a DB schema mismatch occurs."""
+import time
+
 from loguru import logger
 
-from schema_mismatch import call_api_url, fetch_schema_version, change_version
+from schema_mismatch import DEFAULT_TIMEOUT
+from schema_mismatch.flip_latency import DEFAULT_POLL_INTERVAL, READY_ENDPOINT, detect, flips, report
+
+# Version flips made by the detection tests.
+FLIPS = 5
+# An endpoint behind the `SchemaVersionValidation` middleware.
+VALIDATED_ENDPOINT = "/api/v0/vote/active/plans"
+# The gateway is notified of schema version changes, it must not wait for its next poll.
+MAX_DETECTION_LATENCY_MS = 1000
 
-def check_is_live():
-    resp = call_api_url("GET", "/api/health/live")
+def check_is_live(harness):
+    resp = harness.call_api_url("GET", "/api/health/live")
     assert resp.status == 204
     logger.info("cat-gateway service is LIVE.")
 
-def check_is_ready():
-    resp = call_api_url("GET", "/api/health/ready")
-    assert resp.status == 204
+def wait_for_readiness(harness, ready: bool):
+    # The gateway notices schema version changes in the background,
+    # poll `ready` until it does, or the timeout.
+    latency, _probes = harness.run(
+        detect(harness, READY_ENDPOINT, not ready, time.perf_counter(), DEFAULT_POLL_INTERVAL, DEFAULT_TIMEOUT)
+    )
+    assert latency is not None, f"cat-gateway readiness did not change to {ready} within {DEFAULT_TIMEOUT}s"
+
+def check_is_ready(harness):
+    wait_for_readiness(harness, True)
+    assert harness.call_api_url("GET", READY_ENDPOINT).status == 204
     logger.info("cat-gateway service is READY.")
 
-def check_is_not_ready():
-    resp = call_api_url("GET", "/api/health/ready")
-    assert resp.status == 503
+def check_is_not_ready(harness):
+    wait_for_readiness(harness, False)
+    assert harness.call_api_url("GET", READY_ENDPOINT).status == 503
     logger.info("cat-gateway service is NOT READY.")
 
-def test_schema_version_mismatch_changes_cat_gateway_behavior():
+def test_schema_version_mismatch_changes_cat_gateway_behavior(harness):
     # Check that the `live` endpoint is OK
-    check_is_live()
+    check_is_live(harness)
 
     # Check that the `ready` endpoint is OK
-    check_is_ready()
+    check_is_ready(harness)
 
     # Fetch current schema version from DB
-    initial_version = fetch_schema_version()
+    initial_version = harness.fetch_schema_version()
     logger.info(f"cat-gateway schema version is: {initial_version}.")
     changed_version = initial_version + 1
 
     # Change version to a new value
-    change_version(initial_version, changed_version)
+    harness.change_version(initial_version, changed_version)
     logger.info("Changed schema version in DB")
 
-    # Fetch current schema version from DB
-    current_version = fetch_schema_version()
-    assert current_version == changed_version
-    logger.info(f"cat-gateway schema version is: {changed_version}.")
-
-    # Check that the `live` endpoint is OK
-    check_is_live()
+    try:
+        # Fetch current schema version from DB
+        current_version = harness.fetch_schema_version()
+        assert current_version == changed_version
+        logger.info(f"cat-gateway schema version is: {changed_version}.")
 
-    # Check that the `ready` endpoint is NOT OK
-    check_is_not_ready()
+        # Check that the `live` endpoint is OK
+        check_is_live(harness)
 
-    # Change version back
-    change_version(changed_version, initial_version)
-    logger.info("Changed schema version back to original in DB")
+        # Check that the `ready` endpoint is NOT OK
+        check_is_not_ready(harness)
+    finally:
+        # Change version back, even if the checks failed, so later tests see the real version
+        harness.change_version(changed_version, initial_version)
+        logger.info("Changed schema version back to original in DB")
 
     # Fetch current schema version from DB
-    current_version = fetch_schema_version()
+    current_version = harness.fetch_schema_version()
     assert current_version == initial_version
-    logger.info(f"cat-gateway schema version is: {changed_version}.")
+    logger.info(f"cat-gateway schema version is: {initial_version}.")
 
     # Check that the `ready` endpoint is OK
-    check_is_ready()
+    check_is_ready(harness)
+
+def test_schema_version_flips_are_detected(harness):
+    # Flip the schema version to a mismatch and back a few times,
+    # polling `ready` until each change is noticed.
+    results = harness.run(flips(harness, FLIPS))
+    summary = report(results)["summary"]
+    logger.info(f"Schema version flip detection latency: {summary}")
+
+    assert summary["to_mismatch"]["undetected"] == 0
+    assert summary["to_match"]["undetected"] == 0
+    assert harness.fetch_schema_version() == results[0].from_version
+
+def test_schema_version_flips_are_detected_without_probes(harness):
+    # Only poll an endpoint behind the schema version validation, never `ready`:
+    # the gateway must notice each change by itself.
+    results = harness.run(flips(harness, FLIPS, endpoint=VALIDATED_ENDPOINT))
+    summary = report(results)["summary"]
+    logger.info(f"Schema version flip detection latency, without probes: {summary}")
+
+    for direction in ("to_mismatch", "to_match"):
+        assert summary[direction]["undetected"] == 0
+        assert summary[direction]["p99_ms"] < MAX_DETECTION_LATENCY_MS
+    assert harness.fetch_schema_version() == results[0].from_version